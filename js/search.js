@@ -7,8 +7,12 @@ class SiteSearch {
   constructor() {
     this.searchIndex = null;
     this.searchResults = [];
-    this.isIndexing = false;
-    this.indexProgress = 0;
+    // 构建时生成的分片索引（search/meta.json + search/<分片>.json）
+    this.indexVersion = 1;
+    this.indexPromise = null;
+    this.shardKeys = new Set();
+    this.shards = new Map();
+    this.searchCounter = 0;
     this.searchConfig = {
       // 需要搜索的页面类型和它们的权重
       contentTypes: [
@@ -30,10 +34,6 @@ class SiteSearch {
     // 事件绑定
     this.bindEvents();
     
-    // 构建搜索索引 (延迟加载)
-    setTimeout(() => {
-      this.buildSearchIndex();
-    }, 500);
   }
   
   createSearchUI() {
@@ -76,7 +76,7 @@ class SiteSearch {
         </div>
         <div class="search-results">
           <div class="search-results-inner">
-            <div class="search-message">正在构建搜索索引...</div>
+            <div class="search-message">正在加载搜索索引...</div>
           </div>
         </div>
         <div class="search-footer">
@@ -104,6 +104,8 @@ class SiteSearch {
       searchContainer.classList.add('active');
       searchInput.focus();
       document.body.classList.add('search-active');
+      // 打开搜索时才下载索引的文档列表
+      this.loadIndex();
     });
     
     // 关闭搜索
@@ -151,262 +153,110 @@ class SiteSearch {
     this.updateSearchResults([]);
   }
   
-  async buildSearchIndex() {
-    if (this.isIndexing) {
-      console.log('索引构建已在进行中');
-      return;
-    }
-    
-    this.isIndexing = true;
-    this.showSearchMessage('正在构建搜索索引...');
-    
-    this.searchIndex = {
-      pages: []
-    };
-    
-    try {
-      // 首先尝试从blogs.html获取所有博客文章
-      await this.indexBlogsFromBlogsPage();
-      
-      // 索引其他页面
-      await this.indexOtherPages();
-      
-      console.log('搜索索引构建完成，共索引页面:', this.searchIndex.pages.length);
-      console.log('索引的页面:', this.searchIndex.pages.map(p => p.title));
-      
-      if (this.searchIndex.pages.length > 0) {
-        this.showSearchMessage('搜索索引已就绪，开始输入以搜索...');
-      } else {
-        this.showSearchMessage('索引构建失败，请刷新页面重试');
-      }
-    } catch (error) {
-      console.error('Error building search index:', error);
-      this.showSearchMessage('索引构建出错: ' + error.message);
-    } finally {
-      this.isIndexing = false;
+  async loadIndex() {
+    // 搜索索引由 scripts/build_search_index.py 在构建时生成，这里只下载文档列表
+    if (!this.indexPromise) {
+      this.indexPromise = fetch(this.getBasePath() + 'search/meta.json')
+        .then(response => {
+          if (!response.ok) {
+            throw new Error(`无法获取搜索索引 (${response.status})`);
+          }
+          return response.json();
+        })
+        .then(meta => {
+          if (meta.version !== this.indexVersion) {
+            throw new Error('搜索索引版本不匹配');
+          }
+          this.searchIndex = meta;
+          this.shardKeys = new Set(meta.shards);
+          this.showSearchMessage('搜索索引已就绪，开始输入以搜索...');
+          return meta;
+        })
+        .catch(error => {
+          console.error('Error loading search index:', error);
+          this.indexPromise = null;
+          this.showSearchMessage('索引加载出错: ' + error.message);
+          return null;
+        });
     }
+    return this.indexPromise;
   }
   
-  async indexBlogsFromBlogsPage() {
-    try {
-      const basePath = this.getBasePath();
-      const blogsPagePath = basePath + 'blogs.html';
-      
-      console.log('尝试获取:', blogsPagePath);
-      const response = await fetch(blogsPagePath);
-      
-      if (!response.ok) {
-        console.warn('无法获取blogs.html，将使用备用方法');
-        await this.indexBlogsFallback();
-        return;
-      }
-      
-      const html = await response.text();
-      const parser = new DOMParser();
-      const doc = parser.parseFromString(html, 'text/html');
-      
-      // 从blogs.html中提取所有博客文章链接
-      const blogLinks = doc.querySelectorAll('a[href*="blogs/"]');
-      const blogUrls = new Set();
-      
-      blogLinks.forEach(link => {
-        const href = link.getAttribute('href');
-        if (href && href.includes('.html')) {
-          // 处理相对路径
-          let fullPath = href;
-          if (!href.startsWith('http') && !href.startsWith('/')) {
-            if (href.startsWith('blogs/')) {
-              fullPath = basePath + href;
-            } else {
-              fullPath = basePath + 'blogs/' + href.replace(/^.*?blogs\//, '');
-            }
-          } else if (href.startsWith('/')) {
-            fullPath = href;
-          }
-          blogUrls.add(fullPath);
-        }
-      });
-      
-      console.log('找到博客链接:', blogUrls.size);
-      
-      // 索引每个博客文章
-      const blogArray = Array.from(blogUrls);
-      for (let i = 0; i < blogArray.length; i++) {
-        const url = blogArray[i];
-        try {
-          await this.indexPage(url, 'blog', 1.5);
-        } catch (error) {
-          console.error(`Error indexing blog ${url}:`, error);
-        }
-      }
-      
-      console.log(`已索引 ${this.searchIndex.pages.filter(p => p.type === 'blog').length} 篇博客文章`);
-    } catch (error) {
-      console.error('Error indexing blogs:', error);
-      await this.indexBlogsFallback();
+  loadShard(key) {
+    // 分片按需下载，同一分片只请求一次
+    if (!this.shards.has(key)) {
+      const promise = fetch(this.getBasePath() + `search/${key}.json`)
+        .then(response => (response.ok ? response.json() : {}))
+        .catch(error => {
+          console.error(`Error loading search shard ${key}:`, error);
+          this.shards.delete(key);
+          return {};
+        });
+      this.shards.set(key, promise);
     }
+    return this.shards.get(key);
   }
   
-  async indexBlogsFallback() {
-    // 备用方法：直接列出所有博客文件
-    const blogFiles = [
-      '2019-06-10-talking-to-19-yo-self.html',
-      '2022-07-22-如果在夏夜一个旅人.html',
-      '2022-08-21-reading-philosophy.html',
-      '2022-08-27-寻找Study-Work-life-Balence.html',
-      '2022-09-03-听山风.html',
-      '2022-09-17-reawakening-self-awareness.html',
-      '2022-10-02-永远不要停止想象.html',
-      '2022-11-08-hello-again-little-flowers-in-space.html',
-      '2022-11-15-好文分享丨停下来休息一下.html',
-      '2022-11-26-如何面对重大人生决定.html',
-      '2023-01-15-swimming-till-the-sea-turns-blue.html',
-      '2024-07-06-half-year-mindfulness-journey-in-dali.html',
-      '2024-11-30-24岁学会的24件事.html',
-      '2025-04-17-design-experiments-tend-to-fail.html',
-      '2025-05-03-creativity-thoughts.html',
-      '2025-08-28-2025年了为什么我还是推荐用RSS订阅内容.html',
-      '2025-10-26-meeting-everyone-in-the-meditation-hall.html'
-    ];
-    
-    const basePath = this.getBasePath();
-    console.log('使用备用方法索引博客，基础路径:', basePath);
-    
-    for (const file of blogFiles) {
-      const url = basePath + 'blogs/' + file;
-      try {
-        await this.indexPage(url, 'blog', 1.5);
-      } catch (error) {
-        console.error(`Error indexing blog ${url}:`, error);
+  tokenize(text) {
+    // 与 build_search_index.py 的分词规则一致：
+    // 拉丁字母/数字按词前缀匹配，中日韩文字切成二元词，单字按前缀匹配
+    const tokens = [];
+    const lower = text.toLowerCase();
+    (lower.match(/[a-z0-9]+/g) || []).forEach(word => {
+      tokens.push({ term: word, prefix: true });
+    });
+    (lower.match(/[㐀-䶿一-鿿豈-﫿぀-ヿ가-힯]+/g) || []).forEach(run => {
+      if (run.length === 1) {
+        tokens.push({ term: run, prefix: true });
+      } else {
+        for (let i = 0; i < run.length - 1; i++) {
+          tokens.push({ term: run.substring(i, i + 2), prefix: false });
+        }
       }
-    }
+    });
+    return tokens;
   }
   
-  async indexOtherPages() {
-    const basePath = this.getBasePath();
-    const otherPages = [
-      { path: 'index.html', type: 'page', weight: 1.0 },
-      { path: 'blogs.html', type: 'page', weight: 1.0 },
-      { path: 'exhibits/exhibit-001.html', type: 'exhibit', weight: 1.0 },
-      { path: 'exhibits/exhibit-002.html', type: 'exhibit', weight: 1.0 },
-      { path: 'exhibits/exhibit-003.html', type: 'exhibit', weight: 1.0 },
-      { path: 'portfolio.html', type: 'portfolio', weight: 1.0 },
-      { path: 'cabinet.html', type: 'page', weight: 1.0 }
-    ];
-    
-    for (const page of otherPages) {
-      const url = basePath + page.path;
-      try {
-        await this.indexPage(url, page.type, page.weight);
-      } catch (error) {
-        console.error(`Error indexing page ${url}:`, error);
-      }
+  termPath(term) {
+    if (term.charCodeAt(0) < 0x80) {
+      return term;
     }
+    return '_' + Array.from(term).map(c => c.charCodeAt(0).toString(16).padStart(4, '0')).join('');
   }
   
-  async indexPage(url, type, weight) {
-    try {
-      const response = await fetch(url);
-      if (!response.ok) {
-        console.warn(`无法获取页面: ${url} (${response.status})`);
-        return;
-      }
-      
-      const html = await response.text();
-      const parser = new DOMParser();
-      const doc = parser.parseFromString(html, 'text/html');
-      
-      // 提取页面信息
-      const titleEl = doc.querySelector('title');
-      const h1El = doc.querySelector('h1');
-      const title = (titleEl && titleEl.textContent ? titleEl.textContent : '') || 
-                    (h1El && h1El.textContent ? h1El.textContent : '') || 
-                    '';
-      const metaDescEl = doc.querySelector('meta[name="description"]');
-      const description = (metaDescEl && metaDescEl.getAttribute('content') ? metaDescEl.getAttribute('content') : '') || '';
-      
-      // 提取keywords
-      const metaKeywordsEl = doc.querySelector('meta[name="keywords"]');
-      const keywords = (metaKeywordsEl && metaKeywordsEl.getAttribute('content') ? metaKeywordsEl.getAttribute('content') : '') || '';
-      
-      // 提取正文内容 - 尝试多个选择器
-      let content = '';
-      const contentSelectors = [
-        '.post-content',
-        '.article-body',
-        '.content',
-        'article .post-content',
-        'article',
-        'main article',
-        'main',
-        '.blog-post',
-        '.post-body'
-      ];
-      
-      for (const selector of contentSelectors) {
-        const elements = doc.querySelectorAll(selector);
-        if (elements.length > 0) {
-          elements.forEach(el => {
-            // 移除script和style标签
-            const clone = el.cloneNode(true);
-            const scripts = clone.querySelectorAll('script, style, nav, .sidebar, .nav, footer, .footer, header, .header');
-            scripts.forEach(s => s.remove());
-            const text = clone.textContent || '';
-            if (text.trim().length > 50) { // 只添加有实际内容的
-              content += text + ' ';
-            }
-          });
-          if (content.trim().length > 50) {
-            break;
-          }
-        }
-      }
-      
-      // 如果还没找到内容，使用body（排除导航等）
-      if (!content.trim() || content.trim().length < 50) {
-        const body = doc.body.cloneNode(true);
-        // 移除导航、侧边栏、页脚等
-        body.querySelectorAll('nav, .sidebar, .nav, footer, .footer, header, .header, script, style').forEach(el => el.remove());
-        content = body.textContent || '';
+  shardsFor(term, prefix) {
+    // 路径的最长已存在前缀所在分片；前缀匹配时还要包括更细的子分片
+    const path = this.termPath(term);
+    const keys = [];
+    for (let i = path.length; i > 0; i--) {
+      if (this.shardKeys.has(path.substring(0, i))) {
+        keys.push(path.substring(0, i));
+        break;
       }
-      
-      // 清理内容：去除多余空白
-      content = content.replace(/\s+/g, ' ').trim();
-      
-      // 如果内容太短，跳过
-      if (content.length < 20) {
-        console.warn(`页面内容太短，跳过: ${title} (${url})`);
-        return;
-      }
-      
-      // 处理URL - 确保是相对路径
-      let pageUrl = url;
-      if (url.startsWith('http://') || url.startsWith('https://')) {
-        try {
-          const urlObj = new URL(url);
-          pageUrl = urlObj.pathname;
-        } catch (e) {
-          // 如果解析失败，尝试提取路径部分
-          pageUrl = url.replace(/^https?:\/\/[^/]+/, '');
+    }
+    if (prefix) {
+      this.shardKeys.forEach(key => {
+        if (key.length > path.length && key.startsWith(path)) {
+          keys.push(key);
         }
-      }
-      
-      // 添加到索引
-      this.searchIndex.pages.push({
-        url: pageUrl,
-        title: title.replace(' - 筑居思', '').trim(),
-        description,
-        keywords,
-        content,
-        type,
-        weight,
-        fullUrl: url
       });
-      
-      console.log(`已索引: ${title} (${type})`);
-    } catch (error) {
-      console.error(`Error indexing page ${url}:`, error);
     }
+    return keys;
+  }
+  
+  async lookup(token) {
+    // 返回 Map(文档序号 -> 得分)；前缀匹配到多个词时取最高分
+    const scores = new Map();
+    const shards = await Promise.all(this.shardsFor(token.term, token.prefix).map(key => this.loadShard(key)));
+    shards.forEach(shard => {
+      const terms = token.prefix ? Object.keys(shard).filter(t => t.startsWith(token.term)) : [token.term];
+      terms.forEach(t => {
+        (shard[t] || []).forEach(([doc, score]) => {
+          scores.set(doc, Math.max(scores.get(doc) || 0, score));
+        });
+      });
+    });
+    return scores;
   }
   
   getBasePath() {
@@ -443,7 +293,7 @@ class SiteSearch {
     return '';
   }
   
-  handleSearch(query) {
+  async handleSearch(query) {
     const trimmedQuery = query.trim();
     
     // 允许单字符搜索（特别是中文）
@@ -452,78 +302,80 @@ class SiteSearch {
       return;
     }
     
-    if (!this.searchIndex || !this.searchIndex.pages || this.searchIndex.pages.length === 0) {
-      this.showSearchMessage('搜索索引正在加载，请稍后...');
+    const searchId = ++this.searchCounter;
+    const meta = await this.loadIndex();
+    if (!meta) {
       return;
     }
     
-    // 搜索实现 - 支持中文单字符
-    const queryLower = trimmedQuery.toLowerCase();
-    const terms = queryLower.split(/\s+/).filter(term => term.length > 0);
+    // 空格分隔的每个搜索词分别计分；同一个词切出的所有词项都要命中
+    const terms = trimmedQuery.toLowerCase().split(/\s+/).filter(term => term.length > 0);
+    const totals = new Map();
+    for (const term of terms) {
+      const tokens = this.tokenize(term);
+      if (tokens.length === 0) {
+        continue;
+      }
+      let termScores = null;
+      for (const token of tokens) {
+        const scores = await this.lookup(token);
+        if (termScores === null) {
+          termScores = scores;
+        } else {
+          const merged = new Map();
+          termScores.forEach((score, doc) => {
+            if (scores.has(doc)) {
+              merged.set(doc, score + scores.get(doc));
+            }
+          });
+          termScores = merged;
+        }
+      }
+      termScores.forEach((score, doc) => {
+        totals.set(doc, (totals.get(doc) || 0) + score);
+      });
+    }
     
-    if (terms.length === 0) {
-      this.updateSearchResults([]);
+    // 输入已经变化，丢弃过期的结果
+    if (searchId !== this.searchCounter) {
       return;
     }
     
-    // 每个页面的匹配分数
-    const results = this.searchIndex.pages
-      .map(page => {
-        // 对标题、描述、关键词和内容进行评分
-        let score = 0;
-        const titleLower = (page.title || '').toLowerCase();
-        const descriptionLower = (page.description || '').toLowerCase();
-        const keywordsLower = (page.keywords || '').toLowerCase();
-        const contentLower = (page.content || '').toLowerCase();
-        
-        // 检查每个搜索词
-        terms.forEach(term => {
-          // 关键词匹配权重最高
-          if (keywordsLower && keywordsLower.includes(term)) {
-            score += 15 * page.weight;
-          }
-          
-          // 标题匹配权重高
-          if (titleLower.includes(term)) {
-            score += 10 * page.weight;
-          }
-          
-          // 描述匹配
-          if (descriptionLower.includes(term)) {
-            score += 5 * page.weight;
-          }
-          
-          // 内容匹配 - 计算匹配次数
-          const contentMatches = (contentLower.match(new RegExp(term.replace(/[.*+?^${}()|[\]\\]/g, '\\$&'), 'g')) || []).length;
-          if (contentMatches > 0) {
-            score += Math.min(contentMatches, 10) * page.weight; // 最多10次匹配
-            
-            // 找出第一个包含该词的上下文
-            const termIndex = contentLower.indexOf(term);
-            if (termIndex !== -1 && !page.context) {
-              // 提取上下文 (前后50个字符)
-              const start = Math.max(0, termIndex - 50);
-              const end = Math.min(contentLower.length, termIndex + term.length + 50);
-              let context = contentLower.substring(start, end);
-              // 高亮匹配的词
-              context = context.replace(new RegExp(term.replace(/[.*+?^${}()|[\]\\]/g, '\\$&'), 'gi'), `<mark>$&</mark>`);
-              page.context = '...' + context + '...';
-            }
-          }
-        });
-        
+    const basePath = this.getBasePath();
+    const results = Array.from(totals.entries())
+      .map(([doc, score]) => {
+        const entry = meta.docs[doc];
         return {
-          page: { ...page }, // 复制页面对象
+          page: {
+            url: basePath + entry.u,
+            title: entry.t,
+            description: entry.d,
+            context: this.highlight(entry.d, terms),
+            type: entry.y
+          },
           score
         };
       })
-      .filter(result => result.score > 0)
       .sort((a, b) => b.score - a.score);
     
     // 更新搜索结果
     this.updateSearchResults(results);
   }
   
+  highlight(text, terms) {
+    // 在摘要中高亮搜索词，摘要里没有搜索词时返回空，显示普通描述
+    if (!text) return '';
+    const escaped = this.escapeHtml(text);
+    const pattern = terms
+      .map(term => this.escapeHtml(term).replace(/[.*+?^${}()|[\]\\]/g, '\\$&'))
+      .join('|');
+    const regex = new RegExp(pattern, 'gi');
+    if (!regex.test(escaped)) {
+      return '';
+    }
+    return escaped.replace(regex, '<mark>$&</mark>');
+  }
+  
   updateSearchResults(results) {
     const searchResultsInner = document.querySelector('.search-results-inner');
     
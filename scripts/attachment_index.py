@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Obsidian附件索引
+缓存附件目录的文件列表（按目录mtime增量刷新），把图片查找从逐个 exists() 变成字典查询
+
+用法：
+  python3 scripts/attachment_index.py          # 刷新 blog_config.json 中配置的附件目录索引
+  python3 scripts/attachment_index.py 图片.png  # 按文件名查找
+"""
+
+import json
+import os
+import sys
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+SCRIPT_DIR = Path(__file__).parent
+SITE_ROOT = SCRIPT_DIR.parent
+CONFIG_FILE = SITE_ROOT / 'blog_config.json'
+INDEX_FILE = SCRIPT_DIR / 'attachment_index.json'
+
+INDEX_VERSION = 1
+
+
+class AttachmentIndex:
+    """
+    目录 -> {mtime, files, subdirs} 的持久化缓存
+    每次运行中每个目录最多 stat 一次，mtime 变化（有文件增删）时才重新列目录
+    """
+
+    def __init__(self, roots: Iterable = (), path=None):
+        self.path = Path(path) if path else INDEX_FILE
+        self.roots: List[str] = [self.normalize(r) for r in roots if r and str(r).strip()]
+        self.dirs: Dict[str, dict] = {}
+        self.dirty = False
+        self._checked = set()
+        self._file_sets: Dict[str, set] = {}
+        self._by_name: Optional[Dict[str, str]] = None
+        self.load()
+
+    @staticmethod
+    def normalize(path) -> str:
+        return os.path.normpath(os.path.expanduser(str(path)))
+
+    @classmethod
+    def from_config(cls, config: dict, path=None) -> 'AttachmentIndex':
+        """使用配置中的 obsidian_attachments 作为按文件名查找的根目录"""
+        return cls(config.get('obsidian_attachments') or [], path)
+
+    def load(self):
+        if not self.path.exists():
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get('version') == INDEX_VERSION:
+            self.dirs = data.get('dirs', {})
+
+    def save(self):
+        if not self.dirty:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix('.json.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': INDEX_VERSION, 'dirs': self.dirs}, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+        self.dirty = False
+
+    def listing(self, directory) -> Optional[dict]:
+        """返回目录的缓存列表，必要时增量刷新；目录不存在返回None"""
+        key = self.normalize(directory)
+        if key in self._checked:
+            return self.dirs.get(key)
+        self._checked.add(key)
+
+        try:
+            mtime = os.stat(key).st_mtime_ns
+        except OSError:
+            if self.dirs.pop(key, None) is not None:
+                self.dirty = True
+            return None
+
+        entry = self.dirs.get(key)
+        if entry is None or entry.get('mtime') != mtime:
+            files, subdirs = [], []
+            try:
+                with os.scandir(key) as it:
+                    for item in it:
+                        if item.name.startswith('.'):
+                            continue
+                        try:
+                            if item.is_dir():
+                                subdirs.append(item.name)
+                            elif item.is_file():
+                                files.append(item.name)
+                        except OSError:
+                            continue
+            except OSError:
+                return None
+            entry = {'mtime': mtime, 'files': sorted(files), 'subdirs': sorted(subdirs)}
+            self.dirs[key] = entry
+            self._file_sets.pop(key, None)
+            self.dirty = True
+        return entry
+
+    def contains(self, path) -> bool:
+        """判断文件是否存在（只查询所在目录的缓存列表）"""
+        path = self.normalize(path)
+        directory, name = os.path.split(path)
+        entry = self.listing(directory)
+        if entry is None:
+            return False
+        files = self._file_sets.get(directory)
+        if files is None:
+            files = self._file_sets[directory] = set(entry['files'])
+        return name in files
+
+    def scan(self, root):
+        """递归刷新根目录下所有子目录"""
+        stack = [self.normalize(root)]
+        while stack:
+            directory = stack.pop()
+            entry = self.listing(directory)
+            if entry:
+                stack.extend(os.path.join(directory, d) for d in entry['subdirs'])
+
+    def refresh(self):
+        """刷新全部根目录"""
+        for root in self.roots:
+            self.scan(root)
+        self._by_name = None
+
+    def find_by_name(self, filename: str) -> Optional[str]:
+        """在附件根目录（含子目录）中按文件名查找，先配置的根目录优先"""
+        if self._by_name is None:
+            self._by_name = {}
+            for root in self.roots:
+                stack = [root]
+                while stack:
+                    directory = stack.pop()
+                    entry = self.listing(directory)
+                    if not entry:
+                        continue
+                    for name in entry['files']:
+                        self._by_name.setdefault(name, os.path.join(directory, name))
+                    stack.extend(os.path.join(directory, d) for d in reversed(entry['subdirs']))
+        return self._by_name.get(filename)
+
+
+def main():
+    config = {}
+    if CONFIG_FILE.exists():
+        with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
+            config = json.load(f)
+
+    index = AttachmentIndex.from_config(config)
+    if not index.roots:
+        print("⚠️  blog_config.json 未配置 obsidian_attachments")
+        return 1
+
+    index.refresh()
+    index.save()
+    file_count = sum(len(e['files']) for e in index.dirs.values())
+    print(f"✓ 附件索引已刷新: {len(index.dirs)} 个目录, {file_count} 个文件")
+    print(f"  索引文件: {index.path}")
+
+    for name in sys.argv[1:]:
+        found = index.find_by_name(name)
+        print(f"  {name} -> {found or '未找到'}")
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -3,17 +3,27 @@
 """
 自动为博客文章添加关键词
 基于文章内容进行语义识别和关键词提取
+
+用法：
+  python3 scripts/auto_add_keywords.py               # 逐篇处理
+  python3 scripts/auto_add_keywords.py --parallel    # 进程池并行提取（每个进程只加载一次jieba词典）
 """
 
+import argparse
+import hashlib
+import json
 import os
 import re
-import html
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from collections import Counter
-from html.parser import HTMLParser
-from html import unescape
 import sys
 
+sys.path.insert(0, str(Path(__file__).parent))
+from head_meta import HeadMeta
+from html_extract import clean_title, extract, extract_file
+from post_catalog import PostCatalog
+
 # 尝试导入jieba，如果没有则使用简单的方法
 try:
     import jieba
@@ -24,6 +34,14 @@ except ImportError:
     print("警告: jieba库未安装，将使用简单关键词提取方法")
     print("建议安装: pip install jieba")
 
+SCRIPT_DIR = Path(__file__).parent
+# jieba 前缀词典缓存：默认写在系统临时目录，可能被清理；固定放在脚本目录下，后续运行直接加载
+JIEBA_CACHE_FILE = SCRIPT_DIR / 'jieba.cache'
+# 关键词缓存：正文内容哈希 -> 关键词，内容不变时跳过提取
+KEYWORD_CACHE_FILE = SCRIPT_DIR / 'keyword_cache.json'
+# 提取算法（停用词、领域词表、权重等）变化时递增，使缓存整体失效
+KEYWORDS_VERSION = 1
+
 # 停用词列表（常见无意义词）
 STOP_WORDS = {
     '的', '了', '在', '是', '我', '有', '和', '就', '不', '人', '都', '一', '一个', '上', '也', '很', '到', '说', '要', '去', '你', '会', '着', '没有', '看', '好', '自己', '这',
@@ -47,110 +65,10 @@ DOMAIN_KEYWORDS = {
     '工作': ['工作', '职业', '职场', '工作坊', '项目', '实践', '经验'],
 }
 
-class HTMLMetaParser(HTMLParser):
-    """解析HTML中的meta标签和内容"""
-    
-    def __init__(self):
-        super().__init__()
-        self.meta_tags = {}
-        self.title = ''
-        self.description = ''
-        self.keywords = ''
-        self.content = ''
-        self.in_head = False
-        self.in_title = False
-        self.in_content = False
-        self.current_tag = None
-        
-    def handle_starttag(self, tag, attrs):
-        attrs_dict = dict(attrs)
-        
-        if tag == 'head':
-            self.in_head = True
-        elif tag == 'title' and self.in_head:
-            self.in_title = True
-        elif tag == 'meta' and self.in_head:
-            name = attrs_dict.get('name', '')
-            property_attr = attrs_dict.get('property', '')
-            content = attrs_dict.get('content', '')
-            
-            if name == 'description':
-                self.description = content
-            elif name == 'keywords':
-                self.keywords = content
-            elif property_attr == 'og:description':
-                if not self.description:
-                    self.description = content
-        elif tag in ['main', 'article', '.post-content', '.article-body', '.content']:
-            self.in_content = True
-            self.current_tag = tag
-            
-    def handle_endtag(self, tag):
-        if tag == 'head':
-            self.in_head = False
-        elif tag == 'title':
-            self.in_title = False
-        elif tag in ['main', 'article']:
-            self.in_content = False
-            self.current_tag = None
-            
-    def handle_data(self, data):
-        if self.in_title:
-            self.title += data
-        if self.in_content:
-            self.content += data + ' '
-
-
 def extract_text_from_html(html_content):
-    """从HTML中提取纯文本内容"""
-    # 移除script和style标签
-    html_content = re.sub(r'<script[^>]*>.*?</script>', '', html_content, flags=re.DOTALL | re.IGNORECASE)
-    html_content = re.sub(r'<style[^>]*>.*?</style>', '', html_content, flags=re.DOTALL | re.IGNORECASE)
-    
-    # 提取title
-    title_match = re.search(r'<title[^>]*>(.*?)</title>', html_content, re.IGNORECASE | re.DOTALL)
-    title = title_match.group(1).strip() if title_match else ''
-    title = re.sub(r'\s+', ' ', html.unescape(title))
-    title = title.replace(' - 筑居思', '').strip()
-    
-    # 提取description
-    desc_match = re.search(r'<meta\s+name=["\']description["\']\s+content=["\'](.*?)["\']', html_content, re.IGNORECASE)
-    description = desc_match.group(1) if desc_match else ''
-    
-    # 提取正文内容 - 尝试多个选择器
-    content = ''
-    content_patterns = [
-        r'<div\s+class=["\']post-content["\']>(.*?)</div>',
-        r'<div\s+class=["\']article-body["\']>(.*?)</div>',
-        r'<article[^>]*>(.*?)</article>',
-        r'<main[^>]*>(.*?)</main>',
-    ]
-    
-    for pattern in content_patterns:
-        matches = re.findall(pattern, html_content, re.IGNORECASE | re.DOTALL)
-        if matches:
-            content = ' '.join(matches)
-            break
-    
-    # 如果还没找到，提取body中的文本
-    if not content:
-        body_match = re.search(r'<body[^>]*>(.*?)</body>', html_content, re.IGNORECASE | re.DOTALL)
-        if body_match:
-            body_content = body_match.group(1)
-            # 移除导航、侧边栏等
-            body_content = re.sub(r'<nav[^>]*>.*?</nav>', '', body_content, flags=re.DOTALL | re.IGNORECASE)
-            body_content = re.sub(r'<div[^>]*class=["\'][^"\']*sidebar[^"\']*["\'][^>]*>.*?</div>', '', body_content, flags=re.DOTALL | re.IGNORECASE)
-            body_content = re.sub(r'<footer[^>]*>.*?</footer>', '', body_content, flags=re.DOTALL | re.IGNORECASE)
-            content = body_content
-    
-    # 移除HTML标签
-    text = re.sub(r'<[^>]+>', ' ', content)
-    # 解码HTML实体
-    text = html.unescape(text)
-    # 清理空白字符
-    text = re.sub(r'\s+', ' ', text).strip()
-    
-    return title, description, text
+    """从HTML中提取 (标题, 描述, 正文纯文本)"""
+    page = extract(html_content)
+    return clean_title(page['title']), page['meta'].get('description', ''), page['content']
 
 
 def extract_keywords_jieba(text, title='', description='', top_k=10):
@@ -291,34 +209,26 @@ def add_domain_keywords(keywords, text, title='', description=''):
 
 
 def update_html_keywords(file_path, keywords):
-    """更新HTML文件中的keywords meta标签"""
+    """
+    更新HTML文件中的keywords meta标签
+    返回 True（已写入）、False（标签内容未变，文件保持不动）或 None（出错）
+    """
     try:
         with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
+            original = f.read()
         
         # 生成关键词字符串
         keywords_str = ', '.join(keywords)
         keywords_str += ', 筑居思'  # 添加网站名称
         
-        # 检查是否已有keywords标签
-        keywords_pattern = r'<meta\s+name=["\']keywords["\']\s+content=["\'][^"\']*["\']\s*/?>'
+        # 替换已有的keywords标签，没有时插入到description（其次title）后面
+        head = HeadMeta(original)
+        head.set('keywords', keywords_str, after=['description', 'title'])
+        content = head.render()
         
-        if re.search(keywords_pattern, content, re.IGNORECASE):
-            # 更新现有的keywords标签
-            new_keywords_tag = f'<meta name="keywords" content="{keywords_str}">'
-            content = re.sub(keywords_pattern, new_keywords_tag, content, flags=re.IGNORECASE)
-        else:
-            # 在description后面添加keywords标签
-            desc_pattern = r'(<meta\s+name=["\']description["\']\s+content=["\'][^"\']*["\']\s*/?>)'
-            new_keywords_tag = f'\n    <meta name="keywords" content="{keywords_str}">'
-            
-            if re.search(desc_pattern, content, re.IGNORECASE):
-                content = re.sub(desc_pattern, r'\1' + new_keywords_tag, content, flags=re.IGNORECASE)
-            else:
-                # 如果没有description，在title后面添加
-                title_pattern = r'(<title[^>]*>.*?</title>)'
-                if re.search(title_pattern, content, re.IGNORECASE | re.DOTALL):
-                    content = re.sub(title_pattern, r'\1' + new_keywords_tag, content, flags=re.IGNORECASE | re.DOTALL)
+        # 内容未变时不写回，避免改动 mtime 触发自动同步和重新部署
+        if content == original:
+            return False
         
         # 写回文件
         with open(file_path, 'w', encoding='utf-8') as f:
@@ -327,23 +237,92 @@ def update_html_keywords(file_path, keywords):
         return True
     except Exception as e:
         print(f"错误: 更新 {file_path} 失败: {e}")
-        return False
+        return None
 
 
-def process_blog_file(file_path):
-    """处理单个博客文件"""
-    print(f"处理: {file_path.name}")
-    
+def init_jieba():
+    """加载jieba词典（使用持久化的前缀词典缓存），并行模式下每个工作进程只调用一次"""
+    if not JIEBA_AVAILABLE:
+        return
+    jieba.setLogLevel(60)
+    jieba.dt.cache_file = str(JIEBA_CACHE_FILE)
+    jieba.initialize()
+
+
+class KeywordCache:
+    """内容哈希 -> 关键词 的持久化缓存"""
+
+    def __init__(self, path=None):
+        self.path = Path(path) if path else KEYWORD_CACHE_FILE
+        self.entries = {}
+        self.used = set()
+        self.dirty = False
+        self.load()
+
+    def load(self):
+        if not self.path.exists():
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get('version') == KEYWORDS_VERSION:
+            self.entries = data.get('entries', {})
+
+    def save(self):
+        # 清除本次运行未用到的条目（文章已修改或删除）
+        for digest in [d for d in self.entries if d not in self.used]:
+            del self.entries[digest]
+            self.dirty = True
+        if not self.dirty:
+            return
+        tmp_path = self.path.with_suffix('.json.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': KEYWORDS_VERSION, 'entries': self.entries}, f, ensure_ascii=False, indent=1)
+        os.replace(tmp_path, self.path)
+        self.dirty = False
+
+    @staticmethod
+    def digest(title, description, text):
+        """标题、描述、正文和提取方式的哈希（不含keywords标签本身，写回关键词不会使缓存失效）"""
+        method = 'jieba' if JIEBA_AVAILABLE else 'simple'
+        payload = json.dumps([KEYWORDS_VERSION, method, title, description, text], ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, digest):
+        self.used.add(digest)
+        return self.entries.get(digest)
+
+    def set(self, digest, keywords):
+        self.used.add(digest)
+        if self.entries.get(digest) != keywords:
+            self.entries[digest] = keywords
+            self.dirty = True
+
+
+def read_blog_text(file_path):
+    """流式解析博客文件，返回 (标题, 描述, 正文)"""
+    page = extract_file(file_path)
+    return clean_title(page['title']), page['meta'].get('description', ''), page['content']
+
+
+def extract_file_keywords(file_path):
+    """
+    读取并分析单个博客文件，不修改文件
+    返回 (关键词列表, 警告信息)；无法提取时关键词为None
+    """
+    try:
+        return keywords_for_text(*read_blog_text(file_path))
+    except Exception as e:
+        return None, f"错误: {e}"
+
+
+def keywords_for_text(title, description, text):
+    """由提取出的文本计算关键词，返回 (关键词列表, 警告信息)"""
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            html_content = f.read()
-        
-        # 提取文本内容
-        title, description, text = extract_text_from_html(html_content)
-        
         if not text and not title:
-            print(f"  警告: 无法提取内容，跳过")
-            return False
+            return None, "警告: 无法提取内容，跳过"
         
         # 提取关键词
         keywords = extract_keywords(text, title, description, top_k=10)
@@ -367,36 +346,66 @@ def process_blog_file(file_path):
         keywords = keywords[:10]  # 最终限制为10个
         
         if not keywords:
-            print(f"  警告: 未提取到关键词")
-            return False
-        
-        print(f"  提取的关键词: {', '.join(keywords)}")
-        
-        # 更新HTML文件
-        if update_html_keywords(file_path, keywords):
-            print(f"  ✓ 成功更新关键词")
-            return True
-        else:
-            return False
+            return None, "警告: 未提取到关键词"
+        return keywords, None
             
     except Exception as e:
-        print(f"  错误: {e}")
+        return None, f"错误: {e}"
+
+
+def apply_keywords(file_path, keywords, message):
+    """输出提取结果并写回关键词，返回是否成功"""
+    print(f"处理: {file_path.name}")
+    if keywords is None:
+        print(f"  {message}")
         return False
+    
+    print(f"  提取的关键词: {', '.join(keywords)}")
+    
+    # 更新HTML文件
+    updated = update_html_keywords(file_path, keywords)
+    if updated is None:
+        return False
+    print("  ✓ 成功更新关键词" if updated else "  ⊘ 关键词未变化，未改动文件")
+    return True
+
+
+def process_blog_file(file_path):
+    """处理单个博客文件"""
+    return apply_keywords(file_path, *extract_file_keywords(file_path))
+
+
+def _keywords_job(parts):
+    return keywords_for_text(*parts)
+
+
+def iter_parallel(texts, workers=None):
+    """
+    进程池并行提取关键词，按输入顺序产出 (关键词, 警告信息)
+    jieba 词典在每个工作进程初始化时加载一次，文本按块分发以减少进程间通信
+    """
+    workers = workers or os.cpu_count() or 1
+    chunksize = max(1, len(texts) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_jieba) as executor:
+        yield from executor.map(_keywords_job, texts, chunksize=chunksize)
 
 
 def main():
     """主函数"""
-    # 获取脚本所在目录
-    script_dir = Path(__file__).parent
+    parser = argparse.ArgumentParser(description='自动为博客文章添加关键词')
+    parser.add_argument('--parallel', action='store_true', help='进程池并行提取关键词（每个进程只加载一次jieba）')
+    parser.add_argument('--workers', type=int, default=None, help='并行模式的进程数（默认CPU核数）')
+    args = parser.parse_args()
+
     # 博客目录
-    blogs_dir = script_dir.parent / 'blogs'
+    blogs_dir = SCRIPT_DIR.parent / 'blogs'
     
     if not blogs_dir.exists():
         print(f"错误: 博客目录不存在: {blogs_dir}")
         return
     
     # 获取所有HTML文件
-    blog_files = list(blogs_dir.glob('*.html'))
+    blog_files = sorted(blogs_dir.glob('*.html'))
     
     if not blog_files:
         print("未找到博客文件")
@@ -408,13 +417,49 @@ def main():
     success_count = 0
     skip_count = 0
     
-    for blog_file in sorted(blog_files):
-        if process_blog_file(blog_file):
+    # 内容哈希命中缓存的文章直接复用关键词，其余文章才需要提取
+    cache = KeywordCache()
+    results = [None] * len(blog_files)
+    pending = []
+    for i, blog_file in enumerate(blog_files):
+        try:
+            parts = read_blog_text(blog_file)
+        except Exception as e:
+            results[i] = (None, f"错误: {e}")
+            continue
+        digest = KeywordCache.digest(*parts)
+        cached = cache.get(digest)
+        if cached is not None:
+            results[i] = (cached, None)
+        else:
+            pending.append((i, digest, parts))
+    
+    if pending:
+        texts = [parts for _, _, parts in pending]
+        if args.parallel:
+            extracted = iter_parallel(texts, args.workers)
+        else:
+            init_jieba()
+            extracted = map(_keywords_job, texts)
+        for (i, digest, _), (keywords, message) in zip(pending, extracted):
+            results[i] = (keywords, message)
+            if keywords:
+                cache.set(digest, keywords)
+    cache.save()
+    print(f"关键词缓存: 命中 {len(blog_files) - len(pending)} 篇, 重新提取 {len(pending)} 篇")
+    print()
+
+    for blog_file, (keywords, message) in zip(blog_files, results):
+        if apply_keywords(blog_file, keywords, message):
             success_count += 1
         else:
             skip_count += 1
         print()
     
+    # 关键词写回后同步文章目录（只重新解析改动过的页面）
+    with PostCatalog(blogs_dir=blogs_dir) as catalog:
+        catalog.refresh()
+    
     print("=" * 50)
     print(f"处理完成: 成功 {success_count} 个, 跳过 {skip_count} 个")
 
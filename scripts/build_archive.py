@@ -0,0 +1,386 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+博客归档页生成
+blogs.html 只显示最新一页文章，全部文章通过 archive/ 下的静态归档页访问：
+  archive/index.html        归档总览（各页日期范围、年份、标签）
+  archive/page-N.html       全部文章，按页
+  archive/2025-N.html       某一年的文章
+  archive/tag-标签-N.html   某个标签的文章（至少 MIN_TAG_POSTS 篇才生成）
+
+分页从最早的文章开始编号，每页固定 PAGE_SIZE 篇：新文章只会落在最后一页，
+已经写满的页面内容不变。每页的成员文章和模板版本记录在 scripts/archive_manifest.json，
+没有变化的页面不会重新渲染
+
+用法：
+  python3 scripts/build_archive.py          # 增量生成
+  python3 scripts/build_archive.py --force  # 忽略清单，全部重新生成
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional
+
+SCRIPT_DIR = Path(__file__).parent
+SITE_ROOT = SCRIPT_DIR.parent
+ARCHIVE_DIR = SITE_ROOT / 'archive'
+MANIFEST_FILE = SCRIPT_DIR / 'archive_manifest.json'
+
+sys.path.insert(0, str(SCRIPT_DIR))
+from update_blogs_pages import escape_html, get_all_blogs, render_blog_card
+
+# 每页文章数（blogs.html 也只显示最新的这么多篇）
+PAGE_SIZE = 12
+# 标签至少有这么多篇文章才单独生成列表页
+MIN_TAG_POSTS = 2
+# 清单格式版本，结构或页面模板变化时递增
+ARCHIVE_VERSION = 1
+
+# blogs.html 中归档入口的起止标记
+ARCHIVE_NAV_START = '<!-- 归档导航（scripts/build_archive.py 生成） -->'
+ARCHIVE_NAV_END = '<!-- /归档导航 -->'
+
+PAGE_TEMPLATE = '''<!DOCTYPE html>
+<html lang="zh-CN" data-emotion="contemplation">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>{title} - 筑居思</title>
+    <meta name="description" content="{description}">
+    <meta name="author" content="Qianny">
+    <meta name="robots" content="index, follow">
+    <link rel="canonical" href="https://thinkingleaf.space/archive/{filename}">
+    <link rel="stylesheet" href="../css/styles.css">
+    <link rel="stylesheet" href="../css/ui-principles.css">
+    <link rel="stylesheet" href="../css/lazy-loading.css">
+    <link rel="stylesheet" href="../css/blog-keywords.css">
+    <link rel="stylesheet" href="../css/archive.css">
+    <link rel="icon" href="../images/putiye心形菩提叶.svg" type="image/svg+xml">
+    <link rel="preconnect" href="https://cdn.jsdelivr.net" crossorigin>
+    <link rel="stylesheet" href="https://cdn.jsdelivr.net/npm/lxgw-wenkai-webfont@latest/style.css">
+</head>
+<body class="blogs-page archive-page" data-emotion="contemplation">
+    <!-- 左侧固定导航栏 -->
+    <div class="sidebar">
+        <div class="sidebar-logo">
+            <a href="../index.html" aria-label="返回首页"><h1>筑居<span>思</span></h1></a>
+        </div>
+        <ul class="sidebar-nav">
+            <li><a href="../what-is-zhu-ju-si.html">🧭 何为筑居思？</a></li>
+            <li><a href="../remake.html">🔨 筑 · 创造</a></li>
+            <li><a href="../cabinet.html">☕ 居 · 拾遗</a></li>
+            <li><a href="../blogs.html">🧠 思 · 博客</a></li>
+        </ul>
+    </div>
+
+    <!-- 移动端菜单按钮 -->
+    <button class="mobile-menu-toggle" aria-label="打开导航菜单">
+        <span></span>
+        <span></span>
+        <span></span>
+    </button>
+
+    <div class="main-content">
+        <div class="container">
+            <main>
+                <nav class="archive-breadcrumb" aria-label="位置"><a href="../blogs.html">博客</a> / <a href="index.html">归档</a></nav>
+                <section class="hero">
+                    <h2>{heading}</h2>
+                    <p>{subtitle}</p>
+                </section>
+{body}
+            </main>
+
+            <footer>
+                <div class="footer-content">
+                    <p>© 2025 筑居思. 保留所有权利.</p>
+                </div>
+            </footer>
+        </div>
+    </div>
+
+    <script src="../js/theme-switcher.js" defer></script>
+    <script src="../js/lazy-loading.js" defer></script>
+    <script src="../js/main.js" defer></script>
+</body>
+</html>
+'''
+
+LISTING_TEMPLATE = '''                <div class="categories">
+                    <section class="category">
+                        <div class="subcategories">
+                            <div class="subcategory">
+                                <div class="links-grid">
+{cards}
+                                </div>
+                            </div>
+                        </div>
+                    </section>
+                </div>
+{pagination}'''
+
+TEMPLATE_HASH = hashlib.sha256((PAGE_TEMPLATE + LISTING_TEMPLATE).encode('utf-8')).hexdigest()[:12]
+
+
+def tag_slug(tag: str) -> str:
+    """标签的文件名片段：保留文字和数字，其余字符合并为连字符；大小写不同的同名标签归为一类"""
+    slug = re.sub(r'\W+', '-', tag.lower()).strip('-')
+    return slug or hashlib.sha1(tag.encode('utf-8')).hexdigest()[:8]
+
+
+def paginate(posts: List[Dict], prefix: str) -> List[Dict]:
+    """
+    把按日期从新到旧排列的文章分页：从最早的文章开始每 PAGE_SIZE 篇一页，页内仍从新到旧，
+    返回按页码排列的 [{filename, page, posts, newer, older}]
+    """
+    oldest_first = posts[::-1]
+    chunks = [oldest_first[i:i + PAGE_SIZE][::-1] for i in range(0, len(oldest_first), PAGE_SIZE)]
+    pages = []
+    for number, chunk in enumerate(chunks, 1):
+        pages.append({
+            'filename': f'{prefix}-{number}.html',
+            'page': number,
+            'posts': chunk,
+            'newer': f'{prefix}-{number + 1}.html' if number < len(chunks) else None,
+            'older': f'{prefix}-{number - 1}.html' if number > 1 else None,
+        })
+    return pages
+
+
+def group_posts(blogs: List[Dict]) -> Dict[str, Dict]:
+    """
+    把文章按全部、年份、标签分组，返回 前缀 -> {label, kind, pages}；
+    字典按 全部、年份（新到旧）、标签（文章数多到少）排列
+    """
+    years: Dict[str, List[Dict]] = {}
+    tags: Dict[str, Dict] = {}
+    for blog in blogs:
+        if blog['date']:
+            years.setdefault(blog['date'][:4], []).append(blog)
+        for slug, keyword in {tag_slug(k): k for k in reversed(blog['keywords'])}.items():
+            tags.setdefault(slug, {'label': keyword, 'posts': []})['posts'].append(blog)
+
+    groups = {'page': {'label': '全部文章', 'kind': 'all', 'pages': paginate(blogs, 'page')}}
+    for year in sorted(years, reverse=True):
+        groups[year] = {'label': year, 'kind': 'year', 'pages': paginate(years[year], year)}
+    for slug, group in sorted(tags.items(), key=lambda item: (-len(item[1]['posts']), item[0])):
+        if len(group['posts']) >= MIN_TAG_POSTS:
+            prefix = f'tag-{slug}'
+            groups[prefix] = {'label': group['label'], 'kind': 'tag', 'pages': paginate(group['posts'], prefix)}
+    return groups
+
+
+def entry_page(group: Dict) -> str:
+    """分组的入口：最新的一页"""
+    return group['pages'][-1]['filename']
+
+
+def count_posts(group: Dict) -> int:
+    return sum(len(page['posts']) for page in group['pages'])
+
+
+def date_range(posts: List[Dict]) -> str:
+    dates = [p['date'] for p in posts if p['date']]
+    if not dates:
+        return ''
+    return dates[0] if dates[0] == dates[-1] else f'{dates[0]} — {dates[-1]}'
+
+
+def card_fields(blog: Dict) -> list:
+    """卡片上展示的字段，用于判断页面是否需要重新生成"""
+    return [blog['filename'], blog['title'], blog['date'], blog['keywords'][:8], blog.get('cover_image')]
+
+
+# ---- 页面渲染 ----
+
+def render_pagination(page: Dict) -> str:
+    links = []
+    if page['newer']:
+        links.append(f'<a href="{page["newer"]}" class="archive-newer">← 较新的文章</a>')
+    links.append(f'<span class="archive-page">第 {page["page"]} 页</span>')
+    if page['older']:
+        links.append(f'<a href="{page["older"]}" class="archive-older">较早的文章 →</a>')
+    inner = '\n                    '.join(links)
+    return (f'                <nav class="archive-pagination" aria-label="分页">\n'
+            f'                    {inner}\n'
+            f'                </nav>')
+
+
+def render_listing(group: Dict, page: Dict) -> str:
+    if group['kind'] == 'all':
+        heading = '全部文章'
+    elif group['kind'] == 'year':
+        heading = f"{group['label']} 年的文章"
+    else:
+        heading = f"标签：{group['label']}"
+    title = heading if len(group['pages']) == 1 else f'{heading} · 第 {page["page"]} 页'
+    subtitle = date_range(page['posts'])
+    body = LISTING_TEMPLATE.format(
+        cards='\n'.join(render_blog_card(blog, root='../') for blog in page['posts']),
+        pagination=render_pagination(page),
+    )
+    return PAGE_TEMPLATE.format(
+        title=escape_html(title),
+        description=escape_html(f'筑居思博客归档：{heading}（{subtitle}）' if subtitle else f'筑居思博客归档：{heading}'),
+        filename=page['filename'],
+        heading=escape_html(heading),
+        subtitle=escape_html(subtitle),
+        body=body,
+    )
+
+
+def index_summary(groups: Dict[str, Dict]) -> Dict[str, list]:
+    """归档总览展示的数据：各页日期范围、年份和标签的文章数"""
+    summary = {'pages': [], 'years': [], 'tags': []}
+    for page in reversed(groups['page']['pages']):
+        summary['pages'].append([page['filename'], page['page'], date_range(page['posts']), len(page['posts'])])
+    for group in groups.values():
+        if group['kind'] in ('year', 'tag'):
+            summary[f"{group['kind']}s"].append([entry_page(group), group['label'], count_posts(group)])
+    return summary
+
+
+def render_index(summary: Dict[str, list]) -> str:
+    indent = '                        '
+    pages = '\n'.join(
+        f'{indent}<li><a href="{filename}">第 {number} 页</a><span class="archive-meta">{escape_html(span)} · {count} 篇</span></li>'
+        for filename, number, span, count in summary['pages'])
+    years = '\n'.join(
+        f'{indent}<li><a href="{filename}">{escape_html(label)}</a><span class="archive-meta">{count} 篇</span></li>'
+        for filename, label, count in summary['years'])
+    tags = '\n'.join(
+        f'{indent}<a href="{filename}" class="archive-tag">{escape_html(label)}<span class="archive-count">{count}</span></a>'
+        for filename, label, count in summary['tags'])
+    body = f'''                <section class="archive-section" id="pages">
+                    <h3>按时间</h3>
+                    <ul class="archive-list">
+{pages}
+                    </ul>
+                </section>
+                <section class="archive-section" id="years">
+                    <h3>按年份</h3>
+                    <ul class="archive-list">
+{years}
+                    </ul>
+                </section>
+                <section class="archive-section" id="tags">
+                    <h3>按标签</h3>
+                    <div class="archive-tags">
+{tags}
+                    </div>
+                </section>'''
+    total = sum(count for _, _, _, count in summary['pages'])
+    return PAGE_TEMPLATE.format(
+        title='文章归档',
+        description=f'筑居思博客归档：全部 {total} 篇文章，按时间、年份和标签浏览',
+        filename='index.html',
+        heading='文章归档',
+        subtitle=f'全部 {total} 篇文章',
+        body=body,
+    )
+
+
+def archive_nav_html(blogs: List[Dict]) -> str:
+    """blogs.html 中的归档入口（链接相对网站根目录）"""
+    groups = group_posts(blogs)
+    years = ' '.join(f'<a href="archive/{entry_page(group)}">{escape_html(group["label"])}</a>'
+                     for group in groups.values() if group['kind'] == 'year')
+    return f'''{ARCHIVE_NAV_START}
+                    <nav class="archive-nav" aria-label="文章归档">
+                        <a href="archive/index.html" class="archive-all">全部 {len(blogs)} 篇文章 →</a>
+                        <span class="archive-years">按年份：{years}</span>
+                        <a href="archive/index.html#tags" class="archive-by-tag">按标签浏览</a>
+                    </nav>
+                    {ARCHIVE_NAV_END}'''
+
+
+# ---- 增量构建 ----
+
+def load_manifest() -> Dict[str, str]:
+    if not MANIFEST_FILE.exists():
+        return {}
+    try:
+        with open(MANIFEST_FILE, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return data.get('pages', {}) if data.get('version') == ARCHIVE_VERSION else {}
+
+
+def save_manifest(pages: Dict[str, str]):
+    tmp_path = MANIFEST_FILE.with_suffix('.json.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({'version': ARCHIVE_VERSION, 'pages': pages}, f, ensure_ascii=False, indent=2, sort_keys=True)
+    os.replace(tmp_path, MANIFEST_FILE)
+
+
+def page_digest(data) -> str:
+    payload = json.dumps([ARCHIVE_VERSION, TEMPLATE_HASH, data], ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def plan_pages(blogs: List[Dict]) -> Dict[str, tuple]:
+    """所有归档页：文件名 -> (摘要, 渲染函数)；摘要只依赖页面上展示的数据，渲染延后到确实需要时"""
+    groups = group_posts(blogs)
+    plan = {}
+    for group in groups.values():
+        for page in group['pages']:
+            data = [group['kind'], group['label'], page['page'], page['newer'], page['older'],
+                    [card_fields(blog) for blog in page['posts']]]
+            plan[page['filename']] = (page_digest(data), lambda g=group, p=page: render_listing(g, p))
+    summary = index_summary(groups)
+    plan['index.html'] = (page_digest(summary), lambda: render_index(summary))
+    return plan
+
+
+def build(force: bool = False, blogs: Optional[List[Dict]] = None) -> Dict[str, int]:
+    """增量生成归档页，返回 {'written': 写入数, 'unchanged': 跳过数, 'removed': 删除数}"""
+    if blogs is None:
+        blogs = get_all_blogs()
+    ARCHIVE_DIR.mkdir(parents=True, exist_ok=True)
+    manifest = {} if force else load_manifest()
+    plan = plan_pages(blogs) if blogs else {}
+
+    stats = {'written': 0, 'unchanged': 0, 'removed': 0}
+    pages = {}
+    for filename, (digest, render) in plan.items():
+        path = ARCHIVE_DIR / filename
+        pages[filename] = digest
+        if manifest.get(filename) == digest and path.exists():
+            stats['unchanged'] += 1
+            continue
+        html = render()
+        if not path.exists() or path.read_text(encoding='utf-8') != html:
+            path.write_text(html, encoding='utf-8')
+            stats['written'] += 1
+        else:
+            stats['unchanged'] += 1
+
+    # archive/ 下的页面全部由本脚本生成，不在计划中的即为过期页面
+    for path in ARCHIVE_DIR.glob('*.html'):
+        if path.name not in plan:
+            path.unlink()
+            stats['removed'] += 1
+
+    if pages != manifest:
+        save_manifest(pages)
+    print(f"✓ 归档页: {len(plan)} 页（写入 {stats['written']}，未变化 {stats['unchanged']}，删除 {stats['removed']}）")
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description='生成博客归档页（按页、年份、标签）')
+    parser.add_argument('--force', action='store_true', help='忽略清单，全部重新生成')
+    args = parser.parse_args()
+
+    build(force=args.force)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
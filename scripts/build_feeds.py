@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+订阅源生成
+从文章目录（post_catalog）生成 RSS 2.0（rss.xml）、Atom（atom.xml）和 JSON Feed（feed.json），
+条目包含简介、关键词和正文开头的摘要（content:encoded）
+
+只在内容变化时更新：先沿用现有文件中的 lastBuildDate / updated 渲染，与现有文件完全一致就不写入，
+否则才换成当前时间并写回。订阅器按 ttl 轮询时得到的是同一份文件，可以直接命中缓存
+
+用法：
+  python3 scripts/build_feeds.py
+"""
+
+import json
+import re
+import sys
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from html import escape
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+from urllib.parse import quote, urljoin
+
+SCRIPT_DIR = Path(__file__).parent
+SITE_ROOT = SCRIPT_DIR.parent
+RSS_FILE = SITE_ROOT / 'rss.xml'
+ATOM_FILE = SITE_ROOT / 'atom.xml'
+JSON_FEED_FILE = SITE_ROOT / 'feed.json'
+
+sys.path.insert(0, str(SCRIPT_DIR))
+from post_catalog import load_posts
+
+SITE_URL = 'https://thinkingleaf.space'
+FEED_TITLE = '筑居思 - 回归生活本源的思考与创造'
+FEED_DESCRIPTION = '光通信行业大数据B端UI设计师、禅修践行者的个人博客，分享设计思考、生活随笔与内心感悟'
+FEED_AUTHOR = 'Qianny'
+FEED_EMAIL = 'qianny@thinkingleaf.space'
+FEED_ICON = f'{SITE_URL}/images/putiye心形菩提叶.svg'
+# 订阅源中的文章数
+FEED_SIZE = 20
+# 建议订阅器的轮询间隔（分钟）
+FEED_TTL = 60
+# 文章日期按北京时间零点发布
+TIMEZONE = timezone(timedelta(hours=8))
+
+RSS_BUILD_DATE = re.compile(r'<lastBuildDate>([^<]+)</lastBuildDate>')
+ATOM_UPDATED = re.compile(r'<feed\b[^>]*>.*?<updated>([^<]+)</updated>', re.DOTALL)
+
+
+def post_url(filename: str) -> str:
+    return f'{SITE_URL}/blogs/{quote(filename)}'
+
+
+def absolute_url(src: str, base: str) -> str:
+    """页面中的相对路径（相对 blogs/ 目录）转为绝对地址"""
+    if src.startswith(('http://', 'https://')):
+        return src
+    return urljoin(base, quote(src, safe='/%.:-_~#?&='))
+
+
+def published(date: str) -> Optional[datetime]:
+    try:
+        return datetime.strptime(date, '%Y-%m-%d').replace(tzinfo=TIMEZONE)
+    except (TypeError, ValueError):
+        return None
+
+
+def collect_items() -> List[Dict]:
+    """最新的 FEED_SIZE 篇文章（没有日期的页面不进入订阅源）"""
+    items = []
+    for post in load_posts():
+        when = published(post['date'])
+        if not when or not post['title']:
+            continue
+        url = post_url(post['filename'])
+        items.append({
+            'title': post['title'],
+            'url': url,
+            'date': when,
+            'summary': post['description'],
+            'tags': [k for k in post['keywords'] if k != '筑居思'],
+            'image': absolute_url(post['cover_image'], f'{SITE_URL}/blogs/') if post['cover_image'] else None,
+            'content_html': excerpt_html(post, url),
+        })
+        if len(items) >= FEED_SIZE:
+            break
+    return items
+
+
+def excerpt_html(post: Dict, url: str) -> str:
+    """订阅源中的正文摘要：封面图、开头几段和「阅读全文」链接"""
+    parts = []
+    if post['cover_image']:
+        image = absolute_url(post['cover_image'], f'{SITE_URL}/blogs/')
+        parts.append(f'<p><img src="{escape(image)}" alt="{escape(post["title"])}"></p>')
+    parts.extend(f'<p>{escape(paragraph)}</p>' for paragraph in post['excerpt'])
+    parts.append(f'<p><a href="{escape(url)}">阅读全文 →</a></p>')
+    return '\n'.join(parts)
+
+
+def cdata(text: str) -> str:
+    return '<![CDATA[' + text.replace(']]>', ']]]]><![CDATA[>') + ']]>'
+
+
+# ---- 渲染 ----
+
+def render_rss(items: List[Dict], build_date: str) -> str:
+    entries = []
+    for item in items:
+        categories = ''.join(f'\n      <category>{escape(tag)}</category>' for tag in item['tags'])
+        entries.append(f'''    <item>
+      <title>{escape(item['title'])}</title>
+      <link>{escape(item['url'])}</link>
+      <guid isPermaLink="true">{escape(item['url'])}</guid>
+      <pubDate>{format_datetime(item['date'])}</pubDate>
+      <dc:creator>{FEED_AUTHOR}</dc:creator>
+      <description>{escape(item['summary'])}</description>{categories}
+      <content:encoded>{cdata(item['content_html'])}</content:encoded>
+    </item>''')
+    body = '\n'.join(entries)
+    return f'''<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0" xmlns:atom="http://www.w3.org/2005/Atom" xmlns:content="http://purl.org/rss/1.0/modules/content/" xmlns:dc="http://purl.org/dc/elements/1.1/">
+  <channel>
+    <title>{escape(FEED_TITLE)}</title>
+    <link>{SITE_URL}/</link>
+    <description>{escape(FEED_DESCRIPTION)}</description>
+    <language>zh-cn</language>
+    <lastBuildDate>{build_date}</lastBuildDate>
+    <atom:link href="{SITE_URL}/rss.xml" rel="self" type="application/rss+xml"/>
+    <copyright>筑居思 © 2025</copyright>
+    <image>
+      <url>{FEED_ICON}</url>
+      <title>筑居思</title>
+      <link>{SITE_URL}/</link>
+    </image>
+    <managingEditor>{FEED_EMAIL} ({FEED_AUTHOR})</managingEditor>
+    <webMaster>{FEED_EMAIL} ({FEED_AUTHOR})</webMaster>
+    <generator>筑居思 RSS Generator (scripts/build_feeds.py)</generator>
+    <ttl>{FEED_TTL}</ttl>
+{body}
+  </channel>
+</rss>
+'''
+
+
+def render_atom(items: List[Dict], updated: str) -> str:
+    entries = []
+    for item in items:
+        categories = ''.join(f'\n    <category term="{escape(tag)}"/>' for tag in item['tags'])
+        entries.append(f'''  <entry>
+    <title>{escape(item['title'])}</title>
+    <link rel="alternate" type="text/html" href="{escape(item['url'])}"/>
+    <id>{escape(item['url'])}</id>
+    <published>{item['date'].isoformat()}</published>
+    <updated>{item['date'].isoformat()}</updated>
+    <summary>{escape(item['summary'])}</summary>{categories}
+    <content type="html">{escape(item['content_html'])}</content>
+  </entry>''')
+    body = '\n'.join(entries)
+    return f'''<?xml version="1.0" encoding="UTF-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom" xml:lang="zh-CN">
+  <title>{escape(FEED_TITLE)}</title>
+  <subtitle>{escape(FEED_DESCRIPTION)}</subtitle>
+  <link rel="alternate" type="text/html" href="{SITE_URL}/"/>
+  <link rel="self" type="application/atom+xml" href="{SITE_URL}/atom.xml"/>
+  <id>{SITE_URL}/</id>
+  <updated>{updated}</updated>
+  <author>
+    <name>{FEED_AUTHOR}</name>
+    <email>{FEED_EMAIL}</email>
+  </author>
+  <icon>{FEED_ICON}</icon>
+  <generator>筑居思 Feed Generator (scripts/build_feeds.py)</generator>
+{body}
+</feed>
+'''
+
+
+def render_json_feed(items: List[Dict]) -> str:
+    feed = {
+        'version': 'https://jsonfeed.org/version/1.1',
+        'title': FEED_TITLE,
+        'home_page_url': f'{SITE_URL}/',
+        'feed_url': f'{SITE_URL}/feed.json',
+        'description': FEED_DESCRIPTION,
+        'icon': FEED_ICON,
+        'language': 'zh-CN',
+        'authors': [{'name': FEED_AUTHOR}],
+        'items': [{
+            'id': item['url'],
+            'url': item['url'],
+            'title': item['title'],
+            'summary': item['summary'],
+            'content_html': item['content_html'],
+            'date_published': item['date'].isoformat(),
+            'tags': item['tags'],
+            **({'image': item['image']} if item['image'] else {}),
+        } for item in items],
+    }
+    return json.dumps(feed, ensure_ascii=False, indent=2) + '\n'
+
+
+# ---- 写入 ----
+
+def write_feed(path: Path, render: Callable[[Optional[str]], str], stamp_pattern: Optional[re.Pattern],
+               now: str) -> bool:
+    """
+    沿用现有文件的时间戳渲染，与现有内容一致时不写入；否则用 now 作为新的时间戳写回
+    render 接收时间戳（不需要时间戳的格式传入 None 也可）
+    """
+    old = path.read_text(encoding='utf-8') if path.exists() else None
+    stamp = None
+    if old is not None and stamp_pattern is not None:
+        match = stamp_pattern.search(old)
+        stamp = match.group(1) if match else None
+    if old is not None and (stamp_pattern is None or stamp):
+        if render(stamp) == old:
+            return False
+    path.write_text(render(now), encoding='utf-8')
+    return True
+
+
+def build() -> Dict[str, bool]:
+    """生成三种订阅源，返回 文件名 -> 是否写入"""
+    items = collect_items()
+    now = datetime.now(TIMEZONE).replace(microsecond=0)
+    results = {
+        RSS_FILE.name: write_feed(RSS_FILE, lambda stamp: render_rss(items, stamp), RSS_BUILD_DATE,
+                                  format_datetime(now)),
+        ATOM_FILE.name: write_feed(ATOM_FILE, lambda stamp: render_atom(items, stamp), ATOM_UPDATED,
+                                   now.isoformat()),
+        JSON_FEED_FILE.name: write_feed(JSON_FEED_FILE, lambda stamp: render_json_feed(items), None, ''),
+    }
+    changed = [name for name, written in results.items() if written]
+    if changed:
+        print(f"✓ 订阅源: {len(items)} 篇文章，已更新 {', '.join(changed)}")
+    else:
+        print(f"⊘ 订阅源未变化（{len(items)} 篇文章）")
+    return results
+
+
+def main():
+    build()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+增量构建清单
+记录每篇笔记上一次转换时的内容哈希、引用到的图片和模板版本，
+内容、图片和模板都没有变化时，MarkdownConverter.convert 可以直接跳过
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional
+
+SCRIPT_DIR = Path(__file__).parent
+MANIFEST_FILE = SCRIPT_DIR / 'build_manifest.json'
+
+# 清单格式版本，结构变化时递增，旧清单会被整体丢弃
+MANIFEST_VERSION = 1
+
+
+def hash_text(text: str) -> str:
+    """计算文本的SHA-256哈希"""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def file_signature(path) -> Optional[List]:
+    """返回文件的 [mtime_ns, size] 签名，文件不存在时返回None"""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return [st.st_mtime_ns, st.st_size]
+
+
+class BuildManifest:
+    """以笔记路径为键的持久化构建清单"""
+
+    def __init__(self, path=None):
+        self.path = Path(path) if path else MANIFEST_FILE
+        self.entries: Dict[str, dict] = {}
+        self.dirty = False
+        self.load()
+
+    @staticmethod
+    def key_for(markdown_path) -> str:
+        """笔记路径统一转换为绝对路径作为键"""
+        return str(Path(markdown_path).expanduser().resolve())
+
+    def load(self):
+        """加载清单，格式不兼容或损坏时从空清单开始"""
+        if not self.path.exists():
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get('version') == MANIFEST_VERSION:
+            self.entries = data.get('notes', {})
+
+    def save(self):
+        """有改动时写回清单"""
+        if not self.dirty:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix('.json.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': MANIFEST_VERSION, 'notes': self.entries},
+                      f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.path)
+        self.dirty = False
+
+    def get(self, markdown_path) -> Optional[dict]:
+        return self.entries.get(self.key_for(markdown_path))
+
+    def is_fresh(self, markdown_path, source_hash: str, template_version: str,
+                 output_dir: Path, resolve: Optional[Callable[[str], object]] = None) -> Optional[dict]:
+        """
+        判断笔记是否无需重新渲染
+        内容哈希、模板版本一致，输出文件仍在，且引用的图片源文件签名未变时返回上次的结果
+        输出文件取条目中记录的实际路径；旧条目没有记录时按 output_dir / 文件名 查找
+        上次没找到的图片（签名为 None）用 resolve(图片引用) 重新查找，现在能找到时需要重新渲染
+        """
+        entry = self.get(markdown_path)
+        if not entry:
+            return None
+        if entry.get('source_hash') != source_hash:
+            return None
+        if entry.get('template_version') != template_version:
+            return None
+        result = entry.get('result') or {}
+        filename = result.get('filename')
+        output = entry.get('output') or (filename and str(Path(output_dir) / filename))
+        if not output or not Path(output).exists():
+            return None
+        for image_path, signature in entry.get('images', {}).items():
+            if signature is None:
+                if resolve(image_path) if resolve else file_signature(image_path):
+                    return None
+            elif file_signature(image_path) != signature:
+                return None
+        return result
+
+    def record(self, markdown_path, source_hash: str, template_version: str,
+               images: Iterable, result: dict, fragment: Optional[str] = None, output=None,
+               missing: Iterable[str] = ()):
+        """
+        记录一次成功的转换；fragment 为正文片段缓存的键，output 为实际写入的页面路径，
+        missing 为没有找到源文件的图片引用（以 None 签名记录）
+        """
+        signatures = {str(p): None for p in missing}
+        signatures.update((str(p), file_signature(p)) for p in images)
+        self.entries[self.key_for(markdown_path)] = {
+            'source_hash': source_hash,
+            'template_version': template_version,
+            'output': str(Path(output).resolve()) if output else None,
+            'images': dict(sorted(signatures.items())),
+            'result': result,
+            'fragment': fragment,
+        }
+        self.dirty = True
+
+    def fragments(self) -> set:
+        """清单中仍被引用的正文片段键"""
+        return {entry['fragment'] for entry in self.entries.values() if entry.get('fragment')}
+
+    def update_entry(self, key: str, entry: dict):
+        """合并其他进程产生的清单条目（批量转换时使用）"""
+        self.entries[key] = entry
+        self.dirty = True
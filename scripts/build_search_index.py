@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+静态搜索索引生成
+构建时遍历一次生成好的页面，输出按词项前缀分片的倒排索引（search/ 目录），
+js/search.js 只下载查询词所在的分片，不再在浏览器里逐页抓取和解析
+
+分词规则（与 js/search.js 保持一致）：
+- 中日韩文字：相邻两字组成二元词（bigram），单字成段时保留单字
+- 拉丁字母和数字：连续的字母数字作为一个词，统一小写
+
+用法：
+  python3 scripts/build_search_index.py
+"""
+
+import json
+import re
+import sys
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+sys.path.insert(0, str(Path(__file__).parent))
+from html_extract import clean_title, extract_file
+
+SCRIPT_DIR = Path(__file__).parent
+SITE_ROOT = SCRIPT_DIR.parent
+BLOGS_DIR = SITE_ROOT / 'blogs'
+EXHIBITS_DIR = SITE_ROOT / 'exhibits'
+SEARCH_DIR = SITE_ROOT / 'search'
+
+# 索引格式版本，js/search.js 会校验
+INDEX_VERSION = 1
+
+# 页面类型权重（与原先 search.js 中的配置一致）
+TYPE_WEIGHTS = {'blog': 1.5, 'exhibit': 1.0, 'portfolio': 1.0, 'page': 1.0}
+OTHER_PAGES = [
+    ('index.html', 'page'),
+    ('blogs.html', 'page'),
+    ('portfolio.html', 'portfolio'),
+    ('cabinet.html', 'page'),
+]
+
+# 字段得分：关键词 > 标题 > 描述；正文按出现次数计分，最多计10次
+FIELD_SCORES = {'keywords': 15, 'title': 10, 'description': 5}
+MAX_BODY_HITS = 10
+EXCERPT_LENGTH = 120
+# 单个分片的目标大小（字节，未压缩）
+SHARD_TARGET = 8 * 1024
+
+CJK_RUN = re.compile(r'[㐀-䶿一-鿿豈-﫿぀-ヿ가-힯]+')
+WORD = re.compile(r'[a-z0-9]+')
+
+
+def tokenize(text: str) -> List[str]:
+    """按索引规则切分文本，返回词项列表（含重复）"""
+    text = text.lower()
+    tokens = WORD.findall(text)
+    for run in CJK_RUN.findall(text):
+        if len(run) == 1:
+            tokens.append(run)
+        else:
+            tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+    return tokens
+
+
+def term_path(term: str) -> str:
+    """
+    词项在分片树中的路径：拉丁字母和数字就是词本身，
+    中日韩二元词为 "_" 加两个字的四位十六进制码位（如 "禅修" -> "_79854fee"）
+    分片键是路径的前缀，取索引中存在的最长前缀所对应的分片
+    """
+    if term[0] < '\x80':
+        return term
+    return '_' + ''.join(f'{ord(c):04x}' for c in term)
+
+
+def split_shards(index: Dict[str, list]) -> Dict[str, Dict[str, list]]:
+    """
+    按路径前缀切分分片：从最短前缀开始，超过 SHARD_TARGET 字节的分片再按下一位继续细分，
+    常用字开头的词多，会被切得更细，生僻字则合并在较粗的分片里
+    """
+    paths = {term: term_path(term) for term in index}
+    pending = {}
+    for term, path in paths.items():
+        key = path[:3] if path.startswith('_') else path[:1]
+        pending.setdefault(key, []).append(term)
+
+    shards: Dict[str, Dict[str, list]] = {}
+    while pending:
+        key, terms = pending.popitem()
+        shard = {term: index[term] for term in terms}
+        if len(json.dumps(shard, ensure_ascii=False, separators=(',', ':')).encode('utf-8')) <= SHARD_TARGET:
+            shards[key] = shard
+            continue
+        # 路径恰好等于当前键的词留在本分片，其余按下一位细分
+        stay = {}
+        children: Dict[str, list] = {}
+        for term in terms:
+            path = paths[term]
+            if len(path) == len(key):
+                stay[term] = index[term]
+            else:
+                children.setdefault(path[:len(key) + 1], []).append(term)
+        if stay:
+            shards[key] = stay
+        pending.update(children)
+    return shards
+
+
+def collect_pages() -> List[Tuple[Path, str]]:
+    pages = [(p, 'blog') for p in sorted(BLOGS_DIR.glob('*.html'))]
+    pages += [(p, 'exhibit') for p in sorted(EXHIBITS_DIR.glob('*.html'))]
+    pages += [(SITE_ROOT / name, page_type) for name, page_type in OTHER_PAGES]
+    return [(p, t) for p, t in pages if p.exists()]
+
+
+def parse_page(path: Path) -> dict:
+    """正文取 <body> 中除导航、页眉页脚、侧边栏外的全部文字"""
+    page = extract_file(path)
+    return {
+        'title': clean_title(page['title']),
+        'description': page['meta'].get('description', ''),
+        'keywords': page['meta'].get('keywords', ''),
+        'body': page['body'],
+    }
+
+
+def build_index(pages: List[Tuple[Path, str]]):
+    """返回 (文档列表, 词项 -> [[文档序号, 得分], ...])"""
+    docs = []
+    postings: Dict[str, Dict[int, float]] = {}
+
+    for path, page_type in pages:
+        page = parse_page(path)
+        if len(page['body']) < 20:
+            print(f"  ⊘ 内容太短，跳过: {path.relative_to(SITE_ROOT)}")
+            continue
+
+        doc_id = len(docs)
+        weight = TYPE_WEIGHTS[page_type]
+        docs.append({
+            'u': path.relative_to(SITE_ROOT).as_posix(),
+            't': page['title'],
+            'd': page['description'] or page['body'][:EXCERPT_LENGTH],
+            'y': page_type,
+        })
+
+        scores: Dict[str, float] = {}
+        for field, field_score in FIELD_SCORES.items():
+            for term in set(tokenize(page[field])):
+                scores[term] = scores.get(term, 0) + field_score
+        counts: Dict[str, int] = {}
+        for term in tokenize(page['body']):
+            counts[term] = counts.get(term, 0) + 1
+        for term, count in counts.items():
+            scores[term] = scores.get(term, 0) + min(count, MAX_BODY_HITS)
+
+        for term, score in scores.items():
+            postings.setdefault(term, {})[doc_id] = round(score * weight, 1)
+
+    index = {term: sorted(([d, s] for d, s in docs_scores.items()), key=lambda p: (-p[1], p[0]))
+             for term, docs_scores in postings.items()}
+    return docs, index
+
+
+def write_if_changed(path: Path, data) -> bool:
+    content = json.dumps(data, ensure_ascii=False, separators=(',', ':'), sort_keys=True)
+    if path.exists() and path.read_text(encoding='utf-8') == content:
+        return False
+    path.write_text(content, encoding='utf-8')
+    return True
+
+
+def build(output_dir: Path = SEARCH_DIR) -> Dict[str, int]:
+    """生成 meta.json 和分片文件，返回 {文件名: 字节数}"""
+    docs, index = build_index(collect_pages())
+
+    shards = split_shards(index)
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    sizes = {}
+    changed = 0
+    meta = {'version': INDEX_VERSION, 'docs': docs, 'shards': sorted(shards)}
+    changed += write_if_changed(output_dir / 'meta.json', meta)
+    for key, terms in shards.items():
+        changed += write_if_changed(output_dir / f'{key}.json', terms)
+
+    # 清理已没有词项的旧分片
+    for old in output_dir.glob('*.json'):
+        if old.stem != 'meta' and old.stem not in shards:
+            old.unlink()
+            changed += 1
+
+    for path in output_dir.glob('*.json'):
+        sizes[path.name] = path.stat().st_size
+    print(f"✓ 搜索索引: {len(docs)} 个页面, {len(index)} 个词项, {len(shards)} 个分片"
+          f"（{changed} 个文件有变化）")
+    return sizes
+
+
+def main():
+    sizes = build()
+    shard_sizes = [s for name, s in sizes.items() if name != 'meta.json']
+    if shard_sizes:
+        print(f"  meta.json: {sizes['meta.json'] / 1024:.1f} KB; "
+              f"分片平均 {sum(shard_sizes) / len(shard_sizes) / 1024:.1f} KB, "
+              f"最大 {max(shard_sizes) / 1024:.1f} KB, 合计 {sum(shard_sizes) / 1024:.1f} KB")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+站点地图生成
+枚举实际生成的页面（根目录页面、blogs/、archive/、exhibits/），写出 sitemap.xml；
+跳转页（meta refresh）、noindex 页面和 canonical 指向别处的页面不收录
+
+lastmod 取自正文实质内容的哈希（post_catalog.content_hash），而不是文件修改时间：
+只改关键词、样式链接或批量补「灵感私语」尾注的页面哈希不变，lastmod 保持原值，
+爬虫只会重新抓取内容真正变化的页面
+
+哈希和 lastmod 记录在 scripts/sitemap_manifest.json；记录缺失时（首次运行、换了机器）
+沿用现有 sitemap.xml 中的 lastmod、changefreq 和 priority，手工调整过的值也会保留下来。
+文章改名后，新文件名会继承正文哈希相同的旧页面的 lastmod
+
+用法：
+  python3 scripts/build_sitemap.py
+"""
+
+import json
+import os
+import sys
+import xml.etree.ElementTree as ET
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, List
+from urllib.parse import quote, unquote, urljoin
+
+SCRIPT_DIR = Path(__file__).parent
+SITE_ROOT = SCRIPT_DIR.parent
+SITEMAP_FILE = SITE_ROOT / 'sitemap.xml'
+MANIFEST_FILE = SCRIPT_DIR / 'sitemap_manifest.json'
+
+sys.path.insert(0, str(SCRIPT_DIR))
+from html_extract import extract_file
+from post_catalog import content_hash, load_posts
+
+SITE_URL = 'https://thinkingleaf.space'
+# 清单格式或哈希规则变化时递增
+SITEMAP_VERSION = 1
+# 文章日期按北京时间计
+TIMEZONE = timezone(timedelta(hours=8))
+SITEMAP_NS = 'http://www.sitemaps.org/schemas/sitemap/0.9'
+
+# 根目录下不对外的页面（模板、工具页、示例）
+EXCLUDED_PAGES = {'404.html', 'template.html', 'upload-images.html', 'whisper-example.html', '灵魂配图代码模板.html'}
+# 收录其中 *.html 的子目录（blogs/ 的文章来自文章目录），按此顺序分组输出
+SECTIONS = [
+    ('', '主要页面'),
+    ('blogs', '博客文章'),
+    ('archive', '归档页'),
+    ('exhibits', '展品页面'),
+]
+# 现有 sitemap.xml 中没有对应条目时的 changefreq / priority
+PAGE_DEFAULTS = {
+    'index.html': ('weekly', '1.0'),
+    'blogs.html': ('daily', '0.9'),
+}
+SECTION_DEFAULTS = {
+    '': ('monthly', '0.7'),
+    'blogs': ('yearly', '0.7'),
+    'archive': ('weekly', '0.5'),
+    'exhibits': ('monthly', '0.7'),
+}
+
+
+def page_url(relative: str) -> str:
+    if relative == 'index.html':
+        return f'{SITE_URL}/'
+    return f'{SITE_URL}/{quote(relative)}'
+
+
+def today() -> str:
+    return datetime.now(TIMEZONE).date().isoformat()
+
+
+# ---- 页面枚举 ----
+
+def indexable(page: dict, url: str) -> bool:
+    """跳转页、noindex 页面和 canonical 指向其他地址的页面不进入站点地图"""
+    if 'refresh' in page['meta']:
+        return False
+    if 'noindex' in page['meta'].get('robots', '').lower():
+        return False
+    if page['canonical'] and unquote(urljoin(url, page['canonical'])) != unquote(url):
+        return False
+    return True
+
+
+def scan_pages(section: str, cached: Dict[str, dict]) -> Dict[str, dict]:
+    """
+    根目录或子目录下的页面：相对路径 -> {mtime_ns, size, hash, index}
+    mtime 和大小与清单一致的页面不重新解析
+    """
+    directory = SITE_ROOT / section if section else SITE_ROOT
+    pages = {}
+    for html_file in sorted(directory.glob('*.html')):
+        if html_file.name.startswith('.') or (not section and html_file.name in EXCLUDED_PAGES):
+            continue
+        relative = html_file.relative_to(SITE_ROOT).as_posix()
+        st = html_file.stat()
+        old = cached.get(relative)
+        if old and old.get('mtime_ns') == st.st_mtime_ns and old.get('size') == st.st_size:
+            pages[relative] = {key: old[key] for key in ('mtime_ns', 'size', 'hash', 'index')}
+            continue
+        page = extract_file(html_file)
+        pages[relative] = {
+            'mtime_ns': st.st_mtime_ns,
+            'size': st.st_size,
+            'hash': content_hash(page),
+            'index': indexable(page, page_url(relative)),
+        }
+    return pages
+
+
+def collect_pages(cached: Dict[str, dict]) -> tuple:
+    """
+    返回 (分组 -> [{path, hash, date, scan}], 不收录页面的解析结果)
+    文章按发布日期从新到旧，其余按文件名（首页在最前）
+    """
+    sections = {}
+    skipped = {}
+    for section, _ in SECTIONS:
+        if section == 'blogs':
+            sections[section] = [{'path': f"blogs/{post['filename']}", 'hash': post['content_hash'],
+                                  'date': post['date'], 'scan': {}} for post in load_posts()]
+            continue
+        pages = scan_pages(section, cached)
+        sections[section] = [{'path': relative, 'hash': info['hash'], 'date': None, 'scan': info}
+                             for relative, info in pages.items() if info['index']]
+        skipped.update((relative, info) for relative, info in pages.items() if not info['index'])
+    sections[''].sort(key=lambda page: (page['path'] != 'index.html', page['path']))
+    return sections, skipped
+
+
+# ---- 历史记录 ----
+
+def load_manifest() -> Dict[str, dict]:
+    if not MANIFEST_FILE.exists():
+        return {}
+    try:
+        with open(MANIFEST_FILE, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return data.get('pages', {}) if data.get('version') == SITEMAP_VERSION else {}
+
+
+def save_manifest(pages: Dict[str, dict]):
+    tmp_path = MANIFEST_FILE.with_suffix('.json.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({'version': SITEMAP_VERSION, 'pages': pages}, f, ensure_ascii=False, indent=2, sort_keys=True)
+    os.replace(tmp_path, MANIFEST_FILE)
+
+
+def load_existing_sitemap() -> Dict[str, dict]:
+    """现有 sitemap.xml：解码后的地址 -> {lastmod, changefreq, priority}"""
+    if not SITEMAP_FILE.exists():
+        return {}
+    try:
+        root = ET.parse(SITEMAP_FILE).getroot()
+    except (OSError, ET.ParseError):
+        return {}
+    entries = {}
+    for url in root.iter(f'{{{SITEMAP_NS}}}url'):
+        fields = {child.tag.split('}')[-1]: (child.text or '').strip() for child in url}
+        if fields.get('loc'):
+            entries[unquote(fields['loc'])] = fields
+    return entries
+
+
+# ---- 渲染 ----
+
+def render_sitemap(sections: Dict[str, List[dict]]) -> str:
+    lines = [
+        '<?xml version="1.0" encoding="UTF-8"?>',
+        f'<urlset xmlns="{SITEMAP_NS}"',
+        '        xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance"',
+        f'        xsi:schemaLocation="{SITEMAP_NS}',
+        f'        {SITEMAP_NS}/sitemap.xsd">',
+    ]
+    for section, label in SECTIONS:
+        if not sections[section]:
+            continue
+        lines.append(f'  <!-- {label} -->')
+        for page in sections[section]:
+            lines.extend([
+                '  <url>',
+                f"    <loc>{page_url(page['path'])}</loc>",
+                f"    <lastmod>{page['lastmod']}</lastmod>",
+                f"    <changefreq>{page['changefreq']}</changefreq>",
+                f"    <priority>{page['priority']}</priority>",
+                '  </url>',
+            ])
+    lines.append('</urlset>')
+    return '\n'.join(lines) + '\n'
+
+
+def build() -> Dict[str, int]:
+    """生成 sitemap.xml，返回 {'pages': 收录数, 'changed': lastmod 更新数, 'written': 是否写入}"""
+    manifest = load_manifest()
+    existing = load_existing_sitemap()
+    sections, skipped = collect_pages(manifest)
+    now = today()
+
+    current = {page['path'] for section, _ in SECTIONS for page in sections[section]}
+    # 已消失页面的 正文哈希 -> lastmod，用于改名后的文章继承
+    vanished = {entry['hash']: entry['lastmod'] for path, entry in manifest.items()
+                if path not in current and entry.get('lastmod')}
+
+    pages = {}
+    changed = 0
+    for section, _ in SECTIONS:
+        for page in sections[section]:
+            path = page['path']
+            url = page_url(path)
+            old = manifest.get(path)
+            seed = existing.get(unquote(url), {})
+            if old and old.get('lastmod') and old['hash'] == page['hash']:
+                lastmod = old['lastmod']
+            elif not old and page['hash'] in vanished:
+                lastmod = vanished[page['hash']]
+            elif not old and seed.get('lastmod'):
+                lastmod = seed['lastmod']
+            elif not old and page['date']:
+                lastmod = page['date']
+            else:
+                lastmod = now
+                changed += 1
+            changefreq, priority = PAGE_DEFAULTS.get(path) or SECTION_DEFAULTS[section]
+            page['lastmod'] = lastmod
+            page['changefreq'] = seed.get('changefreq') or changefreq
+            page['priority'] = seed.get('priority') or priority
+            pages[path] = {**page['scan'], 'hash': page['hash'], 'lastmod': lastmod}
+    # 不收录的页面也记下解析结果，下次不必重新解析
+    pages.update(skipped)
+
+    if pages != manifest:
+        save_manifest(pages)
+
+    content = render_sitemap(sections)
+    old_content = SITEMAP_FILE.read_text(encoding='utf-8') if SITEMAP_FILE.exists() else None
+    written = content != old_content
+    if written:
+        SITEMAP_FILE.write_text(content, encoding='utf-8')
+
+    total = len(current)
+    if written:
+        print(f"✓ 站点地图: {total} 个页面，{changed} 个页面的 lastmod 更新为今天")
+    else:
+        print(f"⊘ 站点地图未变化（{total} 个页面）")
+    return {'pages': total, 'changed': changed, 'written': int(written)}
+
+
+def main():
+    build()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
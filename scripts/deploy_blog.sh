@@ -102,6 +102,26 @@ python3 "$SCRIPT_DIR/update_blogs_list.py"
 
 echo -e "${GREEN}✓ 博客列表已更新${NC}\n"
 
+echo -e "${BLUE}2.1 生成搜索索引...${NC}"
+python3 "$SCRIPT_DIR/build_search_index.py"
+
+echo -e "${GREEN}✓ 搜索索引已更新${NC}\n"
+
+echo -e "${BLUE}2.2 计算相关文章...${NC}"
+python3 "$SCRIPT_DIR/related_articles.py"
+
+echo -e "${GREEN}✓ 相关文章已更新${NC}\n"
+
+echo -e "${BLUE}2.3 生成订阅源...${NC}"
+python3 "$SCRIPT_DIR/build_feeds.py"
+
+echo -e "${GREEN}✓ 订阅源已更新${NC}\n"
+
+echo -e "${BLUE}2.4 生成站点地图...${NC}"
+python3 "$SCRIPT_DIR/build_sitemap.py"
+
+echo -e "${GREEN}✓ 站点地图已更新${NC}\n"
+
 echo -e "${BLUE}3. 检查Git状态...${NC}"
 cd "$SITE_ROOT"
 
@@ -6,6 +6,7 @@
 """
 
 import re
+import sys
 import json
 from pathlib import Path
 from typing import Dict, Tuple, List
@@ -14,6 +15,9 @@ SITE_ROOT = Path(__file__).parent.parent
 BLOGS_DIR = SITE_ROOT / 'blogs'
 MAPPING_FILE = Path(__file__).parent / 'title_slug_mapping.json'
 
+sys.path.insert(0, str(Path(__file__).parent))
+from reference_index import rewrite_references
+
 
 def slugify(text: str) -> str:
     """将中文标题转换为英文slug"""
@@ -115,29 +119,7 @@ def update_references(renames: List[Tuple[Path, Path]]):
         return
     
     print("\n更新文件引用...")
-    pairs = [(f"blogs/{old.name}", f"blogs/{new.name}") for old, new in renames]
-    
-    updated_files = []
-    for path in SITE_ROOT.rglob('*'):
-        if not path.is_file():
-            continue
-        if path.suffix.lower() not in {'.html', '.xml', '.json'}:
-            continue
-        if path in [old for old, _ in renames]:
-            continue
-        
-        try:
-            text = path.read_text(encoding='utf-8')
-        except Exception:
-            continue
-        
-        orig = text
-        for old_ref, new_ref in pairs:
-            text = text.replace(old_ref, new_ref)
-        
-        if text != orig:
-            path.write_text(text, encoding='utf-8')
-            updated_files.append(path.relative_to(SITE_ROOT))
+    updated_files = [path.relative_to(SITE_ROOT) for path in rewrite_references(renames)]
     
     if updated_files:
         print(f"  ✓ 已更新 {len(updated_files)} 个文件的引用")
@@ -190,6 +172,11 @@ def main():
     # 更新引用
     if success_count > 0:
         update_references(renames)
+        # 相关文章数据（window.relatedArticles）用的是不带 blogs/ 的文件名，重新计算；再重新生成站点地图
+        import related_articles
+        import build_sitemap
+        related_articles.build()
+        build_sitemap.build()
     
     return 0
 
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+正文片段缓存
+保存 Python-Markdown 渲染出的正文 HTML，键为「处理过图片路径的 Markdown 文本 + 扩展配置」的哈希，
+与页面布局无关：只改模板（页脚、样式链接等）时，未改动的笔记直接复用片段，不再解析 Markdown
+
+每个片段单独存为 scripts/fragment_cache/<哈希>.html，写入用临时文件 + os.replace，
+批量转换时多个工作进程可以同时读写
+"""
+
+import hashlib
+import os
+from pathlib import Path
+from typing import Iterable, Optional
+
+SCRIPT_DIR = Path(__file__).parent
+FRAGMENT_DIR = SCRIPT_DIR / 'fragment_cache'
+
+# 片段格式版本，缓存内容的含义变化时递增
+FRAGMENT_VERSION = 1
+
+
+class FragmentCache:
+    """以内容哈希为键的正文 HTML 缓存"""
+
+    def __init__(self, config_key: str = '', directory=None):
+        """config_key 描述渲染方式（扩展列表、扩展配置、Markdown 版本），参与每个键的计算"""
+        self.directory = Path(directory) if directory else FRAGMENT_DIR
+        self.config_key = config_key
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, text: str) -> str:
+        payload = f'{FRAGMENT_VERSION}\0{self.config_key}\0{text}'
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f'{key}.html'
+
+    def get(self, key: str) -> Optional[str]:
+        try:
+            html = self._path(key).read_text(encoding='utf-8')
+        except OSError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return html
+
+    def put(self, key: str, html: str):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self._path(key)
+        tmp_path = path.with_name(f'{key}.{os.getpid()}.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(html)
+        os.replace(tmp_path, path)
+
+    def prune(self, keep: Iterable[str]) -> int:
+        """删除不在 keep 中的片段（笔记改动后留下的旧版本），返回删除数"""
+        if not self.directory.exists():
+            return 0
+        keep = set(keep)
+        removed = 0
+        for path in self.directory.iterdir():
+            if path.suffix in ('.html', '.tmp') and path.stem not in keep:
+                path.unlink()
+                removed += 1
+        return removed
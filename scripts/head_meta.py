@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+<head> 元数据单遍改写
+只定位一次 <head> 区间并把其中的 <title>、<meta>、<link> 解析为列表，
+所有修改（替换或在指定标签后插入）累积后一次性拼回，<head> 之外的内容原样保留；
+内容没有变化时 render() 返回原文，调用方据此跳过写文件
+同一个键出现多次（如页面里有两组 og:*、twitter:* 标签）时，替换会写到每一处
+
+用法：
+  head = HeadMeta(html)
+  head.set_title('标题 - 筑居思')
+  head.set('description', '简介', after=['title'])
+  head.set('og:title', '标题 - 筑居思', only_existing=True)
+  new_html = head.render()
+"""
+
+import re
+from html import unescape
+from typing import Dict, List, Optional
+
+HEAD_OPEN = re.compile(r'<head\b[^>]*>', re.IGNORECASE)
+HEAD_CLOSE = re.compile(r'</head\s*>', re.IGNORECASE)
+HEAD_ITEM = re.compile(r'<title\b[^>]*>.*?</title\s*>|<meta\b[^>]*>|<link\b[^>]*>', re.IGNORECASE | re.DOTALL)
+ATTR = re.compile(r'([\w:-]+)\s*=\s*("[^"]*"|\'[^\']*\'|[^\s>]+)')
+# 新插入的标签放在锚点标签之后，换行并缩进
+INDENT = '\n    '
+
+
+def parse_attrs(tag: str) -> Dict[str, str]:
+    attrs = {}
+    for name, value in ATTR.findall(tag):
+        if value[:1] in ('"', "'"):
+            value = value[1:-1]
+        attrs.setdefault(name.lower(), unescape(value))
+    return attrs
+
+
+def meta_attr(key: str) -> str:
+    """Open Graph 和 article:* 使用 property 属性，其余（description、twitter:* 等）使用 name"""
+    return 'property' if key.startswith(('og:', 'article:')) else 'name'
+
+
+class HeadMeta:
+    """一个页面 <head> 中元数据标签的可编辑视图"""
+
+    def __init__(self, html: str):
+        self.html = html
+        open_match = HEAD_OPEN.search(html)
+        close_match = HEAD_CLOSE.search(html, open_match.end()) if open_match else None
+        self.found = bool(open_match and close_match)
+        if self.found:
+            self.start, self.end = open_match.end(), close_match.start()
+        else:
+            self.start = self.end = 0
+
+        # [键, 起点, 终点, 属性]：<title> 的键为 'title'，<meta> 为 name/property，<link> 为 'link:rel'
+        self.items: List[list] = []
+        # 键 -> 该键所有标签在 items 中的下标（重复的 og:*、twitter:* 标签都会被改写）
+        self.keys: Dict[str, List[int]] = {}
+        for m in HEAD_ITEM.finditer(html, self.start, self.end):
+            tag = m.group(0)
+            if tag[:6].lower() == '<title':
+                key, attrs = 'title', {}
+            else:
+                attrs = parse_attrs(tag[:tag.index('>') + 1])
+                if tag[:5].lower() == '<link':
+                    key = f"link:{attrs.get('rel', '')}"
+                elif 'charset' in attrs:
+                    key = 'charset'
+                else:
+                    key = attrs.get('name') or attrs.get('property') or ''
+            self.items.append([key, m.start(), m.end(), attrs])
+            if key:
+                self.keys.setdefault(key, []).append(len(self.items) - 1)
+
+        self._replace: Dict[int, str] = {}
+        # 锚点键 -> 依次插入在其后的 (键, 标签)
+        self._insert: Dict[str, List[tuple]] = {}
+
+    # ---- 读取 ----
+
+    def has(self, key: str) -> bool:
+        return key in self.keys or any(key == k for group in self._insert.values() for k, _ in group)
+
+    def get(self, key: str) -> Optional[str]:
+        """meta 的 content、<title> 文本或 <link> 的 href（已解码实体），不存在返回 None"""
+        if key not in self.keys:
+            return None
+        _, start, end, attrs = self.items[self.keys[key][0]]
+        if key == 'title':
+            inner = self.html[start:end]
+            return unescape(inner[inner.index('>') + 1:inner.rindex('<')].strip())
+        return attrs.get('href') if key.startswith('link:') else attrs.get('content')
+
+    # ---- 修改（值均为已转义的 HTML 文本）----
+
+    def set_title(self, text: str):
+        self._put('title', f'<title>{text}</title>', ['charset'])
+
+    def set(self, key: str, content: str, after: Optional[List[str]] = None, only_existing=False):
+        """
+        设置 meta 标签：已存在时整体替换为规范写法，否则插入到 after 中第一个存在的键之后
+        only_existing=True 时只更新已有标签，不新增
+        """
+        if only_existing and not self.has(key):
+            return
+        self._put(key, f'<meta {meta_attr(key)}="{key}" content="{content}">', after)
+
+    def _put(self, key: str, tag: str, after: Optional[List[str]]):
+        if key in self.keys:
+            for index in self.keys[key]:
+                self._replace[index] = tag
+            return
+        for group in self._insert.values():
+            for i, (k, _) in enumerate(group):
+                if k == key:
+                    group[i] = (key, tag)
+                    return
+        for anchor in after or []:
+            if self.has(anchor):
+                self._insert.setdefault(anchor, []).append((key, tag))
+                return
+
+    # ---- 输出 ----
+
+    def _emit_inserted(self, anchor: str, out: List[str]):
+        for key, tag in self._insert.get(anchor, []):
+            out.append(INDENT + tag)
+            self._emit_inserted(key, out)
+
+    def render(self, tail: Optional[str] = None) -> str:
+        """拼回整页；tail 给出时替换 </head> 之后的内容（供调用方单独修改正文）"""
+        if not self.found:
+            return self.html if tail is None else tail
+        out = [self.html[:self.start]]
+        pos = self.start
+        for index, (key, start, end, _) in enumerate(self.items):
+            out.append(self.html[pos:start])
+            out.append(self._replace.get(index, self.html[start:end]))
+            pos = end
+            # 新标签插在锚点键第一次出现的位置之后
+            if key and self.keys[key][0] == index:
+                self._emit_inserted(key, out)
+        out.append(self.html[pos:self.end])
+        out.append(self.html[self.end:] if tail is None else tail)
+        return ''.join(out)
+
+    @property
+    def tail(self) -> str:
+        """</head> 及之后的原文"""
+        return self.html[self.end:]
@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+单遍 HTML 内容提取
+基于 html.parser 逐块解析页面，一次遍历同时得到标题、meta 标签、正文文本（按段落）、
+小标题、图片、链接、标签和发布时间，供各脚本共用，避免对整篇文档反复跑正则
+
+正文区域按优先级选取：.post-content > .article-body > <article> > <main> > <body>，
+导航、页眉、页脚、侧边栏、脚本和样式会被跳过；文章内的页眉（<article><header>）不计入正文，
+但其中的标题、标签和发布时间照常提取
+
+用法（调试）：
+  python3 scripts/html_extract.py blogs/xxx.html
+"""
+
+import json
+import re
+import sys
+from html.parser import HTMLParser
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# 正文区域，按优先级排列
+CONTENT_REGIONS = ['post-content', 'article-body', 'article', 'main', 'body']
+REGION_TAGS = {'article', 'main', 'body'}
+REGION_CLASSES = ('post-content', 'article-body')
+# 其中的文字不计入正文
+SKIP_TAGS = {'script', 'style', 'noscript', 'template', 'svg', 'nav', 'header', 'footer', 'aside'}
+SKIP_CLASSES = ('sidebar',)
+# 段落边界
+BLOCK_TAGS = {'p', 'div', 'li', 'ul', 'ol', 'blockquote', 'pre', 'tr', 'table', 'section', 'figure',
+              'figcaption', 'article', 'main', 'br', 'hr', 'dd', 'dt', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6'}
+HEADING_TAGS = {'h1': 1, 'h2': 2, 'h3': 3, 'h4': 4, 'h5': 5, 'h6': 6}
+# 流式读取文件时每次送入解析器的字符数
+CHUNK_SIZE = 64 * 1024
+
+WHITESPACE = re.compile(r'\s+')
+
+
+def collapse(text: str) -> str:
+    return WHITESPACE.sub(' ', text).strip()
+
+
+def clean_title(title: str) -> str:
+    """去掉 <title> 中的站点名后缀"""
+    return title.replace(' - 筑居思', '').strip()
+
+
+class PageExtractor(HTMLParser):
+    """
+    增量解析器：可多次 feed()，close() 后通过 result() 取结果
+    skip_links 为 True 时链接（<a href>）内的文字不计入正文（仍记录在 links 中）
+    """
+
+    def __init__(self, skip_links: bool = False):
+        super().__init__(convert_charrefs=True)
+        self.skip_links = skip_links
+        self.title_parts: List[str] = []
+        self.meta: Dict[str, str] = {}
+        self.headings: List[tuple] = []
+        self.images: List[dict] = []
+        self.links: List[dict] = []
+        self.tags: List[str] = []
+        self.time = ''
+        self.canonical = ''
+        self._in_title = False
+        # 区域名 -> [标签名, 同名标签嵌套深度]
+        self._regions: Dict[str, list] = {}
+        self._parts: Dict[str, List[str]] = {name: [] for name in CONTENT_REGIONS}
+        self._blocks: Dict[str, List[str]] = {name: [] for name in CONTENT_REGIONS}
+        self._skip: Optional[list] = None
+        self._header: Optional[list] = None
+        self._heading: Optional[list] = None
+        self._link: Optional[list] = None
+        self._tag_span: Optional[list] = None
+        self._figure_depth = 0
+
+    # ---- 解析回调 ----
+
+    def handle_starttag(self, tag, attrs):
+        if self._skip:
+            if tag == self._skip[0]:
+                self._skip[1] += 1
+            return
+
+        attrs = dict(attrs)
+        classes = (attrs.get('class') or '').split()
+        if tag == 'header' and ('article' in self._regions or 'main' in self._regions):
+            if self._header:
+                self._header[1] += 1
+            else:
+                self._flush()
+                self._header = [tag, 1]
+        elif tag in SKIP_TAGS or any(c in SKIP_CLASSES for c in classes):
+            self._flush()
+            self._skip = [tag, 1]
+            return
+
+        if tag == 'title':
+            self._in_title = True
+        elif tag == 'meta':
+            key = attrs.get('name') or attrs.get('property') or attrs.get('http-equiv')
+            if key and key not in self.meta:
+                self.meta[key] = (attrs.get('content') or '').strip()
+        elif tag == 'link' and 'canonical' in (attrs.get('rel') or '').split() and not self.canonical:
+            self.canonical = (attrs.get('href') or '').strip()
+        elif tag == 'time' and not self.time:
+            self.time = attrs.get('datetime') or ''
+
+        if tag in BLOCK_TAGS:
+            self._flush()
+        for region in self._regions.values():
+            if region[0] == tag:
+                region[1] += 1
+        for name in REGION_CLASSES:
+            if name in classes and name not in self._regions:
+                self._regions[name] = [tag, 1]
+        if tag in REGION_TAGS and tag not in self._regions:
+            self._regions[tag] = [tag, 1]
+
+        if tag in HEADING_TAGS:
+            self._heading = [HEADING_TAGS[tag], []]
+        elif tag == 'a' and attrs.get('href'):
+            self._link = [attrs['href'], []]
+        elif tag == 'span' and 'tag' in classes:
+            self._tag_span = []
+        elif tag == 'figure':
+            self._figure_depth += 1
+        elif tag == 'img' and attrs.get('src'):
+            self.images.append({
+                'src': attrs['src'],
+                'alt': attrs.get('alt') or '',
+                'region': self._innermost_region(),
+                'figure': self._figure_depth > 0,
+            })
+
+    def handle_endtag(self, tag):
+        if self._skip:
+            if tag == self._skip[0]:
+                self._skip[1] -= 1
+                if self._skip[1] == 0:
+                    self._skip = None
+            return
+
+        if tag == 'title':
+            self._in_title = False
+        elif tag == 'header' and self._header:
+            self._header[1] -= 1
+            if self._header[1] == 0:
+                self._header = None
+        elif tag in HEADING_TAGS and self._heading:
+            text = collapse(''.join(self._heading[1]))
+            if text:
+                self.headings.append((self._heading[0], text))
+            self._heading = None
+        elif tag == 'a' and self._link:
+            self.links.append({'href': self._link[0], 'text': collapse(''.join(self._link[1]))})
+            self._link = None
+        elif tag == 'span' and self._tag_span is not None:
+            text = collapse(''.join(self._tag_span))
+            if text:
+                self.tags.append(text)
+            self._tag_span = None
+        elif tag == 'figure' and self._figure_depth:
+            self._figure_depth -= 1
+
+        if tag in BLOCK_TAGS:
+            self._flush()
+        for name in [n for n, region in self._regions.items() if region[0] == tag]:
+            self._regions[name][1] -= 1
+            if self._regions[name][1] == 0:
+                self._flush(name)
+                del self._regions[name]
+
+    def handle_data(self, data):
+        if self._in_title:
+            self.title_parts.append(data)
+        if self._skip:
+            return
+        if self._heading:
+            self._heading[1].append(data)
+        if self._link:
+            self._link[1].append(data)
+        if self._tag_span is not None:
+            self._tag_span.append(data)
+        if self._header or (self._link and self.skip_links):
+            return
+        for name in self._regions:
+            self._parts[name].append(data)
+
+    # ---- 内部工具 ----
+
+    def _innermost_region(self) -> Optional[str]:
+        for name in CONTENT_REGIONS:
+            if name in self._regions:
+                return name
+        return None
+
+    def _flush(self, only: Optional[str] = None):
+        """把各区域当前累积的文字作为一个段落收尾"""
+        for name in ([only] if only else list(self._regions)):
+            parts = self._parts[name]
+            if parts:
+                text = collapse(''.join(parts))
+                if text:
+                    self._blocks[name].append(text)
+                parts.clear()
+
+    # ---- 结果 ----
+
+    def result(self) -> dict:
+        """
+        返回字典：
+          title       <title> 文本（已解码实体、合并空白，未去站点后缀）
+          meta        name/property/http-equiv -> content（同名取第一个）
+          canonical   <link rel="canonical"> 的地址
+          paragraphs  正文区域的段落列表；content 为段落以空格连接的全文
+          region      正文所在区域名（见 CONTENT_REGIONS），没有正文时为 None
+          body        <body> 内除导航、页眉页脚、侧边栏外的全部文字
+          headings    [(级别, 文本)]；h1 为第一个一级标题
+          images      [{src, alt, region, figure}]，links [{href, text}]
+          tags        <span class="tag"> 文本；time 为第一个 <time datetime>
+        """
+        self._flush()
+        region = next((name for name in CONTENT_REGIONS if self._blocks[name]), None)
+        paragraphs = self._blocks[region] if region else []
+        return {
+            'title': collapse(''.join(self.title_parts)),
+            'meta': self.meta,
+            'canonical': self.canonical,
+            'paragraphs': paragraphs,
+            'content': ' '.join(paragraphs),
+            'region': region,
+            'body': ' '.join(self._blocks['body']),
+            'headings': self.headings,
+            'h1': next((text for level, text in self.headings if level == 1), ''),
+            'images': self.images,
+            'links': self.links,
+            'tags': self.tags,
+            'time': self.time,
+        }
+
+
+def extract(html: str, skip_links: bool = False) -> dict:
+    """解析一段 HTML，返回 PageExtractor.result() 的字典"""
+    parser = PageExtractor(skip_links)
+    parser.feed(html)
+    parser.close()
+    return parser.result()
+
+
+def extract_file(path) -> dict:
+    """按块流式读取并解析文件，不在内存中保留整篇文档的副本"""
+    parser = PageExtractor()
+    with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+        while True:
+            chunk = f.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            parser.feed(chunk)
+    parser.close()
+    return parser.result()
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("用法: python3 scripts/html_extract.py <文件.html>")
+        return 1
+    for path in sys.argv[1:]:
+        page = extract_file(Path(path))
+        page['paragraphs'] = page['paragraphs'][:5]
+        page['content'] = page['content'][:200]
+        page['body'] = page['body'][:200]
+        print(json.dumps(page, ensure_ascii=False, indent=2))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
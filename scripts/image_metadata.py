@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+图片元数据清单
+记录网站内每张图片的尺寸、字节数、主色和内容哈希（按 mtime 增量更新），
+并据此为文章中的 <img> 补充 width/height/loading/decoding 属性，避免图片加载时页面跳动
+
+用法：
+  python3 scripts/image_metadata.py                 # 刷新清单并处理 blogs/*.html
+  python3 scripts/image_metadata.py blogs/xxx.html  # 只处理指定页面
+  python3 scripts/image_metadata.py --scan          # 只刷新清单
+"""
+
+import json
+import os
+import re
+import sys
+from pathlib import Path
+from typing import Dict, Optional
+from urllib.parse import unquote
+
+sys.path.insert(0, str(Path(__file__).parent))
+from image_store import IMAGE_EXTENSIONS, ImageStore
+
+try:
+    from PIL import Image
+    PIL_AVAILABLE = True
+except ImportError:
+    PIL_AVAILABLE = False
+
+SCRIPT_DIR = Path(__file__).parent
+SITE_ROOT = SCRIPT_DIR.parent
+BLOGS_DIR = SITE_ROOT / 'blogs'
+IMAGES_DIR = SITE_ROOT / 'images'
+METADATA_FILE = SCRIPT_DIR / 'image_metadata.json'
+
+# 清单结构或 <img> 属性注入规则变化时递增
+METADATA_VERSION = 1
+
+IMG_TAG = re.compile(r'<img\b[^>]*>', re.IGNORECASE)
+SRC_ATTR = re.compile(r'\ssrc=(["\'])(.*?)\1', re.IGNORECASE | re.DOTALL)
+# EXIF方向为5-8时图片需要旋转90度，显示宽高与存储宽高互换
+EXIF_ORIENTATION = 0x0112
+ROTATED_ORIENTATIONS = {5, 6, 7, 8}
+
+
+def read_image_info(path: Path) -> Optional[dict]:
+    """读取图片的显示尺寸和主色，无法识别的格式返回None"""
+    if not PIL_AVAILABLE or path.suffix.lower() == '.svg':
+        return None
+    try:
+        with Image.open(path) as im:
+            width, height = im.size
+            if im.getexif().get(EXIF_ORIENTATION) in ROTATED_ORIENTATIONS:
+                width, height = height, width
+            # 缩小后调色板量化，取像素最多的颜色作为主色
+            im.draft('RGB', (64, 64))
+            thumb = im.convert('RGB')
+            thumb.thumbnail((64, 64))
+            palette = thumb.quantize(colors=8)
+            count, index = max(palette.getcolors())
+            r, g, b = palette.getpalette()[index * 3:index * 3 + 3]
+    except (OSError, ValueError):
+        return None
+    return {'width': width, 'height': height, 'color': f'#{r:02x}{g:02x}{b:02x}'}
+
+
+class ImageMetadata:
+    """相对网站根目录的图片路径 -> {mtime, bytes, width, height, color, hash} 的持久化清单"""
+
+    def __init__(self, store: Optional[ImageStore] = None, path=None):
+        self.store = store or ImageStore(SITE_ROOT)
+        self.path = Path(path) if path else METADATA_FILE
+        self.entries: Dict[str, dict] = {}
+        self.dirty = False
+        self.load()
+
+    def load(self):
+        if not self.path.exists():
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get('version') == METADATA_VERSION:
+            self.entries = data.get('images', {})
+
+    def save(self):
+        self.store.save()
+        if not self.dirty:
+            return
+        tmp_path = self.path.with_suffix('.json.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': METADATA_VERSION, 'images': self.entries},
+                      f, ensure_ascii=False, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.path)
+        self.dirty = False
+
+    def get(self, path) -> Optional[dict]:
+        """返回图片元数据，文件 mtime 或大小变化时重新读取；文件不存在返回None"""
+        path = Path(os.path.abspath(path))
+        try:
+            st = path.stat()
+        except OSError:
+            return None
+        if not path.is_file():
+            return None
+        rel = self.store.relpath(path)
+        entry = self.entries.get(rel)
+        if entry and entry['mtime'] == st.st_mtime_ns and entry['bytes'] == st.st_size:
+            return entry
+
+        entry = {'mtime': st.st_mtime_ns, 'bytes': st.st_size, 'hash': self.store.file_hash(path)}
+        entry.update(read_image_info(path) or {})
+        self.entries[rel] = entry
+        self.dirty = True
+        return entry
+
+    def scan(self, root=None) -> int:
+        """刷新目录下所有图片的元数据并清除已删除文件的记录，返回图片数量"""
+        root = Path(root) if root else IMAGES_DIR
+        seen = set()
+        for dirpath, dirnames, filenames in os.walk(root):
+            dirnames[:] = [d for d in dirnames if not d.startswith('.')]
+            for name in filenames:
+                path = Path(dirpath) / name
+                if path.suffix.lower() in IMAGE_EXTENSIONS and not path.is_symlink() and self.get(path):
+                    seen.add(self.store.relpath(path))
+
+        prefix = self.store.relpath(root) + '/'
+        for rel in [r for r in self.entries if r.startswith(prefix) and r not in seen]:
+            del self.entries[rel]
+            self.dirty = True
+        return len(seen)
+
+    def annotate_tag(self, tag: str, page_dir: Path) -> str:
+        """为单个 <img> 补充缺失的属性，已有属性保持不变"""
+        attrs = []
+        m = SRC_ATTR.search(tag)
+        if m and not re.match(r'^(https?:)?//|^data:', m.group(2)):
+            entry = self.get(os.path.normpath(page_dir / unquote(m.group(2))))
+            if entry and 'width' in entry and not re.search(r'\s(width|height)=', tag, re.IGNORECASE):
+                attrs.append(f'width="{entry["width"]}" height="{entry["height"]}"')
+        if not re.search(r'\sloading=', tag, re.IGNORECASE):
+            attrs.append('loading="lazy"')
+        if not re.search(r'\sdecoding=', tag, re.IGNORECASE):
+            attrs.append('decoding="async"')
+        if not attrs:
+            return tag
+
+        # 插入到结尾的 > 或 /> 之前，保留原有的换行缩进
+        end = len(tag) - 2 if tag.endswith('/>') else len(tag) - 1
+        head = tag[:end].rstrip()
+        spacing = tag[len(head):end] or (' ' if tag.endswith('/>') else '')
+        return f"{head} {' '.join(attrs)}{spacing}{tag[end:]}"
+
+    def annotate_html(self, html: str, page_dir: Path = BLOGS_DIR) -> str:
+        return IMG_TAG.sub(lambda m: self.annotate_tag(m.group(0), page_dir), html)
+
+
+def main():
+    if not PIL_AVAILABLE:
+        print("❌ 未安装 Pillow，请运行: pip3 install -r scripts/requirements.txt")
+        return 1
+
+    args = sys.argv[1:]
+    metadata = ImageMetadata()
+    count = metadata.scan()
+    print(f"✓ 图片元数据清单: {count} 张图片")
+
+    if args != ['--scan']:
+        files = [Path(p) for p in args] or sorted(BLOGS_DIR.glob('*.html'))
+        updated = 0
+        for html_file in files:
+            html_file = html_file.resolve()
+            content = html_file.read_text(encoding='utf-8')
+            new_content = metadata.annotate_html(content, html_file.parent)
+            if new_content != content:
+                html_file.write_text(new_content, encoding='utf-8')
+                updated += 1
+                print(f"✓ {html_file.name}")
+        print(f"\n完成: 更新 {updated}/{len(files)} 个页面")
+
+    metadata.save()
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,356 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+内容寻址的图片存储
+以SHA-256内容哈希为键记录网站内每张图片的规范路径：
+- 导入图片时内容已存在则直接引用已有文件，不再复制
+- 文件名冲突但内容不同时使用 "原名-哈希前8位" 命名，不再逐个探测 -1、-2 后缀
+- dedupe 命令找出 images/ 下字节完全相同的文件，改写引用到规范路径后删除（或硬链接）重复文件
+
+用法：
+  python3 scripts/image_store.py scan                 # 建立/刷新哈希索引
+  python3 scripts/image_store.py dedupe               # 预览重复文件
+  python3 scripts/image_store.py dedupe --apply       # 改写引用并删除重复文件
+  python3 scripts/image_store.py dedupe --apply --hardlink  # 保留路径，重复文件改为硬链接
+"""
+
+import argparse
+import contextlib
+import hashlib
+import json
+import os
+import re
+import shutil
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import quote
+
+SCRIPT_DIR = Path(__file__).parent
+SITE_ROOT = SCRIPT_DIR.parent
+IMAGES_DIR = SITE_ROOT / 'images'
+INDEX_FILE = SCRIPT_DIR / 'image_hash_index.json'
+
+sys.path.insert(0, str(SCRIPT_DIR))
+from reference_index import ReplacementAutomaton
+
+IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.gif', '.webp', '.avif', '.svg'}
+TEXT_EXTENSIONS = {'.html', '.css', '.js', '.xml', '.json', '.md'}
+# 改写引用时跳过的目录
+SKIP_DIRS = {'.git', 'images', 'node_modules', '__pycache__'}
+# 选择规范路径时优先保留的目录（越靠前越优先）
+PREFERRED_DIRS = ['images/blog/']
+# 图片路径中的字符；改写引用时匹配两侧不能紧挨这些字符（前面允许 /，如 ../images/...）
+PATH_CHAR = re.compile(r'[\w.%~-]')
+
+INDEX_VERSION = 1
+
+
+def hash_file(path, chunk_size=1 << 20) -> str:
+    """流式计算文件的SHA-256"""
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def available_path(target_dir: Path, filename: str, digest: str, file_hash=hash_file) -> Tuple[Path, bool]:
+    """
+    在 target_dir 中为内容 digest 选文件名，返回 (路径, 该路径是否已是相同内容)
+    依次尝试 原名、"原名-哈希前8位"、更长的哈希后缀，已存在且内容不同的文件不会被覆盖
+    """
+    stem, ext = os.path.splitext(filename)
+    for name in (filename, f"{stem}-{digest[:8]}{ext}", f"{stem}-{digest[:16]}{ext}", f"{stem}-{digest}{ext}"):
+        target = Path(target_dir) / name
+        if not target.exists():
+            return target, False
+        if file_hash(target) == digest:
+            return target, True
+    raise FileExistsError(f"{target_dir} 中没有可用的文件名: {filename}")
+
+
+class ImageStore:
+    """
+    内容哈希 -> 网站内规范路径（相对网站根目录）的索引，文件哈希按 (mtime, size) 缓存
+    多个进程同时导入图片时（批量转换），给 lock 设置一把跨进程锁，并在 shared() 中完成导入
+    """
+
+    def __init__(self, site_root=None, path=None):
+        self.site_root = Path(site_root) if site_root else SITE_ROOT
+        self.path = Path(path) if path else INDEX_FILE
+        self.hashes: Dict[str, str] = {}
+        self.files: Dict[str, list] = {}
+        self.dirty = False
+        self.lock = None
+        self.load()
+
+    def _read(self) -> Tuple[Dict[str, str], Dict[str, list]]:
+        if not self.path.exists():
+            return {}, {}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}, {}
+        if data.get('version') != INDEX_VERSION:
+            return {}, {}
+        return data.get('hashes', {}), data.get('files', {})
+
+    def load(self):
+        self.hashes, self.files = self._read()
+
+    def merge(self, hashes: Dict[str, str], files: Dict[str, list]):
+        """
+        合并其他进程记录的条目：文件哈希缓存直接采用；
+        某内容在本索引中已有仍存在的规范路径时保持不变，否则采用对方的路径
+        """
+        for key, entry in files.items():
+            if self.files.get(key) != entry and os.path.exists(key):
+                self.files[key] = entry
+                self.dirty = True
+        for digest, rel in hashes.items():
+            current = self.hashes.get(digest)
+            if current == rel:
+                continue
+            if (current is None or not (self.site_root / current).is_file()) and (self.site_root / rel).is_file():
+                self.hashes[digest] = rel
+                self.dirty = True
+
+    @contextlib.contextmanager
+    def shared(self):
+        """
+        持有跨进程锁期间：先合并其他进程已写入的索引，结束时写回，
+        其他进程随后就能看到这里导入的图片，不会把同一张图片再复制一份；没有设置 lock 时不做任何事
+        """
+        if self.lock is None:
+            yield
+            return
+        with self.lock:
+            self.merge(*self._read())
+            yield
+            self.save()
+
+    def save(self):
+        if not self.dirty:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix('.json.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': INDEX_VERSION, 'hashes': self.hashes, 'files': self.files},
+                      f, ensure_ascii=False, indent=1)
+        os.replace(tmp_path, self.path)
+        self.dirty = False
+
+    def relpath(self, path) -> str:
+        return Path(os.path.relpath(os.path.abspath(path), os.path.abspath(self.site_root))).as_posix()
+
+    def file_hash(self, path) -> str:
+        """返回文件内容哈希，mtime和大小未变时直接使用缓存"""
+        key = os.path.abspath(path)
+        st = os.stat(key)
+        cached = self.files.get(key)
+        if cached and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+            return cached[2]
+        digest = hash_file(key)
+        self.files[key] = [st.st_mtime_ns, st.st_size, digest]
+        self.dirty = True
+        return digest
+
+    def register(self, path, digest: Optional[str] = None) -> str:
+        """把网站内的文件登记为该内容的规范路径（已有规范路径时保持不变）"""
+        digest = digest or self.file_hash(path)
+        rel = self.relpath(path)
+        current = self.hashes.get(digest)
+        if current != rel and (current is None or not (self.site_root / current).is_file()):
+            self.hashes[digest] = rel
+            self.dirty = True
+        return self.hashes[digest]
+
+    def canonical(self, digest: str) -> Optional[str]:
+        """返回内容对应的规范路径，文件已被删除时清除记录"""
+        rel = self.hashes.get(digest)
+        if rel is None:
+            return None
+        if (self.site_root / rel).is_file():
+            return rel
+        del self.hashes[digest]
+        self.dirty = True
+        return None
+
+    def import_file(self, src, target_dir, filename: str) -> Tuple[str, bool]:
+        """
+        把源图片导入网站目录，返回 (规范相对路径, 是否发生了复制)
+        相同内容已在网站中时直接返回已有路径
+        """
+        if not self.hashes:
+            self.scan()
+        digest = self.file_hash(src)
+        existing = self.canonical(digest)
+        if existing:
+            return existing, False
+
+        target_dir = Path(target_dir)
+        target_dir.mkdir(parents=True, exist_ok=True)
+        target, same = available_path(target_dir, filename, digest, self.file_hash)
+        if same:
+            return self.register(target, digest), False
+
+        shutil.copy2(src, target)
+        return self.register(target, digest), True
+
+    def forget(self, path):
+        """文件被移动或删除后清除其记录"""
+        key = os.path.abspath(path)
+        entry = self.files.pop(key, None)
+        if entry and self.hashes.get(entry[2]) == self.relpath(key):
+            del self.hashes[entry[2]]
+        self.dirty = True
+
+    def scan(self, root=None) -> Dict[str, List[str]]:
+        """扫描网站图片目录，返回 哈希 -> [相对路径...]（按优先级排序）"""
+        root = Path(root) if root else IMAGES_DIR
+        groups: Dict[str, List[str]] = {}
+        for dirpath, dirnames, filenames in os.walk(root):
+            dirnames[:] = sorted(d for d in dirnames if not d.startswith('.'))
+            for name in sorted(filenames):
+                if os.path.splitext(name)[1].lower() not in IMAGE_EXTENSIONS:
+                    continue
+                path = os.path.join(dirpath, name)
+                if os.path.islink(path):
+                    continue
+                groups.setdefault(self.file_hash(path), []).append(self.relpath(path))
+
+        for digest, paths in groups.items():
+            paths.sort(key=canonical_rank)
+            current = self.hashes.get(digest)
+            if current not in paths:
+                self.hashes[digest] = paths[0]
+                self.dirty = True
+            else:
+                paths.remove(current)
+                paths.insert(0, current)
+
+        # 清除已不存在文件的哈希缓存
+        for key in [k for k in self.files if not os.path.exists(k)]:
+            del self.files[key]
+            self.dirty = True
+        return groups
+
+
+def canonical_rank(rel: str):
+    """规范路径排序：优先目录 -> 路径短 -> 字母序"""
+    for i, prefix in enumerate(PREFERRED_DIRS):
+        if rel.startswith(prefix):
+            return (i, len(rel), rel)
+    return (len(PREFERRED_DIRS), len(rel), rel)
+
+
+def iter_text_files(root: Path):
+    """遍历网站中可能引用图片的文本文件（跳过图片等大目录）"""
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = [d for d in dirnames if d not in SKIP_DIRS and not d.startswith('.')]
+        for name in filenames:
+            if os.path.splitext(name)[1].lower() in TEXT_EXTENSIONS:
+                yield Path(dirpath) / name
+
+
+def path_boundary(text: str, start: int, end: int) -> bool:
+    """匹配两侧都不是路径字符：images/blog/a.png 不会命中 images/blog/a.png.webp 或 x-images/blog/a.png"""
+    if start > 0 and PATH_CHAR.match(text[start - 1]):
+        return False
+    return end == len(text) or not (PATH_CHAR.match(text[end]) or text[end] == '/')
+
+
+def rewrite_references(replacements: Dict[str, str], root: Path = SITE_ROOT) -> List[Path]:
+    """
+    把文本文件中的重复图片路径改写为规范路径（同时处理URL编码形式）
+    所有替换对一遍扫描同时完成，改写结果不会再被其他替换对改写
+    """
+    pairs = {}
+    for old, new in replacements.items():
+        pairs[old] = new
+        encoded_old = quote(old)
+        if encoded_old != old:
+            pairs[encoded_old] = quote(new)
+    automaton = ReplacementAutomaton(pairs)
+
+    updated = []
+    for path in iter_text_files(root):
+        try:
+            text = path.read_text(encoding='utf-8')
+        except (OSError, UnicodeDecodeError):
+            continue
+        new_text, count = automaton.replace(text, accept=path_boundary)
+        if count:
+            path.write_text(new_text, encoding='utf-8')
+            updated.append(path)
+    return updated
+
+
+def dedupe(store: ImageStore, apply=False, hardlink=False):
+    groups = store.scan()
+    # 空文件（占位图）不参与去重
+    duplicates = {d: paths for d, paths in groups.items()
+                  if len(paths) > 1 and (store.site_root / paths[0]).stat().st_size > 0}
+    if not duplicates:
+        print("✓ 没有发现重复图片")
+        return
+
+    saved = 0
+    replacements = {}
+    for digest, paths in sorted(duplicates.items(), key=lambda item: item[1][0]):
+        canonical = paths[0]
+        size = (store.site_root / canonical).stat().st_size
+        print(f"• {canonical} ({size / 1024:.0f} KB)")
+        for dup in paths[1:]:
+            print(f"    = {dup}")
+            saved += size
+            if not hardlink:
+                replacements[dup] = canonical
+
+    print(f"\n发现 {sum(len(p) - 1 for p in duplicates.values())} 个重复文件，可节省 {saved / 1024 / 1024:.1f} MB")
+    if not apply:
+        print("提示: 加上 --apply 执行去重（--hardlink 保留原路径改为硬链接）")
+        return
+
+    if replacements:
+        updated = rewrite_references(replacements, store.site_root)
+        print(f"✓ 已改写 {len(updated)} 个文件中的图片引用")
+
+    for digest, paths in duplicates.items():
+        canonical_path = store.site_root / paths[0]
+        for dup in paths[1:]:
+            dup_path = store.site_root / dup
+            if hardlink:
+                if os.path.samefile(canonical_path, dup_path):
+                    continue
+                tmp_path = dup_path.with_name(dup_path.name + '.tmp-link')
+                os.link(canonical_path, tmp_path)
+                os.replace(tmp_path, dup_path)
+            else:
+                dup_path.unlink()
+                store.forget(dup_path)
+    print("✓ 去重完成")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='内容寻址的图片存储')
+    sub = parser.add_subparsers(dest='cmd', required=True)
+    sub.add_parser('scan', help='建立/刷新图片哈希索引')
+    p_dedupe = sub.add_parser('dedupe', help='查找并去除重复图片')
+    p_dedupe.add_argument('--apply', action='store_true', help='执行去重（默认仅预览）')
+    p_dedupe.add_argument('--hardlink', action='store_true', help='重复文件改为指向规范文件的硬链接')
+    args = parser.parse_args()
+
+    store = ImageStore()
+    if args.cmd == 'scan':
+        groups = store.scan()
+        print(f"✓ 已索引 {sum(len(p) for p in groups.values())} 个图片文件, {len(groups)} 种不同内容")
+    elif args.cmd == 'dedupe':
+        dedupe(store, apply=args.apply, hardlink=args.hardlink)
+    store.save()
+
+
+if __name__ == '__main__':
+    main()
@@ -2,12 +2,15 @@
 # -*- coding: utf-8 -*-
 
 """
-语义内链推荐（本地无依赖版）
+语义内链推荐（本地 TF-IDF 版）
 
 功能：
-- 构建 blogs 目录下文章的简易 TF‑IDF 语义索引（标题 + 前200字）
+- 构建 blogs 目录下文章的简易 TF‑IDF 语义索引（标题 + 全文，逐段流式切分，词表按 min-df/max-features 剪枝）
 - 对输入文章（.md 或 .html）提取候选关键词，并检索相似文章
 - 生成 Markdown 表格报告，不直接改动原文
+- 检索使用稀疏矩阵 + 倒排表，只为与查询共享词项的文章打分；
+  安装了 numpy（scripts/requirements.txt 已列出）时用数组和部分选择（np.partition）取 top-k，
+  没有 numpy 时退回纯 Python 实现（结果相同，较慢）；convert-index / suggest 的输出会注明所用实现
 
 使用：
   1) 构建索引：
@@ -16,57 +19,71 @@
        --blogs_dir "blogs" \
        --out "scripts/link_index.json"
 
-  2) 推荐：
+     发布或修改文章后可增量更新（只重新切分变化的文章）：
+     python3 scripts/link_recommender.py update-index --root . --index "scripts/link_index.json"
+
+  2) （可选）转换为可 mmap 的二进制索引，suggest 打开时无需解析整个文件：
+     python3 scripts/link_recommender.py convert-index \
+       --index "scripts/link_index.json" \
+       --out "scripts/link_index.bin"
+
+  3) 推荐：
      python3 scripts/link_recommender.py suggest \
        --index "scripts/link_index.json" \
        --input "/absolute/path/to/your_draft.md" \
        --report "scripts/link_suggestions_REPORT.md"
+
+  4) 批量推荐（整个 Obsidian 仓库，索引只加载一次，多进程切分草稿）：
+     python3 scripts/link_recommender.py suggest-batch \
+       --index "scripts/link_index.bin" \
+       --input "/absolute/path/to/vault" \
+       --report "scripts/link_suggestions_BATCH.md"      # 或 --report_dir 每篇一份
 """
 
 import argparse
+import hashlib
+import heapq
 import json
 import math
+import mmap
 import os
 import re
+import struct
+import sys
+import time
+import zlib
+from array import array
 from collections import Counter, defaultdict
-from html import unescape
+
+from html_extract import clean_title, extract
+
+try:
+    import numpy as np
+except ImportError:  # 没有 numpy 时使用纯 Python 的倒排表
+    np = None
+
+# 输出中注明检索所用的实现
+BACKEND = 'numpy' if np is not None else 'pure Python (numpy not installed)'
 
 
 CH_STOP = set("的一是在不了有和就都而及与为之于亦也又还很及及其并并且或如果那么则被把向给等这那那些这些因为所以通过可能可以与及".split())
 EN_STOP = set("the a an and or but if then else when while of for to in on at by with as is are was were be been being this that these those from into over under about can could should would may might not no yes just very more most less least same different other another which who whom whose where why how".split())
 
+# 词表剪枝：至少出现在 MIN_DF 篇文章中（标题词除外），出现在超过 MAX_DF 比例文章中的词视为噪声，
+# 最多保留 MAX_FEATURES 个词；文章数少于 MAX_DF_MIN_DOCS 时不做 MAX_DF 过滤
+MIN_DF = 2
+MAX_DF = 0.8
+MAX_DF_MIN_DOCS = 20
+MAX_FEATURES = 50000
+# 第一遍 df 计数数组大小（2^20 个 uint32 桶，约 4 MB）
+SKETCH_BITS = 20
+
 
 def read_file_text(path):
     with open(path, 'r', encoding='utf-8', errors='ignore') as f:
         return f.read()
 
 
-def strip_html(html: str) -> str:
-    text = re.sub(r"<script[\s\S]*?</script>", " ", html, flags=re.I)
-    text = re.sub(r"<style[\s\S]*?</style>", " ", text, flags=re.I)
-    text = re.sub(r"<[^>]+>", " ", text)
-    text = unescape(text)
-    return re.sub(r"\s+", " ", text).strip()
-
-
-def extract_title(html: str) -> str:
-    m = re.search(r"<title>([\s\S]*?)</title>", html, flags=re.I)
-    if m:
-        return re.sub(r"\s+", " ", unescape(m.group(1))).strip()
-    m = re.search(r"<h1[^>]*>([\s\S]*?)</h1>", html, flags=re.I)
-    if m:
-        return re.sub(r"\s+", " ", strip_html(m.group(1))).strip()
-    return ""
-
-
-def extract_description(html: str) -> str:
-    m = re.search(r"<meta[^>]+name=\"description\"[^>]+content=\"([^"]*)\"", html, flags=re.I)
-    if m:
-        return m.group(1).strip()
-    text = strip_html(html)
-    return text[:150]
-
-
 def tokenize(text: str):
     # 英文单词
     en = re.findall(r"[A-Za-z][A-Za-z\-]{2,}", text)
@@ -93,89 +110,529 @@ def tokenize(text: str):
     return filtered
 
 
-def tf_idf_vectors(docs_tokens):
-    N = len(docs_tokens)
-    df = Counter()
-    for tokens in docs_tokens:
-        df.update(set(tokens))
-
-    vectors = []
-    for tokens in docs_tokens:
-        tf = Counter(tokens)
-        vec = {}
-        for term, f in tf.items():
-            idf = math.log((N + 1) / (df[term] + 1)) + 1.0
-            vec[term] = (f / len(tokens)) * idf
-        # 归一化
-        norm = math.sqrt(sum(v*v for v in vec.values())) or 1.0
-        for k in list(vec.keys()):
-            vec[k] /= norm
-        vectors.append(vec)
-    return vectors, df, N
-
-
-def cosine_sim(vec_a, vec_b):
-    if not vec_a or not vec_b:
-        return 0.0
-    # 迭代较短的那个
-    if len(vec_a) > len(vec_b):
-        vec_a, vec_b = vec_b, vec_a
-    s = 0.0
-    for k, v in vec_a.items():
-        if k in vec_b:
-            s += v * vec_b[k]
-    return s
+def idf(df_t, N):
+    return math.log((N + 1) / (df_t + 1)) + 1.0
+
+
+def vector_from_tf(tf, length, df, N):
+    """由词频计算归一化的 TF-IDF 向量"""
+    vec = {}
+    for term, f in tf.items():
+        vec[term] = (f / (length or 1)) * idf(df.get(term, 0), N)
+    # 归一化
+    norm = math.sqrt(sum(v*v for v in vec.values())) or 1.0
+    for k in list(vec.keys()):
+        vec[k] /= norm
+    return vec
 
 
-def build_index(root_dir: str, blogs_dir: str, out_path: str):
+class SparseIndex:
+    """
+    TF-IDF 稀疏矩阵
+    文档向量按行以 CSR 形式存放（indptr/indices/data），并按词项转置出倒排表（post_ptr/post_docs/post_weights），
+    查询只累加倒排表中与查询共享词项的文档，top-k 用部分选择代替全量排序
+    """
+
+    def __init__(self, vectors, terms=None):
+        # terms 指定词项编号顺序（写二进制索引时按字节序排好），默认按出现顺序编号
+        self.term_ids = {t: i for i, t in enumerate(terms)} if terms is not None else {}
+        indptr = [0]
+        indices = []
+        data = []
+        for vec in vectors:
+            for term, weight in vec.items():
+                indices.append(self.term_ids.setdefault(term, len(self.term_ids)))
+                data.append(weight)
+            indptr.append(len(indices))
+        self.n_docs = len(vectors)
+        self.n_terms = len(self.term_ids)
+
+        self.use_numpy = np is not None
+        if self.use_numpy:
+            self.indptr = np.asarray(indptr, dtype=np.int64)
+            self.indices = np.asarray(indices, dtype=np.int64)
+            self.data = np.asarray(data, dtype=np.float64)
+            rows = np.repeat(np.arange(self.n_docs, dtype=np.int64), np.diff(self.indptr))
+            order = np.argsort(self.indices, kind='stable')
+            self.post_ptr = np.zeros(self.n_terms + 1, dtype=np.int64)
+            np.cumsum(np.bincount(self.indices, minlength=self.n_terms), out=self.post_ptr[1:])
+            self.post_docs = rows[order]
+            self.post_weights = self.data[order]
+        else:
+            self.indptr, self.indices, self.data = indptr, indices, data
+            # 计数排序转置为倒排表
+            self.post_ptr = [0] * (self.n_terms + 1)
+            for tid in indices:
+                self.post_ptr[tid + 1] += 1
+            for tid in range(self.n_terms):
+                self.post_ptr[tid + 1] += self.post_ptr[tid]
+            fill = self.post_ptr[:-1]
+            self.post_docs = [0] * len(indices)
+            self.post_weights = [0.0] * len(indices)
+            for doc in range(self.n_docs):
+                for j in range(indptr[doc], indptr[doc + 1]):
+                    pos = fill[indices[j]]
+                    self.post_docs[pos] = doc
+                    self.post_weights[pos] = data[j]
+                    fill[indices[j]] += 1
+
+    def term_id(self, term):
+        return self.term_ids.get(term)
+
+    def query(self, qvec, k):
+        """返回与查询向量余弦相似度最高的 k 篇文档 [(文档序号, 得分)]，按得分降序"""
+        if k <= 0:
+            return []
+        if self.use_numpy:
+            docs = []
+            weights = []
+            for term, w in qvec.items():
+                tid = self.term_id(term)
+                if tid is None:
+                    continue
+                start, end = self.post_ptr[tid], self.post_ptr[tid + 1]
+                docs.append(self.post_docs[start:end])
+                weights.append(self.post_weights[start:end] * w)
+            if not docs:
+                return []
+            if len(docs) == 1:
+                cand, scores = docs[0], weights[0]
+            else:
+                cand, inverse = np.unique(np.concatenate(docs), return_inverse=True)
+                scores = np.bincount(inverse, weights=np.concatenate(weights))
+            if len(cand) > k:
+                # 保留所有不低于第 k 名得分的文档，并列时再按文档序号取舍，与纯 Python 实现一致
+                kth = np.partition(scores, len(scores) - k)[len(scores) - k]
+                keep = scores >= kth
+                cand, scores = cand[keep], scores[keep]
+            return sorted(((int(d), float(s)) for d, s in zip(cand, scores) if s > 0),
+                          key=lambda x: (-x[1], x[0]))[:k]
+
+        acc = defaultdict(float)
+        for term, w in qvec.items():
+            tid = self.term_id(term)
+            if tid is None:
+                continue
+            start, end = self.post_ptr[tid], self.post_ptr[tid + 1]
+            for doc, dw in zip(self.post_docs[start:end], self.post_weights[start:end]):
+                acc[doc] += w * dw
+        return heapq.nsmallest(k, ((d, s) for d, s in acc.items() if s > 0), key=lambda x: (-x[1], x[0]))
+
+
+# ---------------------------------------------------------------------------
+# 二进制索引（可 mmap）
+#
+# 全部为小端序，各段按 8 字节对齐，顺序固定：
+#   头部      magic(4s) version(u32) n_docs(u32) n_terms(u32) nnz(u64) meta_len(u64) blob_len(u64)
+#   meta      UTF-8 JSON：built_from 与各文章的 path/slug/title/desc（不含向量）
+#   词典      term_offsets u32[n_terms+1] + 词项字节串（按 UTF-8 字节序排序，词项编号即排序位置）
+#   df        u32[n_terms]
+#   CSR       indptr u32[n_docs+1], indices u32[nnz], data f32[nnz]
+#   倒排表    post_ptr u32[n_terms+1], post_docs u32[nnz], post_weights f32[nnz]
+# 查询时只 mmap 文件，词项用二分查找定位，不需要解析整个索引
+# ---------------------------------------------------------------------------
+
+BIN_MAGIC = b'LRIX'
+BIN_VERSION = 1
+BIN_HEADER = struct.Struct('<4sIIIQQQ')
+
+
+def _align(n):
+    return (n + 7) & ~7
+
+
+def _pack(values, typecode):
+    """把整数/浮点序列打包为小端 u32/f32 字节"""
+    if np is not None:
+        return np.asarray(values, dtype='<u4' if typecode == 'I' else '<f4').tobytes()
+    arr = array(typecode, values)
+    if sys.byteorder == 'big':
+        arr.byteswap()
+    return arr.tobytes()
+
+
+def write_binary_index(data, out_path):
+    """把 build_index 生成的索引数据（JSON 结构）写成二进制格式"""
+    entries = data['entries']
+    df = data['df']
+    terms = sorted(set(df) | {t for e in entries for t in e['vector']}, key=lambda t: t.encode('utf-8'))
+    sparse = SparseIndex([e['vector'] for e in entries], terms=terms)
+
+    meta = json.dumps({
+        'built_from': data.get('built_from', ''),
+        'entries': [{k: e.get(k, '') for k in ('path', 'slug', 'title', 'desc')} for e in entries],
+    }, ensure_ascii=False).encode('utf-8')
+    encoded = [t.encode('utf-8') for t in terms]
+    term_offsets = [0]
+    for b in encoded:
+        term_offsets.append(term_offsets[-1] + len(b))
+    blob = b''.join(encoded)
+
+    sections = [
+        meta,
+        _pack(term_offsets, 'I'),
+        blob,
+        _pack([df.get(t, 0) for t in terms], 'I'),
+        _pack(sparse.indptr, 'I'),
+        _pack(sparse.indices, 'I'),
+        _pack(sparse.data, 'f'),
+        _pack(sparse.post_ptr, 'I'),
+        _pack(sparse.post_docs, 'I'),
+        _pack(sparse.post_weights, 'f'),
+    ]
+    header = BIN_HEADER.pack(BIN_MAGIC, BIN_VERSION, sparse.n_docs, sparse.n_terms,
+                             len(sparse.indices), len(meta), len(blob))
+    tmp_path = out_path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(header + b'\0' * (_align(len(header)) - len(header)))
+        for section in sections:
+            f.write(section + b'\0' * (_align(len(section)) - len(section)))
+    os.replace(tmp_path, out_path)
+
+
+class DocFreqView:
+    """按词项查询二进制索引中的 df，接口同 dict.get"""
+
+    def __init__(self, index):
+        self.index = index
+
+    def get(self, term, default=0):
+        tid = self.index.term_id(term)
+        return default if tid is None else int(self.index.df_array[tid])
+
+    def to_dict(self):
+        """一次性解码整个词典；需要大量查询时（批量提取候选词）比逐个二分查找快得多"""
+        idx = self.index
+        blob = idx._mm[idx._blob_offset:idx._blob_offset + int(idx.term_offsets[idx.n_terms])]
+        offsets = [int(o) for o in idx.term_offsets]
+        dfs = [int(d) for d in idx.df_array]
+        return {blob[offsets[i]:offsets[i + 1]].decode('utf-8'): dfs[i] for i in range(idx.n_terms)}
+
+
+class BinaryIndex(SparseIndex):
+    """mmap 打开的二进制索引，数组直接引用映射内存（numpy 视图或 memoryview），打开时只解析头部和文章元数据"""
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, n_docs, n_terms, nnz, meta_len, blob_len = BIN_HEADER.unpack_from(self._mm, 0)
+        if magic != BIN_MAGIC or version != BIN_VERSION:
+            raise ValueError(f"Unsupported index format: {path}")
+        self.use_numpy = np is not None
+        self.n_docs = n_docs
+        self.n_terms = n_terms
+
+        offset = _align(BIN_HEADER.size)
+        meta = json.loads(self._mm[offset:offset + meta_len].decode('utf-8'))
+        self.built_from = meta['built_from']
+        self.entries = meta['entries']
+        offset = _align(offset + meta_len)
+
+        def take(count, typecode):
+            nonlocal offset
+            arr = self._view(offset, count, typecode)
+            offset = _align(offset + 4 * count)
+            return arr
+
+        self.term_offsets = take(n_terms + 1, 'I')
+        self._blob_offset = offset
+        offset = _align(offset + blob_len)
+        self.df_array = take(n_terms, 'I')
+        self.indptr = take(n_docs + 1, 'I')
+        self.indices = take(nnz, 'I')
+        self.data = take(nnz, 'f')
+        self.post_ptr = take(n_terms + 1, 'I')
+        self.post_docs = take(nnz, 'I')
+        self.post_weights = take(nnz, 'f')
+        self.df = DocFreqView(self)
+
+    def _view(self, offset, count, typecode):
+        if self.use_numpy:
+            return np.frombuffer(self._mm, dtype='<u4' if typecode == 'I' else '<f4', count=count, offset=offset)
+        return memoryview(self._mm)[offset:offset + 4 * count].cast(typecode)
+
+    def term_bytes(self, tid):
+        start = self._blob_offset + int(self.term_offsets[tid])
+        return self._mm[start:self._blob_offset + int(self.term_offsets[tid + 1])]
+
+    def term_id(self, term):
+        """在按字节序排列的词典中二分查找"""
+        key = term.encode('utf-8')
+        lo, hi = 0, self.n_terms
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.term_bytes(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self.n_terms and self.term_bytes(lo) == key:
+            return lo
+        return None
+
+
+def load_index(index_path):
+    """读取索引，返回 (df, 文档数, 文章列表, 稀疏矩阵)；二进制索引直接 mmap，JSON 索引整体解析后建矩阵"""
+    with open(index_path, 'rb') as f:
+        magic = f.read(len(BIN_MAGIC))
+    if magic == BIN_MAGIC:
+        idx = BinaryIndex(index_path)
+        return idx.df, idx.n_docs, idx.entries, idx
+    with open(index_path, 'r', encoding='utf-8') as f:
+        idx = json.load(f)
+    entries = idx['entries']
+    return idx['df'], idx['doc_count'], entries, SparseIndex([e['vector'] for e in entries])
+
+
+def convert_index(index_path, out_path):
+    """JSON 索引转换为二进制索引，并输出体积与加载耗时对比"""
+    t0 = time.perf_counter()
+    with open(index_path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    json_parse = time.perf_counter() - t0
+    SparseIndex([e['vector'] for e in data['entries']])
+    json_load = time.perf_counter() - t0
+
+    write_binary_index(data, out_path)
+
+    t0 = time.perf_counter()
+    idx = BinaryIndex(out_path)
+    bin_load = time.perf_counter() - t0
+    first_term = next(iter(data['df']), None)
+    t0 = time.perf_counter()
+    if first_term is not None:
+        idx.query({first_term: 1.0}, 3)
+    bin_query = time.perf_counter() - t0
+
+    json_size = os.path.getsize(index_path)
+    bin_size = os.path.getsize(out_path)
+    print(f"Index converted: {out_path} ({idx.n_docs} docs, {idx.n_terms} terms, {len(idx.post_docs)} postings; "
+          f"backend: {BACKEND})")
+    print(f"  size: json {json_size / 1024:.1f} KB -> binary {bin_size / 1024:.1f} KB ({bin_size / json_size:.0%})")
+    print(f"  load: json {json_load * 1000:.1f} ms (parse {json_parse * 1000:.1f} ms) -> "
+          f"binary {bin_load * 1000:.2f} ms, first query {bin_query * 1000:.2f} ms")
+
+
+def file_signature(fpath):
+    st = os.stat(fpath)
+    return [st.st_mtime_ns, st.st_size]
+
+
+def index_document(base, fpath, keep=None):
+    """
+    读取并逐段切分一篇文章，返回不含向量的索引条目（词频、内容哈希和文件签名用于增量更新）
+    keep 为正文词项的过滤条件（词表剪枝），标题中的词项始终保留；length 为过滤前的词项总数
+    """
+    html = read_file_text(fpath)
+    page = extract(html)
+    title = clean_title(page['title']) or page['h1']
+    tf = Counter(tokenize(title))
+    length = sum(tf.values())
+    for paragraph in page['paragraphs']:
+        for term in tokenize(paragraph):
+            length += 1
+            if keep is None or term in tf or keep(term):
+                tf[term] += 1
+    rel = os.path.relpath(fpath, base).replace(os.sep, '/')
+    return {
+        'path': rel,
+        'slug': '/' + rel,
+        'title': title,
+        'desc': page['meta'].get('description') or page['content'][:150],
+        'hash': hashlib.sha256(html.encode('utf-8')).hexdigest(),
+        'sig': file_signature(fpath),
+        'tf': dict(tf),
+        'length': length,
+    }
+
+
+def write_index(data, out_path):
+    if out_path.endswith('.bin'):
+        write_binary_index(data, out_path)
+    else:
+        tmp_path = out_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, out_path)
+
+
+class DfSketch:
+    """固定大小的 df 计数数组（按词项哈希分桶），只会高估，用于第一遍筛掉低频词而不保存整个词表"""
+
+    def __init__(self, bits=SKETCH_BITS):
+        self.mask = (1 << bits) - 1
+        self.counts = array('I', bytes(4 << bits))
+
+    def add(self, terms):
+        for term in terms:
+            self.counts[zlib.crc32(term.encode('utf-8')) & self.mask] += 1
+
+    def estimate(self, term):
+        return self.counts[zlib.crc32(term.encode('utf-8')) & self.mask]
+
+
+def prune_vocabulary(entries, min_df, max_df, max_features):
+    """
+    按精确 df 剪枝词表：去掉 df < min_df（标题词除外）和出现在超过 max_df 比例文章中的词，
+    再按 df 保留最多 max_features 个词；返回剪枝后的 df
+    """
+    N = len(entries)
+    df = Counter()
+    for e in entries:
+        df.update(e['tf'].keys())
+    title_terms = set()
+    for e in entries:
+        title_terms.update(tokenize(e['title']))
+    max_count = max_df * N if N >= MAX_DF_MIN_DOCS else N
+    vocab = {t: c for t, c in df.items() if c <= max_count and (c >= min_df or t in title_terms)}
+    if len(vocab) > max_features:
+        vocab = dict(heapq.nsmallest(max_features, vocab.items(), key=lambda x: (-x[1], x[0])))
+    for e in entries:
+        e['tf'] = {t: f for t, f in e['tf'].items() if t in vocab}
+    return {t: int(c) for t, c in vocab.items()}
+
+
+def build_corpus(root_dir: str, blogs_dir: str,
+                 min_df=MIN_DF, max_df=MAX_DF, max_features=MAX_FEATURES):
+    """
+    两遍流式构建索引数据（不写文件）：第一遍逐篇切分全文，只把词项计入固定大小的 DfSketch；
+    第二遍只保留估计 df 达到 min_df 的词项（及标题词），最后按精确 df 剪枝词表
+    """
     base = os.path.abspath(root_dir)
     blog_dir = os.path.join(base, blogs_dir)
-    entries = []
+    paths = [os.path.join(blog_dir, name) for name in os.listdir(blog_dir) if name.lower().endswith('.html')]
 
-    for name in os.listdir(blog_dir):
-        if not name.lower().endswith('.html'):
-            continue
-        fpath = os.path.join(blog_dir, name)
-        html = read_file_text(fpath)
-        title = extract_title(html)
-        text = strip_html(html)
-        snippet = text[:200]
-        tokens = tokenize((title + ' ' + snippet).strip())
-        rel = os.path.relpath(fpath, base).replace(os.sep, '/')
-        slug = '/' + rel
-        desc = extract_description(html)
-        entries.append({
-            'path': rel,
-            'slug': slug,
-            'title': title,
-            'desc': desc,
-            'tokens': tokens
-        })
-
-    vectors, df, N = tf_idf_vectors([e['tokens'] for e in entries])
-    for e, v in zip(entries, vectors):
-        e['vector'] = v
-        del e['tokens']
+    sketch = DfSketch()
+    for fpath in paths:
+        sketch.add(index_document(base, fpath)['tf'].keys())
+
+    keep = lambda term: sketch.estimate(term) >= min_df
+    entries = [index_document(base, fpath, keep) for fpath in paths]
+    df = prune_vocabulary(entries, min_df, max_df, max_features)
+
+    N = len(entries)
+    for e in entries:
+        e['vector'] = vector_from_tf(e['tf'], e['length'], df, N)
 
     data = {
         'built_from': blog_dir,
         'doc_count': N,
-        'df': df,  # json 不支持 Counter，下面转普通 dict
+        'df': df,
+        'vocab': {'min_df': min_df, 'max_df': max_df, 'max_features': max_features},
+        # 向量上次整体归一化时的文档数，以及此后 df 有变化的词项当时的 df（用于估计 IDF 漂移）
+        'idf_basis': {'doc_count': N, 'df': {}},
         'entries': entries
     }
-    data['df'] = {k: int(v) for k, v in data['df'].items()}
+    return data
+
+
+def build_index(root_dir: str, blogs_dir: str, out_path: str,
+                min_df=MIN_DF, max_df=MAX_DF, max_features=MAX_FEATURES):
+    data = build_corpus(root_dir, blogs_dir, min_df, max_df, max_features)
+    write_index(data, out_path)
+    print(f"Index written: {out_path} ({data['doc_count']} docs, {len(data['df'])} terms)")
+
+
+def idf_drift(data):
+    """
+    估计现有向量所用 IDF 与当前 IDF 的最大相对偏差
+    df 未变的词项只受文档数变化影响，偏差不超过 |log((N+1)/(N0+1))|（IDF 至少为 1）
+    """
+    basis = data['idf_basis']
+    N0, N = basis['doc_count'], data['doc_count']
+    drift = abs(math.log((N + 1) / (N0 + 1)))
+    for term, df0 in basis['df'].items():
+        old = idf(df0, N0)
+        drift = max(drift, abs(idf(data['df'].get(term, 0), N) - old) / old)
+    return drift
+
+
+def update_index(root_dir: str, blogs_dir: str, index_path: str, drift_threshold=0.1, bin_path=None):
+    """
+    增量更新 JSON 索引：按文件签名/内容哈希找出新增、修改和删除的文章，原地调整 df，
+    只重算变化文章的向量；IDF 漂移超过阈值时才用当前 df 重新计算全部向量
+    """
+    if not os.path.exists(index_path):
+        build_index(root_dir, blogs_dir, index_path)
+        return
+    with open(index_path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    if 'idf_basis' not in data or any('tf' not in e for e in data['entries']):
+        print("Index has no term frequencies (built by an older version), rebuilding...")
+        build_index(root_dir, blogs_dir, index_path)
+        return
 
-    with open(out_path, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
-    print(f"Index written: {out_path} ({N} docs)")
+    base = os.path.abspath(root_dir)
+    blog_dir = os.path.join(base, blogs_dir)
+    df = data['df']
+    basis_df = data['idf_basis']['df']
+    by_path = {e['path']: e for e in data['entries']}
+
+    def adjust_df(tf, delta):
+        for term in tf:
+            basis_df.setdefault(term, df.get(term, 0))
+            df[term] = df.get(term, 0) + delta
+            if df[term] <= 0:
+                del df[term]
+
+    seen = set()
+    added, changed, dirty = [], [], []
+    touched = False
+    for name in os.listdir(blog_dir):
+        if not name.lower().endswith('.html'):
+            continue
+        fpath = os.path.join(blog_dir, name)
+        rel = os.path.relpath(fpath, base).replace(os.sep, '/')
+        seen.add(rel)
+        old = by_path.get(rel)
+        if old and old.get('sig') == file_signature(fpath):
+            continue
+        # 沿用 build-index 确定的词表，新文章只计入已有词项和标题词
+        doc = index_document(base, fpath, keep=df.__contains__)
+        if old and old['hash'] == doc['hash']:
+            old['sig'] = doc['sig']  # 内容未变，只更新签名
+            touched = True
+            continue
+        if old:
+            adjust_df(old['tf'], -1)
+            old.update(doc)
+            changed.append(old)
+        else:
+            data['entries'].append(doc)
+            added.append(doc)
+        adjust_df(doc['tf'], +1)
+        dirty.append(by_path.setdefault(rel, doc))
+
+    removed = [e for e in data['entries'] if e['path'] not in seen]
+    for e in removed:
+        adjust_df(e['tf'], -1)
+    if removed:
+        data['entries'] = [e for e in data['entries'] if e['path'] in seen]
+
+    data['doc_count'] = N = len(data['entries'])
+    drift = idf_drift(data)
+    if drift > drift_threshold:
+        for e in data['entries']:
+            e['vector'] = vector_from_tf(e['tf'], e['length'], df, N)
+        data['idf_basis'] = {'doc_count': N, 'df': {}}
+        print(f"IDF drift {drift:.3f} > {drift_threshold}: renormalised all {N} vectors")
+    else:
+        for e in dirty:
+            e['vector'] = vector_from_tf(e['tf'], e['length'], df, N)
+        print(f"IDF drift {drift:.3f} <= {drift_threshold}: recomputed {len(dirty)} vectors")
+
+    if added or changed or removed or touched:
+        write_index(data, index_path)
+    if bin_path:
+        write_binary_index(data, bin_path)
+    print(f"Index updated: {index_path} ({N} docs; +{len(added)} ~{len(changed)} -{len(removed)})")
 
 
 def extract_unlinked_text(md_or_html: str) -> str:
     s = md_or_html
     # 去掉 Markdown 链接 [text](url)
     s = re.sub(r"\[[^\]]+\]\([^\)]+\)", " ", s)
-    # 去掉 HTML 链接 <a ...>text</a>
-    s = re.sub(r"<a[\s\S]*?>[\s\S]*?</a>", " ", s, flags=re.I)
+    # 去掉 HTML 链接 <a ...>text</a>（\b 避免误配 <article>、<aside>）
+    s = re.sub(r"<a\b[^>]*>.*?</a>", " ", s, flags=re.I | re.S)
     return s
 
 
@@ -192,85 +649,222 @@ def vectorize_query_terms(terms, df, N):
     return vec
 
 
-def suggest(index_path: str, input_path: str, report_path: str, topk_per_term=3, threshold=0.7):
-    with open(index_path, 'r', encoding='utf-8') as f:
-        idx = json.load(f)
-    df = idx['df']
-    N = idx['doc_count']
-    entries = idx['entries']
-
-    content = read_file_text(input_path)
-    # 提取候选关键词：使用未加链接的文本，tf-idf TopN
-    source_text = content
-    if input_path.lower().endswith('.html'):
-        text_for_terms = strip_html(extract_unlinked_text(source_text))
+def candidate_terms(content: str, is_html: bool, df, N, limit=12):
+    """提取候选关键词：使用未加链接的文本，按 tf-idf 取前 limit 个作为候选“概念词”"""
+    if is_html:
+        text_for_terms = extract(content, skip_links=True)['content']
     else:
-        text_for_terms = re.sub(r"\s+", " ", extract_unlinked_text(source_text)).strip()
+        text_for_terms = re.sub(r"\s+", " ", extract_unlinked_text(content)).strip()
 
     tokens = tokenize(text_for_terms)
     if not tokens:
-        print("No tokens in input.")
-        return
+        return []
     tf = Counter(tokens)
-    # 根据 tf * idf 排序，取前 12 个作为候选“概念词”
     scored_terms = []
     for term, f in tf.items():
-        idf = math.log((N + 1) / (df.get(term, 0) + 1)) + 1.0
-        scored_terms.append((term, (f / len(tokens)) * idf))
-    scored_terms.sort(key=lambda x: x[1], reverse=True)
-    candidate_terms = [t for t, _ in scored_terms[:12]]
-
-    # 各候选词向量检索
-    entry_vectors = [e['vector'] for e in entries]
-
-    def best_for(term):
-        qv = vectorize_query_terms([term], df, N)
-        sims = [(i, cosine_sim(qv, entry_vectors[i])) for i in range(len(entries))]
-        sims.sort(key=lambda x: x[1], reverse=True)
+        scored_terms.append((term, (f / len(tokens)) * idf(df.get(term, 0), N)))
+    return [t for t, _ in heapq.nlargest(limit, scored_terms, key=lambda x: x[1])]
+
+
+class TermMatcher:
+    """候选词 -> 推荐行 的检索器；单个词的查询结果只与索引有关，按词缓存，批量处理时各草稿共享"""
+
+    def __init__(self, df, N, entries, sparse, topk_per_term=3, threshold=0.7):
+        self.df = df
+        self.N = N
+        self.entries = entries
+        self.sparse = sparse
+        self.topk = topk_per_term
+        self.threshold = threshold
+        self.cache = {}
+        self.hits = 0
+
+    def best_for(self, term):
+        if term in self.cache:
+            self.hits += 1
+            return self.cache[term]
+        qv = vectorize_query_terms([term], self.df, self.N)
+        sims = self.sparse.query(qv, self.topk)
         # 过滤阈值
-        top = [(entries[i]['slug'], entries[i]['title'], entries[i]['desc'], s) for i, s in sims[:topk_per_term] if s >= threshold]
+        top = [(self.entries[i]['slug'], self.entries[i]['title'], self.entries[i]['desc'], s)
+               for i, s in sims if s >= self.threshold]
+        self.cache[term] = top
         return top
 
-    rows = []
-    for term in candidate_terms:
-        recs = best_for(term)
-        if not recs:
-            continue
-        for slug, title, desc, score in recs:
-            tip = (desc or title or '').strip()[:24]  # 简短 tip 截断
-            rows.append((term, slug, score, tip))
+    def rows(self, terms):
+        rows = []
+        for term in terms:
+            for slug, title, desc, score in self.best_for(term):
+                tip = (desc or title or '').strip()[:24]  # 简短 tip 截断
+                rows.append((term, slug, score, tip))
+        return rows
+
+
+def write_report_table(f, rows):
+    f.write('| 识别到的词语 | 推荐文章 Slug | 相似度得分 | 建议 tip 内容 |\n')
+    f.write('| :---: | :---: | :---: | :---: |\n')
+    for term, slug, score, tip in rows:
+        f.write(f"| **{term}** | `{slug}` | {score:.2f} | {tip} |\n")
+
+
+def suggest(index_path: str, input_path: str, report_path: str, topk_per_term=3, threshold=0.7):
+    df, N, entries, sparse = load_index(index_path)
+
+    terms = candidate_terms(read_file_text(input_path), input_path.lower().endswith('.html'), df, N)
+    if not terms:
+        print("No tokens in input.")
+        return
+    rows = TermMatcher(df, N, entries, sparse, topk_per_term, threshold).rows(terms)
 
     # 生成 Markdown 报告
-    os.makedirs(os.path.dirname(report_path), exist_ok=True)
+    os.makedirs(os.path.dirname(report_path) or '.', exist_ok=True)
     with open(report_path, 'w', encoding='utf-8') as f:
-        f.write('| 识别到的词语 | 推荐文章 Slug | 相似度得分 | 建议 tip 内容 |\n')
-        f.write('| :---: | :---: | :---: | :---: |\n')
-        for term, slug, score, tip in rows:
-            f.write(f"| **{term}** | `{slug}` | {score:.2f} | {tip} |\n")
-    print(f"Report written: {report_path} ({len(rows)} rows)")
+        write_report_table(f, rows)
+    print(f"Report written: {report_path} ({len(rows)} rows; backend: {BACKEND})")
+
+
+DRAFT_EXTENSIONS = ('.md', '.html')
+# 工作进程内的索引（只需 df 和文档数来给候选词排序），由 _init_batch_worker 加载一次
+_worker_index = None
+
+
+def find_drafts(pattern: str):
+    """目录（递归查找 .md/.html，跳过隐藏目录）或通配符，返回排序后的文件列表"""
+    if os.path.isdir(pattern):
+        found = []
+        for dirpath, dirnames, filenames in os.walk(pattern):
+            dirnames[:] = [d for d in dirnames if not d.startswith('.')]
+            found += [os.path.join(dirpath, n) for n in filenames if n.lower().endswith(DRAFT_EXTENSIONS)]
+        return sorted(found)
+    import glob
+    return sorted(p for p in glob.glob(pattern, recursive=True)
+                  if os.path.isfile(p) and p.lower().endswith(DRAFT_EXTENSIONS))
+
+
+def _init_batch_worker(index_path):
+    global _worker_index
+    df, N, _, _ = load_index(index_path)
+    _worker_index = (df.to_dict() if isinstance(df, DocFreqView) else df, N)
+
+
+def _draft_terms(path):
+    df, N = _worker_index
+    return candidate_terms(read_file_text(path), path.lower().endswith('.html'), df, N)
+
+
+def suggest_batch(index_path: str, pattern: str, report_path=None, report_dir=None,
+                  topk_per_term=3, threshold=0.7, workers=None):
+    """
+    批量推荐：索引只加载一次；切分草稿、提取候选词分给进程池并行，
+    检索在主进程进行，相同候选词只查询一次
+    输出一份汇总报告（report_path），或在 report_dir 下为每篇草稿各写一份
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    t0 = time.perf_counter()
+    drafts = find_drafts(pattern)
+    if not drafts:
+        print(f"No drafts found: {pattern}")
+        return
+    df, N, entries, sparse = load_index(index_path)
+    matcher = TermMatcher(df, N, entries, sparse, topk_per_term, threshold)
+
+    if workers == 1 or len(drafts) == 1:
+        _init_batch_worker(index_path)
+        all_terms = map(_draft_terms, drafts)
+        executor = None
+    else:
+        executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_batch_worker,
+                                       initargs=(index_path,))
+        chunksize = max(1, len(drafts) // ((workers or os.cpu_count() or 1) * 4))
+        all_terms = executor.map(_draft_terms, drafts, chunksize=chunksize)
+
+    base = os.path.commonpath([os.path.abspath(d) for d in drafts])
+    if os.path.isfile(base):
+        base = os.path.dirname(base)
+    results = []
+    try:
+        for path, terms in zip(drafts, all_terms):
+            results.append((os.path.relpath(os.path.abspath(path), base), matcher.rows(terms)))
+    finally:
+        if executor:
+            executor.shutdown()
+
+    total_rows = sum(len(rows) for _, rows in results)
+    if report_dir:
+        for rel, rows in results:
+            out = os.path.join(report_dir, os.path.splitext(rel)[0] + '_REPORT.md')
+            os.makedirs(os.path.dirname(out), exist_ok=True)
+            with open(out, 'w', encoding='utf-8') as f:
+                write_report_table(f, rows)
+        print(f"Reports written: {report_dir} ({len(results)} drafts, {total_rows} rows)")
+    else:
+        os.makedirs(os.path.dirname(report_path) or '.', exist_ok=True)
+        with open(report_path, 'w', encoding='utf-8') as f:
+            for rel, rows in results:
+                if not rows:
+                    continue
+                f.write(f"## {rel}\n\n")
+                write_report_table(f, rows)
+                f.write('\n')
+        with_rows = sum(1 for _, rows in results if rows)
+        print(f"Report written: {report_path} ({with_rows}/{len(results)} drafts, {total_rows} rows)")
+    print(f"  {len(matcher.cache)} distinct terms queried, {matcher.hits} cache hits, "
+          f"{time.perf_counter() - t0:.2f}s (backend: {BACKEND})")
 
 
 def main():
-    p = argparse.ArgumentParser(description='语义内链推荐（无依赖版）')
+    p = argparse.ArgumentParser(description='语义内链推荐（本地 TF-IDF，优先使用 numpy）')
     sub = p.add_subparsers(dest='cmd', required=True)
 
     p_build = sub.add_parser('build-index', help='构建索引')
     p_build.add_argument('--root', required=True, help='网站根目录')
     p_build.add_argument('--blogs_dir', default='blogs', help='相对根目录的博客目录')
-    p_build.add_argument('--out', default='scripts/link_index.json', help='索引输出路径')
+    p_build.add_argument('--out', default='scripts/link_index.json', help='索引输出路径（以 .bin 结尾时写二进制格式）')
+    p_build.add_argument('--min_df', type=int, default=MIN_DF, help='词项至少出现的文章数（标题词除外）')
+    p_build.add_argument('--max_df', type=float, default=MAX_DF, help='出现在超过该比例文章中的词项被丢弃')
+    p_build.add_argument('--max_features', type=int, default=MAX_FEATURES, help='词表最大词项数')
+
+    p_update = sub.add_parser('update-index', help='增量更新 JSON 索引（只处理新增、修改和删除的文章）')
+    p_update.add_argument('--root', required=True, help='网站根目录')
+    p_update.add_argument('--blogs_dir', default='blogs', help='相对根目录的博客目录')
+    p_update.add_argument('--index', default='scripts/link_index.json', help='JSON 索引路径')
+    p_update.add_argument('--drift', type=float, default=0.1, help='IDF 相对漂移超过该值时重新计算全部向量')
+    p_update.add_argument('--bin', default=None, help='同时写出二进制索引的路径')
+
+    p_convert = sub.add_parser('convert-index', help='JSON 索引转换为可 mmap 的二进制索引')
+    p_convert.add_argument('--index', default='scripts/link_index.json', help='JSON 索引路径')
+    p_convert.add_argument('--out', default='scripts/link_index.bin', help='二进制索引输出路径')
 
     p_suggest = sub.add_parser('suggest', help='生成推荐')
-    p_suggest.add_argument('--index', required=True, help='索引文件路径')
+    p_suggest.add_argument('--index', required=True, help='索引文件路径（JSON 或二进制）')
     p_suggest.add_argument('--input', required=True, help='输入的 .md 或 .html 文件')
     p_suggest.add_argument('--report', default='scripts/link_suggestions_REPORT.md', help='报告输出路径')
     p_suggest.add_argument('--topk', type=int, default=3)
     p_suggest.add_argument('--threshold', type=float, default=0.7)
 
+    p_batch = sub.add_parser('suggest-batch', help='批量生成推荐（目录或通配符，索引只加载一次）')
+    p_batch.add_argument('--index', required=True, help='索引文件路径（JSON 或二进制）')
+    p_batch.add_argument('--input', required=True, help='草稿目录（递归查找 .md/.html）或通配符，如 "vault/**/*.md"')
+    group = p_batch.add_mutually_exclusive_group()
+    group.add_argument('--report', default='scripts/link_suggestions_BATCH.md', help='汇总报告输出路径')
+    group.add_argument('--report_dir', default=None, help='为每篇草稿各写一份报告的目录')
+    p_batch.add_argument('--topk', type=int, default=3)
+    p_batch.add_argument('--threshold', type=float, default=0.7)
+    p_batch.add_argument('--workers', type=int, default=None, help='工作进程数（默认CPU核数，1为单进程）')
+
     args = p.parse_args()
     if args.cmd == 'build-index':
-        build_index(args.root, args.blogs_dir, args.out)
+        build_index(args.root, args.blogs_dir, args.out, args.min_df, args.max_df, args.max_features)
+    elif args.cmd == 'update-index':
+        update_index(args.root, args.blogs_dir, args.index, args.drift, args.bin)
+    elif args.cmd == 'convert-index':
+        convert_index(args.index, args.out)
     elif args.cmd == 'suggest':
         suggest(args.index, args.input, args.report, args.topk, args.threshold)
+    elif args.cmd == 'suggest-batch':
+        suggest_batch(args.index, args.input, args.report, args.report_dir,
+                      args.topk, args.threshold, args.workers)
 
 
 if __name__ == '__main__':
@@ -11,10 +11,21 @@ import sys
 import yaml
 from pathlib import Path
 from datetime import datetime
+import markdown
 from markdown import Markdown
 from markdown.extensions import codehilite, fenced_code, tables, toc
 import json
 
+sys.path.insert(0, str(Path(__file__).parent))
+from attachment_index import AttachmentIndex
+from build_manifest import BuildManifest, hash_text
+from fragment_cache import FragmentCache
+from image_metadata import METADATA_VERSION, ImageMetadata
+from image_store import ImageStore
+from post_catalog import PostCatalog
+from responsive_images import PIPELINE_VERSION, ResponsiveImages
+from site_templates import default_templates
+
 # 默认配置
 CONFIG_FILE = 'blog_config.json'
 SITE_ROOT = Path(__file__).parent.parent
@@ -22,26 +33,43 @@ BLOGS_DIR = SITE_ROOT / 'blogs'
 OBSIDIAN_ATTACHMENTS = []  # 将从配置文件读取
 SITE_IMAGES_DIR = SITE_ROOT / 'images'
 
+# Python-Markdown 扩展及配置（同时决定正文片段缓存的键）
+MARKDOWN_EXTENSIONS = [
+    'codehilite',
+    'fenced_code',
+    'tables',
+    'toc',
+    'nl2br',
+    'sane_lists'
+]
+MARKDOWN_EXTENSION_CONFIGS = {
+    'codehilite': {
+        'css_class': 'highlight',
+        'use_pygments': False
+    }
+}
+
 class MarkdownConverter:
-    def __init__(self, config_file=None):
-        """初始化转换器，加载配置"""
+    def __init__(self, config_file=None, manifest=None):
+        """初始化转换器，加载配置和增量构建清单"""
         self.config = self.load_config(config_file)
+        self.manifest = manifest if manifest is not None else BuildManifest()
+        self.attachments = AttachmentIndex.from_config(self.config)
+        self.images = ImageStore(SITE_ROOT)
+        self.responsive = ResponsiveImages(self.images)
+        self.image_meta = ImageMetadata(self.images)
+        self.path_mappings = self.load_path_mappings()
+        self._resolved_images = []
+        self._missing_images = []
+        self._template_version = None
+        self.templates = default_templates()
         self.md = Markdown(
-            extensions=[
-                'codehilite',
-                'fenced_code',
-                'tables',
-                'toc',
-                'nl2br',
-                'sane_lists'
-            ],
-            extension_configs={
-                'codehilite': {
-                    'css_class': 'highlight',
-                    'use_pygments': False
-                }
-            }
+            extensions=MARKDOWN_EXTENSIONS,
+            extension_configs=MARKDOWN_EXTENSION_CONFIGS
         )
+        # 正文片段缓存：扩展或 Markdown 版本变化时键随之改变
+        self.fragments = FragmentCache(json.dumps(
+            [markdown.__version__, MARKDOWN_EXTENSIONS, MARKDOWN_EXTENSION_CONFIGS], sort_keys=True))
         
     def load_config(self, config_file=None):
         """加载配置文件"""
@@ -74,6 +102,72 @@ class MarkdownConverter:
         
         return default_config
     
+    def load_path_mappings(self):
+        """
+        读取 image_path_mappings 中的 '映射' 规则：Markdown图片路径前缀 -> 网站图片目录
+        返回按前缀长度从长到短排序的 [(前缀, 网站目录)]
+        """
+        mappings = self.config.get('image_path_mappings') or {}
+        rules = mappings.get('映射') if isinstance(mappings, dict) else None
+        if not isinstance(rules, dict):
+            return []
+        result = []
+        for prefix, site_dir in rules.items():
+            if not prefix or not isinstance(site_dir, str) or not site_dir.strip():
+                continue
+            site_dir = site_dir.strip().strip('/') + '/'
+            # 与图片路径的处理一致，只去掉开头的一个 ./（lstrip 会把 ../ 也吃掉）
+            if prefix.startswith('./'):
+                prefix = prefix[2:]
+            result.append((prefix, site_dir))
+        result.sort(key=lambda rule: len(rule[0]), reverse=True)
+        return result
+    
+    def map_site_dir(self, img_path):
+        """按映射规则返回图片在网站中的目录（相对网站根目录），默认为 images/blog/"""
+        for prefix, site_dir in self.path_mappings:
+            if img_path.startswith(prefix):
+                return site_dir
+        return f"{self.config['site_images_dir'].strip('/')}/blog/"
+    
+    def find_image(self, img_path, md_dir):
+        """
+        在附件索引中查找图片源文件，候选顺序与旧版逐个 exists() 的顺序一致，
+        都找不到时再按文件名在配置的附件目录（含子目录）中查找
+        """
+        img_filename = Path(img_path).name
+        img_dir_part = str(Path(img_path).parent) if Path(img_path).parent != Path('.') else ''
+        possible_paths = []
+        
+        # 1. 如果路径包含目录信息，先尝试完整路径
+        if img_dir_part:
+            possible_paths.append(md_dir / img_path)
+        
+        # 2. 在Markdown文件同目录及其子目录查找
+        possible_paths.extend([
+            md_dir / img_filename,
+            md_dir / img_path,
+            md_dir / 'attachments' / img_filename,
+            md_dir / 'attachments' / img_path,
+            md_dir / 'assets' / img_filename,
+            md_dir / 'assets' / img_path,
+            md_dir.parent / 'attachments' / img_filename,
+        ])
+        
+        # 3. 在配置的Obsidian附件目录中查找
+        for attach_dir in self.attachments.roots:
+            possible_paths.extend([
+                Path(attach_dir) / img_filename,
+                Path(attach_dir) / img_path,
+            ])
+        
+        for path in possible_paths:
+            if self.attachments.contains(path):
+                return Path(os.path.abspath(path))
+        
+        found = self.attachments.find_by_name(img_filename)
+        return Path(found) if found else None
+    
     def extract_front_matter(self, content):
         """提取YAML front matter"""
         front_matter = {}
@@ -118,120 +212,85 @@ class MarkdownConverter:
             if img_path.startswith('./'):
                 img_path = img_path[2:]
             
-            # 分离文件名和可能存在的路径
+            # 分离文件名，按映射规则确定网站目录
             img_filename = Path(img_path).name
-            img_dir_part = str(Path(img_path).parent) if Path(img_path).parent != Path('.') else ''
-            
-            # 查找图片文件
-            md_dir = Path(markdown_path).parent
-            possible_paths = []
-            
-            # 1. 如果路径包含目录信息，先尝试完整路径
-            if img_dir_part:
-                possible_paths.extend([
-                    md_dir / img_path,
-                    md_dir / img_dir_part / img_filename,
-                ])
-            
-            # 2. 在Markdown文件同目录及其子目录查找
-            possible_paths.extend([
-                md_dir / img_filename,
-                md_dir / img_path,
-                md_dir / 'attachments' / img_filename,
-                md_dir / 'attachments' / img_path,
-                md_dir / 'assets' / img_filename,
-                md_dir / 'assets' / img_path,
-                md_dir.parent / 'attachments' / img_filename,
-            ])
-            
-            # 3. 在配置的Obsidian附件目录中查找
-            if self.config.get('obsidian_attachments'):
-                for attach_dir in self.config['obsidian_attachments']:
-                    if attach_dir and attach_dir.strip():
-                        attach_path = Path(attach_dir)
-                        possible_paths.extend([
-                            attach_path / img_filename,
-                            attach_path / img_path,
-                        ])
+            site_dir = self.map_site_dir(img_path)
             
-            # 查找存在的图片文件
-            found_path = None
-            for path in possible_paths:
-                try:
-                    if path.exists() and path.is_file():
-                        found_path = path.resolve()  # 获取绝对路径
-                        break
-                except:
-                    continue
+            # 查找图片文件（附件索引查询）
+            found_path = self.find_image(img_path, Path(markdown_path).parent)
             
             if found_path:
-                # 复制图片到网站images目录
-                target_dir = SITE_ROOT / self.config['site_images_dir'] / 'blog'
-                target_dir.mkdir(parents=True, exist_ok=True)
+                self._resolved_images.append(found_path)
+                # 导入图片到网站images目录（按内容哈希去重，相同内容直接引用已有文件）
+                target_dir = SITE_ROOT / site_dir
                 
-                # 使用原文件名，避免冲突时可以添加哈希
-                safe_filename = img_filename
                 # 处理文件名中的特殊字符和空格
-                safe_filename = safe_filename.replace(' ', '-')
+                safe_filename = img_filename.replace(' ', '-')
                 
+                site_path, copied = self.import_image(found_path, target_dir, safe_filename)
                 # 创建相对路径（从博客HTML文件的角度）
-                relative_path = f"../images/blog/{safe_filename}"
-                target_path = target_dir / safe_filename
-                
-                # 复制图片（如果不存在或源文件更新）
-                import shutil
-                copy_needed = False
-                if not target_path.exists():
-                    copy_needed = True
-                elif found_path.stat().st_mtime > target_path.stat().st_mtime:
-                    copy_needed = True
-                elif found_path.stat().st_size != target_path.stat().st_size:
-                    copy_needed = True
+                relative_path = f"../{site_path}"
                 
-                if copy_needed:
-                    shutil.copy2(found_path, target_path)
-                    print(f"  ✓ 已复制图片: {found_path.name} -> {relative_path}")
-                    
-                    # 检查是否需要重命名（包含中文或特殊字符）
-                    if self._needs_rename(safe_filename):
-                        # 导入重命名模块（延迟导入避免循环依赖）
-                        try:
-                            import sys
-                            rename_script_dir = Path(__file__).parent
-                            if str(rename_script_dir) not in sys.path:
-                                sys.path.insert(0, str(rename_script_dir))
-                            from rename_images import generate_english_filename, load_mapping, save_mapping
-                            
-                            mapping = load_mapping()
-                            new_filename = generate_english_filename(safe_filename, mapping)
-                            
-                            # 如果生成的新文件名不同，进行重命名
-                            if new_filename != safe_filename:
-                                new_target = target_dir / new_filename
-                                if not new_target.exists():
-                                    target_path.rename(new_target)
-                                    # 保存映射
-                                    mapping[safe_filename] = new_filename
-                                    save_mapping(mapping, silent=True)
-                                    safe_filename = new_filename
-                                    relative_path = f"../images/blog/{safe_filename}"
-                                    print(f"  ✓ 已重命名图片: {target_path.name} -> {new_filename}")
-                        except Exception as e:
-                            # 如果重命名失败，继续使用原文件名
-                            print(f"  ⚠️  重命名失败（继续使用原文件名）: {e}")
+                if not copied and site_path != f"{site_dir}{safe_filename}":
+                    print(f"  ⊘ 图片内容已存在，复用: {found_path.name} -> {relative_path}")
                 
                 return f'![{alt_text}]({relative_path})'
             else:
+                # 记下找不到的图片，之后补上源文件时增量构建会重新渲染这篇笔记
+                self._missing_images.append(img_path)
                 # 如果找不到，尝试直接使用相对路径（可能已经是网站路径）
                 # 检查是否是网站images目录的路径
                 if 'images' in img_path:
                     return match.group(0)  # 保持原样
                 else:
-                    # 假设图片在images/blog目录
-                    return f'![{alt_text}](../images/blog/{img_path})'
+                    # 假设图片在映射的网站目录（默认images/blog）
+                    for prefix, _ in self.path_mappings:
+                        if img_path.startswith(prefix):
+                            img_path = img_path[len(prefix):]
+                            break
+                    return f'![{alt_text}](../{site_dir}{img_path})'
         
         return replace_image
     
+    def import_image(self, found_path, target_dir, safe_filename):
+        """
+        导入一张图片并按需改为英文文件名，返回 (网站内相对路径, 是否发生了复制)
+        批量模式下多个工作进程共享图片索引，导入和重命名在同一把跨进程锁内完成
+        """
+        with self.images.shared():
+            site_path, copied = self.images.import_file(found_path, target_dir, safe_filename)
+            relative_path = f"../{site_path}"
+
+            if copied:
+                print(f"  ✓ 已复制图片: {found_path.name} -> {relative_path}")
+
+                # 检查是否需要重命名（包含中文或特殊字符）
+                target_path = SITE_ROOT / site_path
+                if self._needs_rename(target_path.name):
+                    # 导入重命名模块（延迟导入避免循环依赖）
+                    try:
+                        from rename_images import generate_english_filename, load_mapping, save_mapping
+
+                        mapping = load_mapping()
+                        new_filename = generate_english_filename(target_path.name, mapping)
+
+                        # 如果生成的新文件名不同，进行重命名
+                        if new_filename != target_path.name:
+                            new_target = target_path.parent / new_filename
+                            if not new_target.exists():
+                                target_path.rename(new_target)
+                                self.images.forget(target_path)
+                                site_path = self.images.register(new_target)
+                                # 保存映射
+                                mapping[target_path.name] = new_filename
+                                save_mapping(mapping, silent=True)
+                                relative_path = f"../{site_path}"
+                                print(f"  ✓ 已重命名图片: {target_path.name} -> {new_filename}")
+                    except Exception as e:
+                        # 如果重命名失败，继续使用原文件名
+                        print(f"  ⚠️  重命名失败（继续使用原文件名）: {e}")
+        return site_path, copied
+
     def _needs_rename(self, filename):
         """检查文件名是否需要重命名"""
         import re
@@ -247,6 +306,8 @@ class MarkdownConverter:
     
     def process_images(self, content, markdown_path):
         """处理Markdown中的图片链接"""
+        self._resolved_images = []
+        self._missing_images = []
         # 先处理Obsidian的wiki链接格式 ![[image.png|alt]]，转换为标准格式
         wiki_pattern = r'!\[\[([^\|\]]+)(?:\|([^\]]+))?\]\]'
         
@@ -265,8 +326,23 @@ class MarkdownConverter:
         
         return content
     
-    def convert(self, markdown_file, output_file=None):
-        """转换Markdown文件为HTML"""
+    def template_version(self):
+        """
+        模板及配置版本
+        由布局和片段文件的哈希（site_templates）与配置一起计算，模板或配置改动后所有笔记都会重新渲染
+        """
+        if self._template_version is None:
+            config = json.dumps(self.config, ensure_ascii=False, sort_keys=True)
+            # 响应式图片的档位、可用格式和 <img> 属性注入规则也会改变输出
+            pipeline = f"{PIPELINE_VERSION}:{','.join(self.responsive.formats)}:{METADATA_VERSION}"
+            self._template_version = hash_text(self.templates.version() + '\0' + config + '\0' + pipeline)[:16]
+        return self._template_version
+    
+    def convert(self, markdown_file, output_file=None, force=False):
+        """
+        转换Markdown文件为HTML
+        笔记内容、引用图片和模板都未变化时直接返回上次的结果，force=True 时强制重新渲染
+        """
         markdown_path = Path(markdown_file)
         
         if not markdown_path.exists():
@@ -284,6 +360,17 @@ class MarkdownConverter:
         with open(markdown_path, 'r', encoding='utf-8') as f:
             content = f.read()
         
+        # 检查增量构建清单（front matter + 正文 + 指定的输出路径）
+        source_hash = hash_text(content + '\0' + str(output_file or ''))
+        template_version = self.template_version()
+        if not force:
+            md_dir = Path(markdown_path).parent
+            cached = self.manifest.is_fresh(markdown_path, source_hash, template_version, BLOGS_DIR,
+                                            resolve=lambda img_path: self.find_image(img_path, md_dir))
+            if cached:
+                print(f"⊘ 未变化，跳过: {markdown_path.name} -> {cached['filename']}")
+                return dict(cached, skipped=True)
+        
         # 提取front matter
         front_matter, content = self.extract_front_matter(content)
         
@@ -335,11 +422,16 @@ class MarkdownConverter:
         # 处理图片路径
         content = self.process_images(content, markdown_path)
         
-        # 转换Markdown为HTML
-        html_content = self.md.convert(content)
-        
-        # 重置Markdown实例（因为Markdown对象会保存状态）
-        self.md.reset()
+        # 转换Markdown为HTML：处理后的正文没有变化时直接复用缓存的片段，只重新套用布局
+        fragment_key = self.fragments.key(content)
+        html_content = self.fragments.get(fragment_key)
+        if html_content is None:
+            html_content = self.md.convert(content)
+            # 重置Markdown实例（因为Markdown对象会保存状态）
+            self.md.reset()
+            self.fragments.put(fragment_key, html_content)
+        else:
+            print("⊘ 正文未变化，复用已渲染的片段")
         
         # 生成HTML文件
         if output_file is None:
@@ -355,6 +447,11 @@ class MarkdownConverter:
                 safe_title = re.sub(r'[-\s]+', '-', safe_title)
                 output_file = BLOGS_DIR / f"{date_str}-{safe_title}.html"
         
+        # 为正文图片补充尺寸和懒加载属性，生成 WebP/AVIF 多尺寸版本并改写为 <picture>
+        page_dir = output_file.resolve().parent
+        html_content = self.image_meta.annotate_html(html_content, page_dir)
+        html_content = self.responsive.rewrite_html(html_content, page_dir)
+        
         # 使用标准模板生成完整HTML
         html_output = self.generate_html_template(
             title, date_str, description, html_content, categories
@@ -370,16 +467,19 @@ class MarkdownConverter:
         print(f"  日期: {date_str}")
         print(f"  标签: {', '.join(categories)}")
         
-        return {
+        result = {
             'title': title,
             'date': date_str,
             'description': description,
             'filename': output_file.name,
             'category': categories
         }
+        self.manifest.record(markdown_path, source_hash, template_version, self._resolved_images, result,
+                             fragment=fragment_key, output=output_file, missing=self._missing_images)
+        return result
     
     def generate_html_template(self, title, date, description, content, categories=None):
-        """生成HTML模板"""
+        """用 scripts/templates/post.html 布局（及其中的公共片段）生成完整页面"""
         # 格式化日期
         try:
             date_obj = datetime.strptime(date, '%Y-%m-%d')
@@ -395,120 +495,49 @@ class MarkdownConverter:
             tags_html += '                    </div>'
         else:
             tags_html = ''
-        
-        template = f'''<!DOCTYPE html>
-<html lang="zh-CN">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>{title} - 筑居思</title>
-    <meta name="description" content="{description}">
-    <link rel="stylesheet" href="../css/styles.css">
-    <link rel="stylesheet" href="../css/blog-post.css">
-    <link rel="stylesheet" href="../css/recommendations.css">
-    <link rel="icon" href="../images/putiye心形菩提叶.svg" type="image/svg+xml">
-    <link rel="preconnect" href="https://fonts.googleapis.com">
-    <link rel="preconnect" href="https://fonts.gstatic.com" crossorigin>
-    <link href="https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700&display=swap" rel="stylesheet">
-</head>
-<body>
-    <!-- 左侧固定导航栏 -->
-    <div class="sidebar">
-        <div class="sidebar-logo">
-            <h1>筑居<span>思</span></h1>
-        </div>
-        <ul class="sidebar-nav">
-            <li><a href="../index.html">首页</a></li>
-            <li><a href="../blogs.html">个人博客</a></li>
-            <li><a href="../cabinet.html">造物拾遗</a></li>
-        </ul>
-        <div class="theme-toggle">
-            <button id="theme-toggle-btn" aria-label="切换主题">
-                <svg xmlns="http://www.w3.org/2000/svg" width="24" height="24" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2" stroke-linecap="round" stroke-linejoin="round" class="sun-icon"><circle cx="12" cy="12" r="5"></circle><line x1="12" y1="1" x2="12" y2="3"></line><line x1="12" y1="21" x2="12" y2="23"></line><line x1="4.22" y1="4.22" x2="5.64" y2="5.64"></line><line x1="18.36" y1="18.36" x2="19.78" y2="19.78"></line><line x1="1" y1="12" x2="3" y2="12"></line><line x1="21" y1="12" x2="23" y2="12"></line><line x1="4.22" y1="19.78" x2="5.64" y2="18.36"></line><line x1="18.36" y1="5.64" x2="19.78" y2="4.22"></line></svg>
-                <svg xmlns="http://www.w3.org/2000/svg" width="24" height="24" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2" stroke-linecap="round" stroke-linejoin="round" class="moon-icon"><path d="M21 12.79A9 9 0 1 1 11.21 3 7 7 0 0 0 21 12.79z"></path></svg>
-            </button>
-        </div>
-    </div>
-
-    <!-- 移动端菜单按钮 -->
-    <button class="mobile-menu-toggle" aria-label="打开导航菜单">
-        <span></span>
-        <span></span>
-        <span></span>
-    </button>
 
-    <!-- 主要内容区域 -->
-    <div class="main-content">
-        <div class="container blog-post">
-            <main>
-                <article>
-                    <header class="post-header">
-                        <h1 class="post-title">{title}</h1>
-                        <div class="post-meta">
-                            <time datetime="{date}">{date_formatted}</time>
-                        </div>
-{tags_html}
-                    </header>
-
-                    <div class="post-content">
-{content}
-                    </div>
-                    <section class="recommended-articles" id="recommended-articles" aria-label="相关文章推荐"></section>
-                </article>
-            </main>
-
-            <footer>
-                <div class="footer-content">
-                    <p>© 2025 筑居思. 保留所有权利.</p>
-                    <div class="social-links">
-                        <a href="https://github.com/ArchQian" aria-label="GitHub" target="_blank">
-                            <svg xmlns="http://www.w3.org/2000/svg" width="18" height="18" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"><path d="M9 19c-5 1.5-5-2.5-7-3m14 6v-3.87a3.37 3.37 0 0 0-.94-2.61c3.14-.35 6.44-1.54 6.44-7A5.44 5.44 0 0 0 20 4.77 5.07 5.07 0 0 0 19.91 1S18.73.65 16 2.48a13.38 13.38 0 0 0-7 0C6.27.65 5.09 1 5.09 1A5.07 5.07 0 0 0 5 4.77a5.44 5.44 0 0 0-1.5 3.78c0 5.42 3.3 6.61 6.44 7A3.37 3.37 0 0 0 9 18.13V22"></path></svg>
-                        </a>
-                        <a href="https://web.okjike.com/u/badeec5b-6ff4-4286-8622-3658365472fa" aria-label="即刻" target="_blank">
-                            <svg xmlns="http://www.w3.org/2000/svg" width="18" height="18" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"><circle cx="12" cy="12" r="10"></circle><path d="M8 14s1.5 2 4 2 4-2 4-2"></path><line x1="9" y1="9" x2="9.01" y2="9"></line><line x1="15" y1="9" x2="15.01" y2="9"></line></svg>
-                        </a>
-                        <a href="https://www.zcool.com.cn/u/27619561" aria-label="站酷" target="_blank">
-                            <svg xmlns="http://www.w3.org/2000/svg" width="18" height="18" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"><rect x="2" y="2" width="20" height="20" rx="5" ry="5"></rect><path d="M16 11.37A4 4 0 1 1 12.63 8 4 4 0 0 1 16 11.37z"></path><line x1="17.5" y1="6.5" x2="17.51" y2="6.5"></line></svg>
-                        </a>
-                        <a href="../rss.xml" aria-label="RSS订阅" target="_blank">
-                            <svg xmlns="http://www.w3.org/2000/svg" width="18" height="18" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"><path d="M4 11a9 9 0 0 1 9 9"></path><path d="M4 4a16 16 0 0 1 16 16"></path><circle cx="5" cy="19" r="1"></circle></svg>
-                        </a>
-                    </div>
-                </div>
-            </footer>
-        </div>
-    </div>
-
-    <script src="../js/theme-switcher.js"></script>
-    <script src="../js/lazy-loading.js"></script>
-    <script>
-      // 将基本元信息暴露给推荐模块（若无FrontMatter标签，则使用默认）
-      window.currentArticleMeta = window.currentArticleMeta || {{
-        title: {json.dumps(title)},
-        tags: {json.dumps(categories or [])},
-        pillar: {json.dumps((categories or ['思'])[0] if categories else '思')}
-      }};
-    </script>
-    <script src="../js/recommendations.js"></script>
-    <script src="../js/main.js"></script>
-</body>
-</html>'''
-        
-        return template
+        # 推荐模块的元信息；相关文章列表由 related_articles.py 在构建时填入
+        article_meta = json.dumps({'title': title, 'tags': categories or [],
+                                   'pillar': (categories or ['思'])[0]}, ensure_ascii=False).replace('</', '<\\/')
+        
+        return self.templates.render(
+            'post',
+            title=title,
+            description=description,
+            date=date,
+            date_formatted=date_formatted,
+            tags_html=tags_html,
+            content=content,
+            article_meta=article_meta,
+        )
 
 
 def main():
     """主函数"""
-    if len(sys.argv) < 2:
-        print("用法: markdown_to_html.py <markdown文件> [输出文件]")
+    args = [a for a in sys.argv[1:] if a != '--force']
+    force = len(args) != len(sys.argv) - 1
+    
+    if not args:
+        print("用法: markdown_to_html.py <markdown文件> [输出文件] [--force]")
         print("示例: markdown_to_html.py /path/to/obsidian/note.md")
+        print("  --force  忽略增量构建清单，强制重新渲染")
         sys.exit(1)
     
-    markdown_file = sys.argv[1]
-    output_file = sys.argv[2] if len(sys.argv) > 2 else None
+    markdown_file = args[0]
+    output_file = args[1] if len(args) > 1 else None
     
     converter = MarkdownConverter()
-    result = converter.convert(markdown_file, output_file)
+    result = converter.convert(markdown_file, output_file, force=force)
+    converter.manifest.save()
+    converter.attachments.save()
+    converter.responsive.save()
+    converter.image_meta.save()
+    # 清理清单中已不再引用的正文片段（每次改动笔记都会留下旧版本）
+    converter.fragments.prune(converter.manifest.fragments())
+
+    if result and not result.get('skipped'):
+        with PostCatalog() as catalog:
+            catalog.update_file(BLOGS_DIR / result['filename'])
     
     if result:
         print(f"\n✓ 转换完成！")
@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+博客文章目录（SQLite）
+把 blogs/*.html 的标题、描述、关键词、标签、发布时间、图片引用、摘要和正文哈希保存在 scripts/post_catalog.db，
+博客列表、首页、相关文章和元数据同步等脚本统一从这里查询，不再各自重新解析 HTML
+
+refresh() 只对比文件的 mtime 和大小，新增或改动过的文件才重新解析，已删除的文件从目录中移除；
+转换器写完页面后调用 update_file() 立即更新对应记录，批量改写页面的脚本（元数据同步、关键词）结束时再 refresh() 一次
+
+日期按 blog_dates.json（真实发布日期）> 文件名前缀 > 页面 <time> 的顺序确定，映射表每个目录实例只读一次
+
+用法：
+  python3 scripts/post_catalog.py          # 刷新目录并列出文章
+  python3 scripts/post_catalog.py --rebuild  # 丢弃目录，全部重新解析
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional
+
+SCRIPT_DIR = Path(__file__).parent
+SITE_ROOT = SCRIPT_DIR.parent
+BLOGS_DIR = SITE_ROOT / 'blogs'
+DATES_CONFIG = SITE_ROOT / 'blog_dates.json'
+CATALOG_FILE = SCRIPT_DIR / 'post_catalog.db'
+
+sys.path.insert(0, str(SCRIPT_DIR))
+from html_extract import clean_title, extract_file
+
+# 表结构版本（PRAGMA user_version），结构或提取规则变化时递增，旧目录会被整体重建
+CATALOG_VERSION = 3
+# 摘要（订阅源等使用）：正文开头的段落，累计到这么多字为止
+EXCERPT_CHARS = 280
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS posts (
+    filename     TEXT PRIMARY KEY,
+    mtime_ns     INTEGER NOT NULL,
+    size         INTEGER NOT NULL,
+    content_hash TEXT NOT NULL,
+    title        TEXT NOT NULL,
+    description  TEXT NOT NULL,
+    keywords     TEXT NOT NULL,
+    tags         TEXT NOT NULL,
+    time         TEXT NOT NULL,
+    h1           TEXT NOT NULL,
+    cover_image  TEXT,
+    images       TEXT NOT NULL,
+    excerpt      TEXT NOT NULL
+)
+"""
+COLUMNS = ['filename', 'mtime_ns', 'size', 'content_hash', 'title', 'description',
+           'keywords', 'tags', 'time', 'h1', 'cover_image', 'images', 'excerpt']
+JSON_COLUMNS = ('keywords', 'tags', 'images', 'excerpt')
+
+# 批量插入到每篇文章末尾的固定段落（add_whisper_intro.py 的「灵感私语」尾注），不计入正文哈希
+BOILERPLATE_PARAGRAPHS = {'🌱 灵感私语', '叶芽之下，别有根系。'}
+
+FILENAME_DATE = re.compile(r'^(\d{4}-\d{2}-\d{2})')
+
+
+def load_date_mappings() -> Dict[str, str]:
+    """加载日期映射配置（文件名 -> 真实发布日期）"""
+    if DATES_CONFIG.exists():
+        try:
+            with open(DATES_CONFIG, 'r', encoding='utf-8') as f:
+                return json.load(f).get('dates', {})
+        except (OSError, ValueError):
+            return {}
+    return {}
+
+
+def filename_date(filename: str) -> Optional[str]:
+    """文件名最前面的日期（标准格式：YYYY-MM-DD-标题.html），没有时返回None"""
+    match = FILENAME_DATE.match(Path(filename).stem)
+    return match.group(1) if match else None
+
+
+def select_cover_image(images: List[dict]) -> Optional[str]:
+    """
+    首图（灵魂封面图）：优先取位置A的定调图（第一个 figure > img），
+    否则取正文（.post-content 或 article）中的第一张图；占位图和未替换的模板变量不算
+    """
+    figure_images = [img for img in images if img['figure']]
+    content_images = [img for img in images if img['region'] in ('post-content', 'article')]
+    if figure_images:
+        cover = figure_images[0]['src']
+    elif content_images:
+        cover = content_images[0]['src']
+    else:
+        return None
+    if 'placeholder' in cover.lower() or '${' in cover:
+        return None
+    return cover
+
+
+def content_hash(page: dict) -> str:
+    """
+    正文实质内容的哈希：一级标题 + 正文段落（去掉固定尾注）
+    只改 meta（关键词、描述）、样式链接或批量补尾注时不变，站点地图据此判断页面是否真的更新过
+    """
+    paragraphs = [p for p in page['paragraphs'] if p not in BOILERPLATE_PARAGRAPHS]
+    payload = '\n'.join([page['h1']] + paragraphs)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def excerpt_paragraphs(paragraphs: List[str], limit: int = EXCERPT_CHARS) -> List[str]:
+    """正文开头的段落，总字数超过 limit 时截断最后一段并加省略号"""
+    excerpt = []
+    total = 0
+    for paragraph in paragraphs:
+        if total + len(paragraph) > limit:
+            excerpt.append(paragraph[:limit - total].rstrip() + '…')
+            break
+        excerpt.append(paragraph)
+        total += len(paragraph)
+    return excerpt
+
+
+def record_for(html_file: Path, st: os.stat_result) -> tuple:
+    """解析页面，返回按 COLUMNS 排列的一行"""
+    page = extract_file(html_file)
+    keywords = [k.strip() for k in page['meta'].get('keywords', '').split(',') if k.strip()]
+    images = [{'src': img['src'], 'region': img['region'], 'figure': img['figure']} for img in page['images']]
+    return (
+        html_file.name,
+        st.st_mtime_ns,
+        st.st_size,
+        content_hash(page),
+        clean_title(page['title']) if page['title'] else '',
+        page['meta'].get('description', ''),
+        json.dumps(keywords, ensure_ascii=False),
+        json.dumps(page['tags'], ensure_ascii=False),
+        page['time'],
+        page['h1'],
+        select_cover_image(page['images']),
+        json.dumps(images, ensure_ascii=False),
+        json.dumps(excerpt_paragraphs(page['paragraphs']), ensure_ascii=False),
+    )
+
+
+class PostCatalog:
+    """blogs/ 目录下文章元数据的持久化目录"""
+
+    def __init__(self, path=None, blogs_dir=None):
+        self.path = Path(path) if path else CATALOG_FILE
+        self.blogs_dir = Path(blogs_dir) if blogs_dir else BLOGS_DIR
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = self._connect()
+        self._date_mappings: Optional[Dict[str, str]] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        """打开数据库；版本不符或文件损坏时删除重建"""
+        try:
+            conn = sqlite3.connect(str(self.path))
+            if conn.execute('PRAGMA user_version').fetchone()[0] == CATALOG_VERSION:
+                return conn
+            conn.execute('DROP TABLE IF EXISTS posts')
+        except sqlite3.DatabaseError:
+            conn.close()
+            self.path.unlink()
+            conn = sqlite3.connect(str(self.path))
+        conn.execute(SCHEMA)
+        conn.execute(f'PRAGMA user_version = {CATALOG_VERSION}')
+        conn.commit()
+        return conn
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if self.conn:
+            self.conn.close()
+            self.conn = None
+
+    # ---- 维护 ----
+
+    def refresh(self) -> Dict[str, int]:
+        """按 mtime 和大小同步 blogs/*.html，返回 {'updated': 重新解析数, 'removed': 移除数}"""
+        known = {name: (mtime, size) for name, mtime, size in
+                 self.conn.execute('SELECT filename, mtime_ns, size FROM posts')}
+        updated = 0
+        seen = set()
+        for html_file in self.blogs_dir.glob('*.html'):
+            if html_file.name.startswith('.'):
+                continue
+            try:
+                st = html_file.stat()
+            except OSError:
+                continue
+            seen.add(html_file.name)
+            if known.get(html_file.name) != (st.st_mtime_ns, st.st_size):
+                self._store(html_file, st)
+                updated += 1
+        removed = [name for name in known if name not in seen]
+        self.conn.executemany('DELETE FROM posts WHERE filename = ?', [(name,) for name in removed])
+        self.conn.commit()
+        return {'updated': updated, 'removed': len(removed)}
+
+    def update_file(self, html_file) -> bool:
+        """页面写入后立即更新其记录；文件不存在时移除记录，返回记录是否存在"""
+        html_file = Path(html_file)
+        if html_file.resolve().parent != self.blogs_dir.resolve():
+            return False
+        try:
+            st = html_file.stat()
+        except OSError:
+            self.remove(html_file.name)
+            return False
+        self._store(html_file, st)
+        self.conn.commit()
+        return True
+
+    def remove(self, filename: str):
+        self.conn.execute('DELETE FROM posts WHERE filename = ?', (filename,))
+        self.conn.commit()
+
+    def _store(self, html_file: Path, st: os.stat_result):
+        placeholders = ', '.join('?' * len(COLUMNS))
+        self.conn.execute(f"INSERT OR REPLACE INTO posts ({', '.join(COLUMNS)}) VALUES ({placeholders})",
+                          record_for(html_file, st))
+
+    # ---- 查询 ----
+
+    @property
+    def date_mappings(self) -> Dict[str, str]:
+        """blog_dates.json 只在第一次查询时读取"""
+        if self._date_mappings is None:
+            self._date_mappings = load_date_mappings()
+        return self._date_mappings
+
+    def _row(self, row: tuple) -> dict:
+        post = dict(zip(COLUMNS, row))
+        for column in JSON_COLUMNS:
+            post[column] = json.loads(post[column])
+        name = post['filename']
+        post['date'] = (self.date_mappings.get(name) or filename_date(name)
+                        or (post['time'].split()[0] if post['time'] else ''))
+        return post
+
+    def get(self, filename: str) -> Optional[dict]:
+        row = self.conn.execute(f"SELECT {', '.join(COLUMNS)} FROM posts WHERE filename = ?",
+                                (filename,)).fetchone()
+        return self._row(row) if row else None
+
+    def posts(self) -> List[dict]:
+        """全部文章，按日期从新到旧排序（日期相同时按文件名倒序）"""
+        rows = self.conn.execute(f"SELECT {', '.join(COLUMNS)} FROM posts ORDER BY filename DESC")
+        posts = [self._row(row) for row in rows]
+        posts.sort(key=lambda p: p['date'], reverse=True)
+        return posts
+
+
+def load_posts() -> List[dict]:
+    """刷新目录并返回全部文章（供列表、首页等生成脚本使用）"""
+    with PostCatalog() as catalog:
+        catalog.refresh()
+        return catalog.posts()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='刷新博客文章目录')
+    parser.add_argument('--rebuild', action='store_true', help='删除现有目录后全部重新解析')
+    args = parser.parse_args()
+
+    if args.rebuild and CATALOG_FILE.exists():
+        CATALOG_FILE.unlink()
+
+    with PostCatalog() as catalog:
+        stats = catalog.refresh()
+        posts = catalog.posts()
+
+    for post in posts:
+        print(f"{post['date'] or '----------'}  {post['title'] or '(无标题)'}  [{post['filename']}]")
+    print(f"✓ 文章目录: {len(posts)} 篇（重新解析 {stats['updated']} 篇，移除 {stats['removed']} 篇）")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
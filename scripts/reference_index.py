@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+站内文章引用索引 + 多模式替换
+记录站点中每个文本文件（.html、.xml、.json）引用了哪些 blogs/*.html，按文件 mtime 和大小增量刷新；
+遍历时跳过 images/、.git/ 等目录，不读取未变化的文件
+
+文章改名时先从索引查出确实引用了旧文件名的文件，再用 Aho-Corasick 自动机把所有「旧 -> 新」替换对
+一遍扫描完成，耗时只与引用数量有关，不再是「文件数 × 替换对数」次 str.replace
+
+页面内联的相关文章数据（window.relatedArticles）只写文件名、不带 blogs/，不在这里改写，
+改名脚本随后会运行 related_articles.build() 重新生成
+
+用法：
+  python3 scripts/reference_index.py               # 刷新索引并统计
+  python3 scripts/reference_index.py 文章.html      # 列出引用该文章的文件
+"""
+
+import json
+import os
+import re
+import sys
+from collections import deque
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import quote, unquote
+
+SCRIPT_DIR = Path(__file__).parent
+SITE_ROOT = SCRIPT_DIR.parent
+INDEX_FILE = SCRIPT_DIR / 'reference_index.json'
+
+INDEX_VERSION = 1
+# 可能包含文章链接的文本文件
+TEXT_SUFFIXES = {'.html', '.xml', '.json'}
+# 不含文章链接、不需要遍历的目录（fragment_cache 中的片段以 Markdown 哈希为键，不能单独改写）
+SKIP_DIRS = {'.git', 'images', 'node_modules', '__pycache__', 'fragment_cache'}
+
+# blogs/文件名.html，文件名可能是原文或百分号编码（订阅源、站点地图）
+REFERENCE = re.compile(r'blogs/([^\s"\'<>()\\?#]+?\.html)')
+
+
+def references_in(text: str) -> List[str]:
+    """文本中引用的文章文件名（已解码，去重排序）"""
+    return sorted({unquote(name) for name in REFERENCE.findall(text)})
+
+
+class ReplacementAutomaton:
+    """
+    Aho-Corasick 自动机：把全部替换对编译成一个状态机，一遍扫描找出所有匹配，
+    按「最左、最长、互不重叠」选取后同时替换（替换结果不会被其他替换对再次改写）
+    """
+
+    def __init__(self, replacements: Dict[str, str]):
+        self.replacements = {old: new for old, new in replacements.items() if old and old != new}
+        self.goto: List[Dict[str, int]] = [{}]
+        self.fail: List[int] = [0]
+        # 在该状态结束的所有模式的长度（含沿失败链可达的）
+        self.output: List[List[int]] = [[]]
+        for pattern in self.replacements:
+            self._insert(pattern)
+        self._link()
+
+    def _insert(self, pattern: str):
+        state = 0
+        for ch in pattern:
+            if ch not in self.goto[state]:
+                self.goto.append({})
+                self.fail.append(0)
+                self.output.append([])
+                self.goto[state][ch] = len(self.goto) - 1
+            state = self.goto[state][ch]
+        self.output[state].append(len(pattern))
+
+    def _link(self):
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, child in self.goto[state].items():
+                fallback = self.fail[state]
+                while fallback and ch not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[child] = self.goto[fallback].get(ch, 0)
+                self.output[child] = self.output[child] + self.output[self.fail[child]]
+                queue.append(child)
+
+    def matches(self, text: str) -> List[Tuple[int, int]]:
+        """所有匹配的 (起点, 终点)"""
+        found = []
+        state = 0
+        goto, fail, output = self.goto, self.fail, self.output
+        for i, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for length in output[state]:
+                found.append((i + 1 - length, i + 1))
+        return found
+
+    def replace(self, text: str, accept: Optional[Callable[[str, int, int], bool]] = None) -> Tuple[str, int]:
+        """
+        返回 (替换后的文本, 替换次数)
+        accept(text, 起点, 终点) 给出时只替换它认可的匹配（如要求两侧是分隔符）
+        """
+        if not self.replacements:
+            return text, 0
+        found = self.matches(text)
+        if accept is not None:
+            found = [(start, end) for start, end in found if accept(text, start, end)]
+        if not found:
+            return text, 0
+        found.sort(key=lambda match: (match[0], -match[1]))
+        parts = []
+        position = 0
+        for start, end in found:
+            if start < position:
+                continue
+            parts.append(text[position:start])
+            parts.append(self.replacements[text[start:end]])
+            position = end
+        parts.append(text[position:])
+        return ''.join(parts), len(parts) // 2
+
+
+class ReferenceIndex:
+    """站内文件 -> {mtime_ns, size, refs} 的持久化索引"""
+
+    def __init__(self, root=None, path=None):
+        self.root = Path(root) if root else SITE_ROOT
+        self.path = Path(path) if path else INDEX_FILE
+        self.files: Dict[str, dict] = {}
+        self.dirty = False
+        self.load()
+
+    def load(self):
+        if not self.path.exists():
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get('version') == INDEX_VERSION:
+            self.files = data.get('files', {})
+
+    def save(self):
+        if not self.dirty:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix('.json.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': INDEX_VERSION, 'files': self.files}, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+        self.dirty = False
+
+    def _text_files(self) -> Iterable[Path]:
+        skip = {self.path.resolve(), self.path.with_suffix('.json.tmp').resolve()}
+        for directory, dirnames, filenames in os.walk(self.root):
+            dirnames[:] = [d for d in dirnames if d not in SKIP_DIRS and not d.startswith('.')]
+            for filename in filenames:
+                path = Path(directory) / filename
+                if path.suffix.lower() in TEXT_SUFFIXES and path.resolve() not in skip:
+                    yield path
+
+    def refresh(self) -> Dict[str, int]:
+        """按 mtime 和大小同步索引，返回 {'scanned': 重新读取数, 'removed': 移除数}"""
+        seen = set()
+        scanned = 0
+        for path in self._text_files():
+            relative = path.relative_to(self.root).as_posix()
+            seen.add(relative)
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            entry = self.files.get(relative)
+            if entry and entry['mtime_ns'] == st.st_mtime_ns and entry['size'] == st.st_size:
+                continue
+            try:
+                text = path.read_text(encoding='utf-8')
+            except (OSError, UnicodeDecodeError):
+                text = ''
+            self.record(relative, st, text)
+            scanned += 1
+        removed = [relative for relative in self.files if relative not in seen]
+        for relative in removed:
+            del self.files[relative]
+        if removed:
+            self.dirty = True
+        return {'scanned': scanned, 'removed': len(removed)}
+
+    def record(self, relative: str, st: os.stat_result, text: str):
+        """记录文件内容中的引用（写入文件后调用，避免下次刷新重新读取）"""
+        self.files[relative] = {'mtime_ns': st.st_mtime_ns, 'size': st.st_size, 'refs': references_in(text)}
+        self.dirty = True
+
+    def referencing(self, names: Iterable[str]) -> List[str]:
+        """引用了 names 中任一文章的文件（相对路径）"""
+        names = set(names)
+        return sorted(relative for relative, entry in self.files.items() if names.intersection(entry['refs']))
+
+
+def rewrite_references(renames: List[Tuple[Path, Path]]) -> List[Path]:
+    """
+    把站内对 blogs/旧文件名 的引用（原文和百分号编码两种写法）改为新文件名，返回改动过的文件
+    只读取索引中引用了旧文件名的文件
+    """
+    replacements = {}
+    for old, new in renames:
+        replacements[f'blogs/{old.name}'] = f'blogs/{new.name}'
+        replacements[f'blogs/{quote(old.name)}'] = f'blogs/{quote(new.name)}'
+    automaton = ReplacementAutomaton(replacements)
+
+    index = ReferenceIndex()
+    index.refresh()
+    updated = []
+    for relative in index.referencing(old.name for old, _ in renames):
+        path = index.root / relative
+        try:
+            text = path.read_text(encoding='utf-8')
+        except (OSError, UnicodeDecodeError):
+            continue
+        text, count = automaton.replace(text)
+        if count:
+            path.write_text(text, encoding='utf-8')
+            updated.append(path)
+        index.record(relative, path.stat(), text)
+    index.save()
+    return updated
+
+
+def main():
+    index = ReferenceIndex()
+    stats = index.refresh()
+    index.save()
+    if len(sys.argv) > 1:
+        for name in sys.argv[1:]:
+            name = Path(name).name
+            files = index.referencing([name])
+            print(f"{name}: {len(files)} 个文件引用")
+            for relative in files:
+                print(f"  - {relative}")
+        return 0
+    with_refs = sum(1 for entry in index.files.values() if entry['refs'])
+    print(f"✓ 引用索引: {len(index.files)} 个文本文件，{with_refs} 个含文章链接"
+          f"（重新读取 {stats['scanned']} 个，移除 {stats['removed']} 个）")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+相关文章预计算
+构建时根据标签重叠、所属支柱（筑/居/思）和全文 TF-IDF 相似度，为每篇博客算出最相关的几篇文章，
+把结果内联到页面（window.relatedArticles），js/recommendations.js 只负责渲染，不再打分也不发请求
+
+用法：
+  python3 scripts/related_articles.py          # 更新 blogs/*.html
+  python3 scripts/related_articles.py --dry-run  # 只打印推荐结果
+"""
+
+import argparse
+import heapq
+import json
+import re
+import sys
+from pathlib import Path
+from typing import Dict, List
+
+SCRIPT_DIR = Path(__file__).parent
+SITE_ROOT = SCRIPT_DIR.parent
+BLOGS_DIR = SITE_ROOT / 'blogs'
+
+sys.path.insert(0, str(SCRIPT_DIR))
+from link_recommender import SparseIndex, build_corpus
+from post_catalog import load_posts
+
+# 每篇文章推荐的数量
+TOP_K = 3
+# 打分权重：标签重叠（每个） > 文本相似度（余弦，0~1） > 同一支柱
+TAG_WEIGHT = 10
+TEXT_WEIGHT = 20
+PILLAR_WEIGHT = 3
+# 不参与重叠计算的通用标签
+GENERIC_TAGS = {'筑居思', '博客'}
+
+# 支柱判定：标签和标题中命中关键词最多的支柱，都没命中时归为「思」
+PILLAR_KEYWORDS = {
+    '筑': ['建筑', '设计', '造物', '实践', '实验', 'remake', '手作', '社区营造', 'mapping', '工具', '效率'],
+    '居': ['生活', '栖居', '居住', '空间', '旅行', '大理', '安住', '日常', '玩', '平衡', 'rss'],
+    '思': ['哲学', '哲思', '思考', '内观', '禅修', '觉察', '阅读', '决策', '成长', '自我', '想象'],
+}
+DEFAULT_PILLAR = '思'
+
+DATA_SCRIPT_ID = 'related-articles-data'
+SECTION_HTML = '<section class="recommended-articles" id="recommended-articles" aria-label="相关文章推荐"></section>'
+SCRIPT_TAG = '<script src="../js/recommendations.js"></script>'
+STYLE_TAG = '<link rel="stylesheet" href="../css/recommendations.css">'
+
+
+def extract_tags(post: dict) -> List[str]:
+    """页面上的标签（.tag）加 meta keywords，去重保序"""
+    return list(dict.fromkeys(t for t in post['tags'] + post['keywords'] if t))
+
+
+def extract_image(post: dict):
+    """正文中第一张真实图片（跳过占位图），路径相对 blogs/ 目录"""
+    for img in post['images']:
+        src = img['src']
+        if img['region'] != 'post-content' or 'placeholder' in src or src.startswith('data:'):
+            continue
+        if src.startswith(('http://', 'https://', '//')) or (BLOGS_DIR / src).resolve().is_file():
+            return src
+    return None
+
+
+def detect_pillar(title: str, tags: List[str]) -> str:
+    text = ' '.join([title] + tags).lower()
+    scores = {pillar: sum(text.count(k) for k in keywords) for pillar, keywords in PILLAR_KEYWORDS.items()}
+    best = max(scores.values())
+    if best == 0 or list(scores.values()).count(best) > 1 and scores[DEFAULT_PILLAR] == best:
+        return DEFAULT_PILLAR
+    return max(scores, key=scores.get)
+
+
+def collect_posts() -> List[dict]:
+    """从文章目录按日期从新到旧收集博客信息（跳过没有日期的页面）"""
+    posts = []
+    for info in load_posts():
+        if not info['date']:
+            continue
+        tags = extract_tags(info)
+        posts.append({
+            'title': info['title'],
+            'date': info['date'],
+            'filename': info['filename'],
+            'tags': tags,
+            'pillar': detect_pillar(info['title'], tags),
+            'image': extract_image(info),
+        })
+    return posts
+
+
+def text_similarities(posts: List[dict]) -> Dict[str, Dict[str, float]]:
+    """全文 TF-IDF 余弦相似度：文件名 -> {文件名: 相似度}，只包含有共同词项的文章"""
+    data = build_corpus(str(SITE_ROOT), 'blogs')
+    names = [Path(e['path']).name for e in data['entries']]
+    vectors = [e['vector'] for e in data['entries']]
+    sparse = SparseIndex(vectors)
+    wanted = {p['filename'] for p in posts}
+    sims = {}
+    for name, vec in zip(names, vectors):
+        if name in wanted:
+            sims[name] = {names[doc]: score for doc, score in sparse.query(vec, len(names)) if names[doc] != name}
+    return sims
+
+
+def compute_related(posts: List[dict], sims: Dict[str, Dict[str, float]], k: int = TOP_K) -> Dict[str, List[dict]]:
+    """为每篇文章挑出得分最高的 k 篇；得分相同时较新的文章优先，不足 k 篇时用同支柱和最新文章补齐"""
+    order = {p['filename']: i for i, p in enumerate(posts)}
+    by_tag: Dict[str, set] = {}
+    for post in posts:
+        for tag in set(post['tags']) - GENERIC_TAGS:
+            by_tag.setdefault(tag, set()).add(post['filename'])
+    by_name = {p['filename']: p for p in posts}
+
+    related = {}
+    for post in posts:
+        name = post['filename']
+        tags = set(post['tags']) - GENERIC_TAGS
+        text = sims.get(name, {})
+        candidates = set(text)
+        for tag in tags:
+            candidates |= by_tag[tag]
+        candidates.discard(name)
+
+        scored = []
+        for other in candidates:
+            overlap = len(tags & set(by_name[other]['tags']))
+            score = (overlap * TAG_WEIGHT + text.get(other, 0.0) * TEXT_WEIGHT
+                     + (PILLAR_WEIGHT if by_name[other]['pillar'] == post['pillar'] else 0))
+            scored.append((score, other))
+        picked = [other for _, other in heapq.nsmallest(k, scored, key=lambda x: (-x[0], order[x[1]]))]
+
+        # 补齐：先同支柱，再按时间从新到旧
+        for pool in ([p for p in posts if p['pillar'] == post['pillar']], posts):
+            for other in pool:
+                if len(picked) >= k:
+                    break
+                if other['filename'] != name and other['filename'] not in picked:
+                    picked.append(other['filename'])
+
+        related[name] = [{
+            'title': by_name[other]['title'],
+            'slug': other,
+            'date': by_name[other]['date'],
+            'tags': by_name[other]['tags'][:4],
+            'pillar': by_name[other]['pillar'],
+            'image': by_name[other]['image'],
+        } for other in picked]
+    return related
+
+
+def script_json(value) -> str:
+    """可安全放进 <script> 的 JSON"""
+    return json.dumps(value, ensure_ascii=False).replace('</', '<\\/')
+
+
+def inject(content: str, post: dict, related: List[dict]) -> str:
+    """写入（或替换）页面中的推荐数据，必要时补上推荐区块、样式和脚本"""
+    meta = {'title': post['title'], 'tags': post['tags'], 'pillar': post['pillar'], 'image': post['image']}
+    data_script = (f'<script id="{DATA_SCRIPT_ID}">window.currentArticleMeta = {script_json(meta)}; '
+                   f'window.relatedArticles = {script_json(related)};</script>')
+
+    pattern = re.compile(rf'<script id="{DATA_SCRIPT_ID}">.*?</script>', re.DOTALL)
+    if pattern.search(content):
+        return pattern.sub(lambda m: data_script, content, count=1)
+
+    if 'id="recommended-articles"' not in content and '</article>' in content:
+        i = content.rindex('</article>')
+        content = f"{content[:i]}    {SECTION_HTML}\n                {content[i:]}"
+    if 'css/recommendations.css' not in content:
+        content = content.replace('</head>', f'    {STYLE_TAG}\n</head>', 1)
+    if SCRIPT_TAG in content:
+        return content.replace(SCRIPT_TAG, f'{data_script}\n    {SCRIPT_TAG}', 1)
+    return content.replace('</body>', f'    {data_script}\n    {SCRIPT_TAG}\n</body>', 1)
+
+
+def build(k: int = TOP_K, dry_run: bool = False) -> int:
+    """计算所有文章的相关推荐并写入页面，返回更新的页面数"""
+    posts = collect_posts()
+    if not posts:
+        print("⊘ 未找到博客文章，跳过相关文章")
+        return 0
+    related = compute_related(posts, text_similarities(posts), k)
+
+    updated = 0
+    for post in posts:
+        name = post['filename']
+        if dry_run:
+            print(f"{post['title']} [{post['pillar']}]")
+            for rec in related[name]:
+                print(f"    → {rec['title']}")
+            continue
+        path = BLOGS_DIR / name
+        content = path.read_text(encoding='utf-8')
+        new_content = inject(content, post, related[name])
+        if new_content != content:
+            path.write_text(new_content, encoding='utf-8')
+            updated += 1
+
+    if not dry_run:
+        print(f"✓ 相关文章: {len(posts)} 篇文章（{updated} 个页面有变化）")
+    return updated
+
+
+def main():
+    parser = argparse.ArgumentParser(description='预计算相关文章并写入博客页面')
+    parser.add_argument('--dry-run', action='store_true', help='只打印推荐结果，不修改页面')
+    parser.add_argument('-k', type=int, default=TOP_K, help='每篇文章推荐的数量')
+    args = parser.parse_args()
+
+    build(args.k, args.dry_run)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -12,6 +12,7 @@
 
 import os
 import re
+import sys
 import json
 from pathlib import Path
 from typing import Dict, Tuple, List
@@ -21,6 +22,9 @@ BLOGS_DIR = SITE_ROOT / 'blogs'
 CONFIG_FILE = SITE_ROOT / 'blog_config.json'
 MAPPING_FILE = Path(__file__).parent / 'title_slug_mapping.json'
 
+sys.path.insert(0, str(Path(__file__).parent))
+from reference_index import rewrite_references
+
 
 def load_config() -> dict:
     if CONFIG_FILE.exists():
@@ -149,26 +153,8 @@ def plan_renames(title_to_slug: Dict[str, str]) -> List[Tuple[Path, Path]]:
 def update_references(renames: List[Tuple[Path, Path]]):
     if not renames:
         return
-    # 构建替换对
-    pairs = [(f"blogs/{old.name}", f"blogs/{new.name}") for old, new in renames]
-
-    # 遍历站点下所有 .html/.xml 文件进行替换
-    for path in SITE_ROOT.rglob('*'):
-        if not path.is_file():
-            continue
-        if path.suffix.lower() not in {'.html', '.xml'}:
-            continue
-        try:
-            text = path.read_text(encoding='utf-8')
-        except Exception:
-            continue
-
-        orig = text
-        for old_ref, new_ref in pairs:
-            text = text.replace(old_ref, new_ref)
-
-        if text != orig:
-            path.write_text(text, encoding='utf-8')
+    # 只改写引用索引中确实链接了旧文件名的文件，全部替换对一遍扫描完成
+    rewrite_references(renames)
 
 
 def main():
@@ -207,6 +193,11 @@ def main():
 
     # 更新全站引用
     update_references(renames)
+    # 相关文章数据（window.relatedArticles）用的是不带 blogs/ 的文件名，重新计算；再重新生成站点地图
+    import related_articles
+    import build_sitemap
+    related_articles.build()
+    build_sitemap.build()
 
     print(f'✅ 已完成重命名与引用更新，共 {len(renames)} 个文件')
     return 0
@@ -15,10 +15,13 @@ import os
 import re
 import json
 import shutil
+import hashlib
 from pathlib import Path
 from datetime import datetime
 from urllib.parse import unquote
 
+from image_store import available_path, hash_file
+
 # 配置
 BASE_DIR = Path(__file__).parent.parent
 IMAGES_BLOG_DIR = BASE_DIR / "images" / "blog"
@@ -92,6 +95,14 @@ def extract_date_from_filename(filename):
     return None
 
 
+def content_digest(relative_path):
+    """返回images/blog下文件的内容哈希；文件不存在时退化为路径字符串的哈希"""
+    file_path = IMAGES_BLOG_DIR / relative_path
+    if file_path.is_file():
+        return hash_file(file_path)
+    return hashlib.sha256(str(relative_path).encode('utf-8')).hexdigest()
+
+
 def generate_english_filename(original_path, mapping, base_dir=None):
     """生成英文文件名
     
@@ -166,13 +177,10 @@ def generate_english_filename(original_path, mapping, base_dir=None):
         base_name = '-'.join(keywords)
         new_name = f"{base_name}{ext}"
         
-        # 确保文件名唯一
-        counter = 1
-        original_new_name = new_name
-        while (IMAGES_BLOG_DIR / new_name).exists() and new_name not in mapping.values():
-            name_part, ext_part = os.path.splitext(original_new_name)
-            new_name = f"{name_part}-{counter}{ext_part}"
-            counter += 1
+        # 确保文件名唯一：重名时追加内容哈希（文件不在images/blog时用原路径哈希），只需判断一次
+        if (IMAGES_BLOG_DIR / new_name).exists() and new_name not in mapping.values():
+            name_part, ext_part = os.path.splitext(new_name)
+            new_name = f"{name_part}-{content_digest(original_path)[:8]}{ext_part}"
     
     return new_name
 
@@ -217,14 +225,17 @@ def rename_files(mapping):
                 mapping[relative_str] = new_filename
                 continue
             
-            # 如果目标文件已存在（但不是同一个文件），添加数字后缀
+            # 如果目标文件已存在（但不是同一个文件）：找内容相同的文件或未被占用的 "原名-哈希" 文件名
             if new_file.exists():
-                base, ext = os.path.splitext(new_filename)
-                counter = 1
-                while new_file.exists():
-                    new_filename = f"{base}-{counter}{ext}"
-                    new_file = IMAGES_BLOG_DIR / new_filename
-                    counter += 1
+                new_file, same = available_path(IMAGES_BLOG_DIR, new_filename, hash_file(old_file))
+                new_filename = new_file.name
+                if same:
+                    # 内容完全相同：删除重复文件，直接引用已有文件
+                    if not old_file.samefile(new_file):
+                        old_file.unlink()
+                    mapping[relative_str] = new_filename
+                    print(f"⊘ {relative_str} - 与 {new_filename} 内容相同，已去重")
+                    continue
             
             # 如果是嵌套文件，先移动到主目录
             if '/' in str(relative_path) or '\\' in str(relative_path):
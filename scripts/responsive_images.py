@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+响应式图片生成
+为文章引用的图片生成按宽度分级的 WebP（Pillow支持时另加 AVIF）版本，
+并把文章中的 <img> 包装为 <picture>/srcset，移动端只下载合适尺寸的图片
+
+变体按源文件内容哈希命名（images/responsive/<哈希>-<宽度>.<格式>），源图不变就不会重复生成
+
+用法：
+  python3 scripts/responsive_images.py                 # 处理 blogs/*.html
+  python3 scripts/responsive_images.py blogs/xxx.html  # 处理指定页面
+"""
+
+import json
+import os
+import re
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional
+from urllib.parse import quote, unquote
+
+sys.path.insert(0, str(Path(__file__).parent))
+from image_store import ImageStore
+
+try:
+    from PIL import Image, ImageOps, features
+    PIL_AVAILABLE = True
+except ImportError:
+    PIL_AVAILABLE = False
+
+SCRIPT_DIR = Path(__file__).parent
+SITE_ROOT = SCRIPT_DIR.parent
+BLOGS_DIR = SITE_ROOT / 'blogs'
+VARIANTS_DIR = SITE_ROOT / 'images' / 'responsive'
+MANIFEST_FILE = SCRIPT_DIR / 'responsive_manifest.json'
+
+# 生成的宽度档位（像素）与文章版心宽度对应的 sizes
+WIDTHS = [480, 960, 1440]
+SIZES = '(max-width: 768px) 100vw, 800px'
+QUALITY = {'webp': 78, 'avif': 55}
+SOURCE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.webp'}
+MIME_TYPES = {'avif': 'image/avif', 'webp': 'image/webp'}
+
+# 宽度档位、编码参数或标记格式变化时递增，构建清单据此重新渲染文章
+PIPELINE_VERSION = 1
+
+IMG_OR_PICTURE = re.compile(r'<picture\b.*?</picture>|<img\b[^>]*>', re.IGNORECASE | re.DOTALL)
+SRC_ATTR = re.compile(r'\ssrc=(["\'])(.*?)\1', re.IGNORECASE | re.DOTALL)
+
+
+def available_formats() -> List[str]:
+    """按优先级返回可用的输出格式（<source>顺序即浏览器选择顺序）"""
+    if not PIL_AVAILABLE:
+        return []
+    formats = []
+    if features.check('avif'):
+        formats.append('avif')
+    if features.check('webp'):
+        formats.append('webp')
+    return formats
+
+
+class ResponsiveImages:
+    """响应式变体生成器，源图哈希 -> {宽度, 已生成的变体} 持久化缓存"""
+
+    def __init__(self, store: Optional[ImageStore] = None, path=None):
+        self.store = store or ImageStore(SITE_ROOT)
+        self.path = Path(path) if path else MANIFEST_FILE
+        self.formats = available_formats()
+        self.entries: Dict[str, dict] = {}
+        self.dirty = False
+        self.load()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.formats)
+
+    def load(self):
+        if not self.path.exists():
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get('version') == PIPELINE_VERSION:
+            self.entries = data.get('images', {})
+
+    def save(self):
+        self.store.save()
+        if not self.dirty:
+            return
+        tmp_path = self.path.with_suffix('.json.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': PIPELINE_VERSION, 'images': self.entries}, f, ensure_ascii=False, indent=1)
+        os.replace(tmp_path, self.path)
+        self.dirty = False
+
+    def variants(self, source: Path) -> Dict[str, List[tuple]]:
+        """
+        返回 格式 -> [(相对网站根目录的路径, 宽度)]，缺失的变体会被生成
+        不支持的格式或无法读取的图片返回空字典
+        """
+        if not self.enabled or source.suffix.lower() not in SOURCE_EXTENSIONS or not source.is_file():
+            return {}
+        digest = self.store.file_hash(source)
+        entry = self.entries.get(digest)
+        if entry and all(fmt in entry['variants'] for fmt in self.formats) and all(
+                (SITE_ROOT / rel).is_file() for fmt in self.formats for rel, _ in entry['variants'][fmt]):
+            return {fmt: [tuple(v) for v in entry['variants'][fmt]] for fmt in self.formats}
+
+        try:
+            with Image.open(source) as im:
+                im = ImageOps.exif_transpose(im)
+                if im.mode not in ('RGB', 'RGBA'):
+                    im = im.convert('RGBA' if 'A' in im.getbands() else 'RGB')
+                widths = sorted({w for w in WIDTHS if w < im.width} | {min(im.width, WIDTHS[-1])})
+                VARIANTS_DIR.mkdir(parents=True, exist_ok=True)
+                result = {}
+                for fmt in self.formats:
+                    result[fmt] = []
+                    for width in widths:
+                        target = VARIANTS_DIR / f"{digest[:16]}-{width}.{fmt}"
+                        if not target.exists():
+                            height = max(1, round(im.height * width / im.width))
+                            resized = im if width == im.width else im.resize((width, height), Image.LANCZOS)
+                            resized.save(target, fmt.upper(), quality=QUALITY[fmt])
+                        result[fmt].append((target.relative_to(SITE_ROOT).as_posix(), width))
+        except (OSError, ValueError) as e:
+            print(f"  ⚠️  无法生成响应式图片 {source.name}: {e}")
+            return {}
+
+        self.entries[digest] = {'width': widths[-1], 'variants': result}
+        self.dirty = True
+        return result
+
+    def picture_markup(self, img_tag: str, page_dir: Path) -> str:
+        """把单个 <img> 标签包装为 <picture>，无法处理时原样返回"""
+        m = SRC_ATTR.search(img_tag)
+        if not m:
+            return img_tag
+        src = m.group(2)
+        if re.match(r'^(https?:)?//|^data:', src):
+            return img_tag
+        source = Path(os.path.normpath(page_dir / unquote(src)))
+        variants = self.variants(source)
+        if not variants:
+            return img_tag
+
+        rel_prefix = os.path.relpath(SITE_ROOT, page_dir).replace(os.sep, '/')
+        sources = []
+        for fmt in self.formats:
+            srcset = ', '.join(f"{quote(f'{rel_prefix}/{rel}')} {width}w" for rel, width in variants[fmt])
+            sources.append(f'<source type="{MIME_TYPES[fmt]}" srcset="{srcset}" sizes="{SIZES}">')
+        return f"<picture>{''.join(sources)}{img_tag}</picture>"
+
+    def rewrite_html(self, html: str, page_dir: Path = BLOGS_DIR) -> str:
+        """把HTML中尚未包装的 <img> 改写为 <picture>，已有的 <picture> 保持不变"""
+        if not self.enabled:
+            return html
+
+        def replace(match):
+            tag = match.group(0)
+            if tag[:8].lower() == '<picture':
+                return tag
+            return self.picture_markup(tag, page_dir)
+
+        return IMG_OR_PICTURE.sub(replace, html)
+
+
+def process_page(generator: ResponsiveImages, html_file: Path) -> bool:
+    """为已生成的页面补充 <picture> 标记，只在内容变化时写回"""
+    content = html_file.read_text(encoding='utf-8')
+    new_content = generator.rewrite_html(content, html_file.parent)
+    if new_content == content:
+        return False
+    html_file.write_text(new_content, encoding='utf-8')
+    return True
+
+
+def main():
+    if not PIL_AVAILABLE:
+        print("❌ 未安装 Pillow，请运行: pip3 install -r scripts/requirements.txt")
+        return 1
+
+    generator = ResponsiveImages()
+    if not generator.enabled:
+        print("❌ 当前 Pillow 不支持 WebP/AVIF 编码")
+        return 1
+
+    files = [Path(p) for p in sys.argv[1:]] or sorted(BLOGS_DIR.glob('*.html'))
+    print(f"输出格式: {', '.join(generator.formats)}; 宽度档位: {WIDTHS}")
+
+    updated = 0
+    for html_file in files:
+        if process_page(generator, html_file.resolve()):
+            updated += 1
+            print(f"✓ {html_file.name}")
+    generator.save()
+    print(f"\n完成: 更新 {updated}/{len(files)} 个页面")
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
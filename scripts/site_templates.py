@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+页面模板层
+模板文件放在 scripts/templates/：页面布局（如 post.html）和 partials/ 下的公共片段（head、sidebar、footer、scripts）。
+语法只有两种：
+  {{ 变量 }}    原样插入渲染参数（调用方负责转义）
+  {{> 片段 }}   插入 partials/片段.html，片段中也可以再引用片段
+
+每个布局第一次使用时展开片段并编译为「文本段 + 变量名」列表，之后的渲染只做字符串拼接；
+version() 为全部模板文件内容的哈希，改动任何布局或片段都会让依赖它的增量构建失效
+
+用法（调试）：
+  python3 scripts/site_templates.py          # 列出模板及版本
+"""
+
+import hashlib
+import re
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional
+
+SCRIPT_DIR = Path(__file__).parent
+TEMPLATES_DIR = SCRIPT_DIR / 'templates'
+PARTIALS_DIR_NAME = 'partials'
+
+# 模板语法或编译规则变化时递增
+ENGINE_VERSION = 1
+
+PARTIAL = re.compile(r'\{\{>\s*([\w-]+)\s*\}\}')
+VARIABLE = re.compile(r'\{\{\s*(\w+)\s*\}\}')
+
+
+class Template:
+    """编译后的模板：literals 比 names 多一段，渲染时交替拼接"""
+
+    def __init__(self, name: str, source: str):
+        self.name = name
+        parts = VARIABLE.split(source)
+        self.literals: List[str] = parts[0::2]
+        self.names: List[str] = parts[1::2]
+
+    def render(self, context: Dict[str, object]) -> str:
+        out = [self.literals[0]]
+        for name, literal in zip(self.names, self.literals[1:]):
+            try:
+                out.append(str(context[name]))
+            except KeyError:
+                raise KeyError(f"模板 {self.name} 缺少变量: {name}") from None
+            out.append(literal)
+        return ''.join(out)
+
+
+class TemplateSet:
+    """一个模板目录；编译结果和版本哈希在实例内缓存"""
+
+    def __init__(self, directory=None):
+        self.directory = Path(directory) if directory else TEMPLATES_DIR
+        self._sources: Dict[str, str] = {}
+        self._compiled: Dict[str, Template] = {}
+        self._version: Optional[str] = None
+
+    def _read(self, relative: str) -> str:
+        """读取模板文件，去掉编辑器在文件末尾补上的一个换行"""
+        if relative not in self._sources:
+            path = self.directory / relative
+            try:
+                source = path.read_text(encoding='utf-8')
+            except OSError:
+                raise FileNotFoundError(f"模板不存在: {path}") from None
+            self._sources[relative] = source[:-1] if source.endswith('\n') else source
+        return self._sources[relative]
+
+    def _expand(self, source: str, stack: List[str]) -> str:
+        def include(match):
+            name = match.group(1)
+            if name in stack:
+                raise ValueError(f"模板片段循环引用: {' -> '.join(stack + [name])}")
+            partial = self._read(f'{PARTIALS_DIR_NAME}/{name}.html')
+            return self._expand(partial, stack + [name])
+        return PARTIAL.sub(include, source)
+
+    def get(self, name: str) -> Template:
+        """编译（并缓存）布局 name.html"""
+        if name not in self._compiled:
+            source = self._expand(self._read(f'{name}.html'), [name])
+            self._compiled[name] = Template(name, source)
+        return self._compiled[name]
+
+    def render(self, name: str, **context) -> str:
+        return self.get(name).render(context)
+
+    def version(self) -> str:
+        """全部模板文件（路径和内容）的哈希"""
+        if self._version is None:
+            digest = hashlib.sha256(f'engine:{ENGINE_VERSION}'.encode('utf-8'))
+            for path in sorted(self.directory.rglob('*.html')):
+                digest.update(b'\0' + path.relative_to(self.directory).as_posix().encode('utf-8') + b'\0')
+                digest.update(path.read_bytes())
+            self._version = digest.hexdigest()[:16]
+        return self._version
+
+
+_default: Optional[TemplateSet] = None
+
+
+def default_templates() -> TemplateSet:
+    """进程内共享的模板集，每次运行只读取和编译一次"""
+    global _default
+    if _default is None:
+        _default = TemplateSet()
+    return _default
+
+
+def main():
+    templates = default_templates()
+    for path in sorted(templates.directory.rglob('*.html')):
+        relative = path.relative_to(templates.directory).as_posix()
+        if not relative.startswith(f'{PARTIALS_DIR_NAME}/'):
+            template = templates.get(path.stem)
+            print(f"{relative}: 变量 {', '.join(dict.fromkeys(template.names))}")
+        else:
+            print(relative)
+    print(f"✓ 模板版本: {templates.version()}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
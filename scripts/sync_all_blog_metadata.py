@@ -2,7 +2,7 @@
 # -*- coding: utf-8 -*-
 """
 同步所有博客的标题、简介、关键词脚本
-从HTML文件中读取当前的标题、简介、关键词，同步更新所有相关的meta标签
+从文章目录（post_catalog）读取当前的标题、简介、关键词，同步更新所有相关的meta标签
 并自动为中文标题生成英文标题（除了排除的博客）
 """
 
@@ -11,6 +11,11 @@ import json
 from pathlib import Path
 from typing import Dict, Optional, Tuple
 import html
+import sys
+
+sys.path.insert(0, str(Path(__file__).parent))
+from head_meta import HeadMeta
+from post_catalog import PostCatalog
 
 # 配置路径
 SCRIPT_DIR = Path(__file__).parent
@@ -157,52 +162,15 @@ def translate_chinese_title(chinese_title: str, translation_mapping: Dict[str, s
     return ""
 
 
-def extract_metadata_from_html(html_file: Path) -> Optional[Dict]:
-    """从HTML文件中提取元数据"""
-    try:
-        with open(html_file, 'r', encoding='utf-8') as f:
-            html_content = f.read()
-        
-        # 提取title标签
-        title_match = re.search(r'<title[^>]*>(.*?)</title>', html_content, re.IGNORECASE | re.DOTALL)
-        if not title_match:
-            return None
-        
-        title = title_match.group(1).strip()
-        # 移除" - 筑居思"后缀
-        title = title.replace(' - 筑居思', '').strip()
-        title = html.unescape(title)
-        
-        # 提取description meta标签
-        desc_match = re.search(
-            r'<meta\s+name=["\']description["\']\s+content=["\'](.*?)["\']',
-            html_content,
-            re.IGNORECASE
-        )
-        description = desc_match.group(1) if desc_match else ''
-        description = html.unescape(description)
-        
-        # 提取keywords meta标签
-        keywords_match = re.search(
-            r'<meta\s+name=["\']keywords["\']\s+content=["\'](.*?)["\']',
-            html_content,
-            re.IGNORECASE
-        )
-        keywords_str = keywords_match.group(1) if keywords_match else ''
-        keywords_str = html.unescape(keywords_str)
-        
-        # 解析关键词列表（移除"筑居思"如果存在）
-        keywords = [k.strip() for k in keywords_str.split(',') if k.strip()]
-        keywords = [k for k in keywords if k != '筑居思']
-        
-        return {
-            'title': title,
-            'description': description,
-            'keywords': keywords
-        }
-    except Exception as e:
-        print(f"  错误: 读取HTML文件失败: {e}")
+def metadata_from_catalog(post: Optional[Dict]) -> Optional[Dict]:
+    """从文章目录的记录中取出要同步的元数据（关键词去掉"筑居思"）"""
+    if not post or not post['title']:
         return None
+    return {
+        'title': post['title'],
+        'description': post['description'],
+        'keywords': [k for k in post['keywords'] if k != '筑居思']
+    }
 
 
 def escape_html(text: str) -> str:
@@ -238,127 +206,67 @@ def update_html_metadata(html_file: Path, metadata: dict, translation_mapping: D
         title_escaped = escape_html(title)
         desc_escaped = escape_html(description)
         
-        # 更新title标签
-        title_pattern = r'<title[^>]*>.*?</title>'
-        new_title = f'<title>{title_escaped} - 筑居思</title>'
-        html_content = re.sub(title_pattern, new_title, html_content, flags=re.IGNORECASE | re.DOTALL)
-        
-        # 更新description meta标签
-        desc_pattern = r'<meta\s+name=["\']description["\']\s+content=["\'][^"\']*["\']\s*/?>'
-        new_desc = f'<meta name="description" content="{desc_escaped}">'
-        if re.search(desc_pattern, html_content, re.IGNORECASE):
-            html_content = re.sub(desc_pattern, new_desc, html_content, flags=re.IGNORECASE)
-        else:
-            # 如果没有description标签，在title后面添加
-            html_content = re.sub(
-                r'(<title[^>]*>.*?</title>)',
-                r'\1\n    ' + new_desc,
-                html_content,
-                flags=re.IGNORECASE | re.DOTALL
-            )
+        # 一次性解析<head>中的标签，所有修改累积后统一拼回
+        head = HeadMeta(html_content)
+        head.set_title(f'{title_escaped} - 筑居思')
+        head.set('description', desc_escaped, after=['title'])
         
         # 更新keywords meta标签
         keywords_list = keywords.copy()
         if '筑居思' not in keywords_list:
             keywords_list.append('筑居思')
-        keywords_str = ', '.join(keywords_list)
-        keywords_escaped = escape_html(keywords_str)
+        keywords_escaped = escape_html(', '.join(keywords_list))
+        head.set('keywords', keywords_escaped, after=['description'])
         
-        keywords_pattern = r'<meta\s+name=["\']keywords["\']\s+content=["\'][^"\']*["\']\s*/?>'
-        new_keywords = f'<meta name="keywords" content="{keywords_escaped}">'
-        if re.search(keywords_pattern, html_content, re.IGNORECASE):
-            html_content = re.sub(keywords_pattern, new_keywords, html_content, flags=re.IGNORECASE)
+        # 更新或添加Open Graph标签（缺少og:title时在keywords后补齐整组）
+        url = head.get('link:canonical') or f"https://thinkingleaf.space/blogs/{html_file.name}"
+        if not head.has('og:title'):
+            for key in ('og:type', 'og:url'):
+                if head.has(key):
+                    continue
+                head.set(key, 'article' if key == 'og:type' else url, after=['keywords'])
+            head.set('og:title', f'{title_escaped} - 筑居思', after=['og:url', 'keywords'])
+            head.set('og:description', desc_escaped, after=['og:title'])
         else:
-            # 如果没有keywords标签，在description后面添加
-            html_content = re.sub(
-                r'(<meta\s+name=["\']description["\']\s+content=["\'][^"\']*["\']\s*/?>)',
-                r'\1\n    ' + new_keywords,
-                html_content,
-                flags=re.IGNORECASE
-            )
-        
-        # 更新Open Graph和Twitter卡片
-        og_title_pattern = r'<meta\s+property=["\']og:title["\']\s+content=["\'][^"\']*["\']\s*/?>'
-        og_desc_pattern = r'<meta\s+property=["\']og:description["\']\s+content=["\'][^"\']*["\']\s*/?>'
-        og_url_pattern = r'<meta\s+property=["\']og:url["\']\s+content=["\'][^"\']*["\']\s*/?>'
-        og_type_pattern = r'<meta\s+property=["\']og:type["\']\s+content=["\'][^"\']*["\']\s*/?>'
-        twitter_title_pattern = r'<meta\s+name=["\']twitter:title["\']\s+content=["\'][^"\']*["\']\s*/?>'
-        twitter_desc_pattern = r'<meta\s+name=["\']twitter:description["\']\s+content=["\'][^"\']*["\']\s*/?>'
-        twitter_card_pattern = r'<meta\s+name=["\']twitter:card["\']\s+content=["\'][^"\']*["\']\s*/?>'
+            head.set('og:title', f'{title_escaped} - 筑居思')
+            head.set('og:description', desc_escaped, only_existing=True)
         
-        # 提取URL
-        url_match = re.search(r'<link\s+rel=["\']canonical["\']\s+href=["\']([^"\']+)["\']', html_content, re.IGNORECASE)
-        if not url_match:
-            # 从文件名生成URL
-            url = f"https://thinkingleaf.space/blogs/{html_file.name}"
+        # 更新或添加Twitter标签（缺少twitter:title时在og:description后补齐整组）
+        if not head.has('twitter:title'):
+            if not head.has('twitter:card'):
+                head.set('twitter:card', 'summary', after=['og:description'])
+            head.set('twitter:title', f'{title_escaped} - 筑居思', after=['twitter:card', 'og:description'])
+            head.set('twitter:description', desc_escaped, after=['twitter:title'])
         else:
-            url = url_match.group(1)
+            head.set('twitter:title', f'{title_escaped} - 筑居思')
+            head.set('twitter:description', desc_escaped, only_existing=True)
         
-        new_og_title = f'<meta property="og:title" content="{title_escaped} - 筑居思">'
-        new_og_desc = f'<meta property="og:description" content="{desc_escaped}">'
-        new_og_url = f'<meta property="og:url" content="{url}">'
-        new_og_type = '<meta property="og:type" content="article">'
-        new_twitter_title = f'<meta name="twitter:title" content="{title_escaped} - 筑居思">'
-        new_twitter_desc = f'<meta name="twitter:description" content="{desc_escaped}">'
-        new_twitter_card = '<meta name="twitter:card" content="summary">'
-        
-        # 更新或添加Open Graph标签
-        if re.search(og_title_pattern, html_content, re.IGNORECASE):
-            html_content = re.sub(og_title_pattern, new_og_title, html_content, flags=re.IGNORECASE)
-        else:
-            # 在keywords后面添加
-            html_content = re.sub(
-                r'(<meta\s+name=["\']keywords["\']\s+content=["\'][^"\']*["\']\s*/?>)',
-                r'\1\n    ' + new_og_type + '\n    ' + new_og_url + '\n    ' + new_og_title + '\n    ' + new_og_desc,
-                html_content,
-                flags=re.IGNORECASE,
-                count=1
-            )
-        
-        if re.search(og_desc_pattern, html_content, re.IGNORECASE):
-            html_content = re.sub(og_desc_pattern, new_og_desc, html_content, flags=re.IGNORECASE)
-        
-        # 更新或添加Twitter标签
-        if re.search(twitter_title_pattern, html_content, re.IGNORECASE):
-            html_content = re.sub(twitter_title_pattern, new_twitter_title, html_content, flags=re.IGNORECASE)
-        else:
-            # 在og:description后面添加
-            html_content = re.sub(
-                r'(<meta\s+property=["\']og:description["\']\s+content=["\'][^"\']*["\']\s*/?>)',
-                r'\1\n    ' + new_twitter_card + '\n    ' + new_twitter_title + '\n    ' + new_twitter_desc,
-                html_content,
-                flags=re.IGNORECASE,
-                count=1
-            )
-        
-        if re.search(twitter_desc_pattern, html_content, re.IGNORECASE):
-            html_content = re.sub(twitter_desc_pattern, new_twitter_desc, html_content, flags=re.IGNORECASE)
-        
-        # 更新h1标题（如果存在）
-        # 尝试匹配带class="post-title"的h1
+        # 更新h1标题（如果存在），只在</head>之后的正文中查找
+        body = head.tail
         h1_pattern = r'<h1[^>]*class=["\']post-title["\'][^>]*>.*?</h1>'
-        h1_match = re.search(h1_pattern, html_content, re.IGNORECASE | re.DOTALL)
-        if h1_match:
-            new_h1 = f'<h1 class="post-title">{title_escaped}</h1>'
-            html_content = re.sub(h1_pattern, new_h1, html_content, flags=re.IGNORECASE | re.DOTALL)
+        header_h1_pattern = r'(<header[^>]*class=["\']post-header["\'][^>]*>.*?<h1[^>]*>).*?(</h1>)'
+        page_h1_pattern = r'<h1[^>]*class=["\']page-title["\'][^>]*>.*?</h1>'
+        if re.search(h1_pattern, body, re.IGNORECASE | re.DOTALL):
+            # 带class="post-title"的h1
+            body = re.sub(h1_pattern, lambda m: f'<h1 class="post-title">{title_escaped}</h1>',
+                          body, count=1, flags=re.IGNORECASE | re.DOTALL)
+        elif re.search(header_h1_pattern, body, re.IGNORECASE | re.DOTALL):
+            # post-header内的h1
+            body = re.sub(header_h1_pattern, lambda m: f'{m.group(1)}{title_escaped}{m.group(2)}',
+                          body, count=1, flags=re.IGNORECASE | re.DOTALL)
         else:
-            # 尝试匹配在post-header内的h1
-            header_h1_pattern = r'(<header[^>]*class=["\']post-header["\'][^>]*>.*?<h1[^>]*>).*?(</h1>)'
-            header_h1_match = re.search(header_h1_pattern, html_content, re.IGNORECASE | re.DOTALL)
-            if header_h1_match:
-                new_h1 = f'{header_h1_match.group(1)}{title_escaped}{header_h1_match.group(2)}'
-                html_content = re.sub(header_h1_pattern, lambda m: f'{m.group(1)}{title_escaped}{m.group(2)}', html_content, flags=re.IGNORECASE | re.DOTALL)
-            else:
-                # 尝试匹配class="page-title"的h1
-                page_h1_pattern = r'<h1[^>]*class=["\']page-title["\'][^>]*>.*?</h1>'
-                page_h1_match = re.search(page_h1_pattern, html_content, re.IGNORECASE | re.DOTALL)
-                if page_h1_match:
-                    new_h1 = f'<h1 class="page-title">{title_escaped}</h1>'
-                    html_content = re.sub(page_h1_pattern, new_h1, html_content, flags=re.IGNORECASE | re.DOTALL)
+            # class="page-title"的h1
+            body = re.sub(page_h1_pattern, lambda m: f'<h1 class="page-title">{title_escaped}</h1>',
+                          body, count=1, flags=re.IGNORECASE | re.DOTALL)
+        
+        new_content = head.render(tail=body)
+        if new_content == html_content:
+            print("  ⊘ 元数据未变化，未改动文件")
+            return True
         
         # 写回文件
         with open(html_file, 'w', encoding='utf-8') as f:
-            f.write(html_content)
+            f.write(new_content)
         
         return True
     except Exception as e:
@@ -390,6 +298,10 @@ def main():
     print(f"📁 找到 {len(html_files)} 个博客文件")
     print()
     
+    # 文章目录只重新解析改动过的页面
+    catalog = PostCatalog()
+    catalog.refresh()
+    
     success_count = 0
     skip_count = 0
     failed_count = 0
@@ -398,8 +310,8 @@ def main():
         print(f"处理: {html_file.name}")
         print("-" * 60)
         
-        # 提取元数据
-        metadata = extract_metadata_from_html(html_file)
+        # 读取元数据
+        metadata = metadata_from_catalog(catalog.get(html_file.name))
         if not metadata or not metadata.get('title'):
             print("  跳过（无法提取元数据）")
             skip_count += 1
@@ -429,6 +341,10 @@ def main():
         
         print()
     
+    # 同步改写过的页面记录
+    catalog.refresh()
+    catalog.close()
+    
     # 保存翻译映射表
     save_title_translation(translation_mapping)
     
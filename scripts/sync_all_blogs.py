@@ -2,10 +2,19 @@
 # -*- coding: utf-8 -*-
 """
 批量同步Obsidian中的所有博客文章
+
+默认对每篇笔记调用一次 deploy_blog.sh；
+--batch 模式在进程池中复用已加载的 MarkdownConverter，最后只重建一次 blogs.html；
+--relayout 在修改 scripts/templates/ 下的布局或片段后，按构建清单重新渲染所有转换过的笔记
 """
 
+import argparse
+import contextlib
+import io
+import multiprocessing
 import os
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
 # 获取脚本所在目录
@@ -14,35 +23,156 @@ SITE_ROOT = SCRIPT_DIR.parent
 OBSIDIAN_DIR = Path('/Users/qianny/Nutstore Files/Qianny-obsidian/个人网站')
 BLOGS_DIR = SITE_ROOT / 'blogs'
 
-def main():
-    """主函数"""
-    print("="*60)
-    print("Obsidian博客批量同步工具")
-    print("="*60)
-    print()
-    
-    # 获取所有需要部署的markdown文件
-    md_files = list(OBSIDIAN_DIR.glob('*.md'))
-    
-    if not md_files:
-        print("❌ 未找到任何Markdown文件")
-        return
-    
-    print(f"📁 找到 {len(md_files)} 篇文章需要同步")
-    print()
-    
-    # 转换每个文件
+sys.path.insert(0, str(SCRIPT_DIR))
+
+# 进程池中每个工作进程各自持有一个转换器
+_worker_converter = None
+# 工作进程启动时图片哈希索引的内容，用于找出本进程新增的条目交回主进程
+_worker_images_baseline = ({}, {})
+
+
+def _init_worker(images_lock=None):
+    """工作进程初始化：只加载一次 yaml/markdown 和配置；图片导入通过共享锁在进程间串行"""
+    global _worker_converter, _worker_images_baseline
+    with contextlib.redirect_stdout(io.StringIO()):
+        from markdown_to_html import MarkdownConverter
+        _worker_converter = MarkdownConverter()
+    _worker_converter.images.lock = images_lock
+    _worker_images_baseline = (dict(_worker_converter.images.hashes), dict(_worker_converter.images.files))
+
+
+def _new_entries(current: dict, baseline: dict) -> dict:
+    return {key: value for key, value in current.items() if baseline.get(key) != value}
+
+
+def _convert_in_worker(args):
+    """在工作进程中验证并转换一篇笔记，输出收集到日志里交给主进程按顺序打印"""
+    md_file, force = args
+    from validate_blog import BlogValidator
+
+    log = io.StringIO()
+    outcome = {'file': md_file, 'ok': False, 'skipped': False, 'log': '', 'error': ''}
+    try:
+        with contextlib.redirect_stdout(log):
+            validator = BlogValidator()
+            if not validator.validate_markdown(Path(md_file)):
+                validator.print_report()
+                print("⚠️  验证发现问题，但继续尝试转换...")
+            result = _worker_converter.convert(md_file, force=force)
+        if result:
+            outcome['ok'] = True
+            outcome['skipped'] = bool(result.get('skipped'))
+            key = _worker_converter.manifest.key_for(md_file)
+            outcome['manifest'] = (key, _worker_converter.manifest.entries.get(key))
+            outcome['responsive'] = _worker_converter.responsive.entries
+            outcome['image_meta'] = _worker_converter.image_meta.entries
+            images = _worker_converter.images
+            outcome['images'] = (_new_entries(images.hashes, _worker_images_baseline[0]),
+                                 _new_entries(images.files, _worker_images_baseline[1]))
+    except Exception as e:
+        outcome['error'] = f"{type(e).__name__}: {e}"
+    outcome['log'] = log.getvalue()
+    return outcome
+
+
+def sync_batch(md_files, workers=None, force=False):
+    """进程池批量转换，返回 (成功数, 失败数)"""
+    import build_feeds
+    import build_search_index
+    import build_sitemap
+    import related_articles
+    from build_manifest import BuildManifest
+    from post_catalog import PostCatalog
+    from update_blogs_list import update_blogs_html
+
+    manifest = BuildManifest()
+
+    # 先在主进程刷新附件索引，工作进程加载后只需按目录mtime校验
+    with contextlib.redirect_stdout(io.StringIO()):
+        from markdown_to_html import MarkdownConverter
+        converter = MarkdownConverter(manifest=manifest)
+    converter.attachments.refresh()
+    converter.attachments.save()
+    # 同样先刷新图片哈希索引，工作进程据此复用网站中已有的相同图片
+    converter.images.scan()
+    converter.images.save()
+
     success_count = 0
     failed_count = 0
-    
-    for md_file in sorted(md_files):
+    changed_count = 0
+
+    # 工作进程导入新图片时共用这把锁：导入前合并其他进程写入的索引，导入后立即写回
+    images_lock = multiprocessing.Lock()
+
+    jobs = [(str(md_file), force) for md_file in md_files]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(images_lock,)) as executor:
+        for outcome in executor.map(_convert_in_worker, jobs):
+            print(f"正在处理: {Path(outcome['file']).name}")
+            print("-" * 60)
+            if outcome['log']:
+                print(outcome['log'].rstrip())
+            if outcome['ok']:
+                success_count += 1
+                key, entry = outcome['manifest']
+                if entry:
+                    manifest.update_entry(key, entry)
+                for cache, entries in ((converter.responsive, outcome['responsive']),
+                                       (converter.image_meta, outcome['image_meta'])):
+                    for key, value in entries.items():
+                        if cache.entries.get(key) != value:
+                            cache.entries[key] = value
+                            cache.dirty = True
+                converter.images.merge(*outcome['images'])
+                if not outcome['skipped']:
+                    changed_count += 1
+                print("✅ 成功\n")
+            else:
+                failed_count += 1
+                print(f"❌ 失败\n{outcome['error']}\n")
+
+    manifest.save()
+    converter.images.save()
+    converter.responsive.save()
+    converter.image_meta.save()
+    # 清理清单中已不再引用的正文片段
+    converter.fragments.prune(manifest.fragments())
+
+    # 所有笔记转换完成后只重建一次博客列表
+    if changed_count:
+        # 文章目录只在主进程写入：按 mtime 重新解析本次改动的页面
+        with PostCatalog() as catalog:
+            catalog.refresh()
+        print("更新博客列表...")
+        update_blogs_html(search_index=False)
+        print("生成搜索索引...")
+        build_search_index.build()
+        print("计算相关文章...")
+        related_articles.build()
+        print("生成订阅源...")
+        build_feeds.build()
+        print("生成站点地图...")
+        build_sitemap.build()
+    else:
+        print("所有文章均未变化，跳过博客列表更新")
+
+    return success_count, failed_count
+
+
+def sync_each(md_files):
+    """逐篇调用 deploy_blog.sh，返回 (成功数, 失败数)"""
+    import subprocess
+
+    success_count = 0
+    failed_count = 0
+
+    for md_file in md_files:
         print(f"正在处理: {md_file.name}")
         print("-" * 60)
-        
+
         # 运行部署脚本
-        import subprocess
         cmd = ['bash', str(SCRIPT_DIR / 'deploy_blog.sh'), str(md_file)]
-        
+
         try:
             result = subprocess.run(cmd, capture_output=True, text=True, cwd=SITE_ROOT)
             if result.returncode == 0:
@@ -54,11 +184,55 @@ def main():
         except Exception as e:
             failed_count += 1
             print(f"❌ 错误: {e}\n")
-    
+
+    return success_count, failed_count
+
+
+def recorded_notes():
+    """构建清单中记录过、源文件仍然存在的笔记；模板版本已是最新的会在转换时直接跳过"""
+    from build_manifest import BuildManifest
+    return sorted(Path(key) for key in BuildManifest().entries if Path(key).exists())
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description='Obsidian博客批量同步工具')
+    parser.add_argument('--batch', action='store_true', help='进程池批量转换，最后只更新一次博客列表')
+    parser.add_argument('--workers', type=int, default=None, help='批量模式的进程数（默认CPU核数）')
+    parser.add_argument('--force', action='store_true', help='批量模式下忽略增量构建清单，全部重新渲染')
+    parser.add_argument('--relayout', action='store_true',
+                        help='模板改动后重新渲染构建清单中记录的全部笔记（隐含 --batch）')
+    args = parser.parse_args()
+
+    print("="*60)
+    print("Obsidian博客批量同步工具")
+    print("="*60)
+    print()
+
+    # 获取所有需要部署的markdown文件
+    if args.relayout:
+        md_files = recorded_notes()
+        args.batch = True
+    else:
+        md_files = sorted(OBSIDIAN_DIR.glob('*.md'))
+
+    if not md_files:
+        print("❌ 未找到任何Markdown文件")
+        return
+
+    print(f"📁 找到 {len(md_files)} 篇文章需要同步")
+    print()
+
+    if args.batch:
+        workers = args.workers or os.cpu_count() or 1
+        print(f"⚙️  批量模式: {workers} 个进程\n")
+        success_count, failed_count = sync_batch(md_files, workers, args.force)
+    else:
+        success_count, failed_count = sync_each(md_files)
+
     print("="*60)
     print(f"同步完成！成功: {success_count}, 失败: {failed_count}")
     print("="*60)
 
 if __name__ == '__main__':
     main()
-
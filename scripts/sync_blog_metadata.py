@@ -14,6 +14,9 @@ from pathlib import Path
 from typing import Dict, Optional, Tuple
 import sys
 
+sys.path.insert(0, str(Path(__file__).parent))
+from head_meta import HeadMeta
+
 # 配置路径
 SCRIPT_DIR = Path(__file__).parent
 SITE_ROOT = SCRIPT_DIR.parent
@@ -21,6 +24,9 @@ BLOGS_DIR = SITE_ROOT / 'blogs'
 CONFIG_FILE = SITE_ROOT / 'blog_config.json'
 MAPPING_FILE = SCRIPT_DIR / 'title_slug_mapping.json'
 TITLE_TRANSLATION_FILE = SCRIPT_DIR / 'title_translation_mapping.json'
+# HTML标题索引（按目录和文件mtime增量更新）
+TITLE_INDEX_FILE = SCRIPT_DIR / 'html_title_index.json'
+TITLE_INDEX_VERSION = 1
 
 # 排除的博客（不进行同步）
 EXCLUDED_BLOGS = [
@@ -144,39 +150,108 @@ def extract_metadata_from_markdown(md_file: Path) -> Optional[dict]:
         return None
 
 
-def find_matching_html_file(title: str, date: str = None) -> Optional[Path]:
-    """根据标题查找匹配的HTML文件"""
-    html_files = list(BLOGS_DIR.glob('*.html'))
-    
-    # 首先尝试精确匹配标题
-    for html_file in html_files:
+def normalize_title(title: str) -> str:
+    """去掉站点后缀和"筑居思："/"筑居思·"前缀，用于标题比较"""
+    return title.replace(' - 筑居思', '').replace('筑居思：', '').replace('筑居思·', '').strip()
+
+
+class HtmlTitleIndex:
+    """
+    blogs/ 下 HTML 文件的标题索引（持久化到 TITLE_INDEX_FILE）
+    目录 mtime 变化时重新列目录，文件 mtime 变化时只重新读取该文件的标题，
+    匹配时按规范化标题和日期前缀直接查表，不再为每篇笔记打开所有 HTML
+    """
+
+    def __init__(self, blogs_dir: Path = BLOGS_DIR, path: Path = None):
+        self.blogs_dir = blogs_dir
+        self.path = path or TITLE_INDEX_FILE
+        self.dir_mtime = None
+        self.files: Dict[str, dict] = {}
+        self.dirty = False
+        self.load()
+        self.refresh()
+
+    def load(self):
+        if not self.path.exists():
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get('version') == TITLE_INDEX_VERSION and data.get('blogs_dir') == str(self.blogs_dir):
+            self.dir_mtime = data.get('dir_mtime')
+            self.files = data.get('files', {})
+
+    def save(self):
+        if not self.dirty:
+            return
+        tmp_path = self.path.with_suffix('.json.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': TITLE_INDEX_VERSION, 'blogs_dir': str(self.blogs_dir),
+                       'dir_mtime': self.dir_mtime, 'files': self.files}, f, ensure_ascii=False, indent=1)
+        os.replace(tmp_path, self.path)
+        self.dirty = False
+
+    def refresh(self):
+        """目录变化时同步文件列表，再按 mtime 刷新各文件标题"""
+        dir_mtime = self.blogs_dir.stat().st_mtime_ns if self.blogs_dir.exists() else None
+        if dir_mtime != self.dir_mtime:
+            names = {p.name for p in self.blogs_dir.glob('*.html')} if dir_mtime else set()
+            for name in set(self.files) - names:
+                del self.files[name]
+            for name in names - set(self.files):
+                self.files[name] = {'mtime': None, 'title': ''}
+            self.dir_mtime = dir_mtime
+            self.dirty = True
+        for name in list(self.files):
+            self._read_title(self.blogs_dir / name)
+        self._build_lookup()
+
+    def update(self, html_file: Path):
+        """同步脚本改写文件后调用，文件 mtime 变化时重新读取标题"""
+        if self._read_title(html_file):
+            self._build_lookup()
+
+    def _read_title(self, html_file: Path) -> bool:
+        try:
+            mtime = html_file.stat().st_mtime_ns
+        except OSError:
+            return False
+        entry = self.files.get(html_file.name)
+        if entry and entry['mtime'] == mtime:
+            return False
         try:
             with open(html_file, 'r', encoding='utf-8') as f:
-                html_content = f.read()
-            
-            # 提取HTML中的标题
-            title_match = re.search(r'<title[^>]*>(.*?)</title>', html_content, re.IGNORECASE | re.DOTALL)
-            if title_match:
-                html_title = title_match.group(1).strip()
-                html_title = html_title.replace(' - 筑居思', '').strip()
-                
-                # 如果标题匹配（去除"筑居思："前缀）
-                clean_title = title.replace('筑居思：', '').replace('筑居思·', '').strip()
-                clean_html_title = html_title.replace('筑居思：', '').replace('筑居思·', '').strip()
-                
-                if clean_title == clean_html_title or title == html_title:
-                    return html_file
-        except Exception:
-            continue
-    
-    # 如果精确匹配失败，尝试根据日期和文件名匹配
-    if date:
-        date_prefix = date.replace('-', '-')
-        for html_file in html_files:
-            if html_file.name.startswith(date_prefix):
-                return html_file
-    
-    return None
+                title = HeadMeta(f.read()).get('title') or ''
+        except (OSError, UnicodeDecodeError):
+            title = ''
+        self.files[html_file.name] = {'mtime': mtime, 'title': title}
+        self.dirty = True
+        return True
+
+    def _build_lookup(self):
+        self.by_title: Dict[str, str] = {}
+        self.by_date: Dict[str, str] = {}
+        for name in sorted(self.files):
+            title = self.files[name]['title']
+            if title:
+                self.by_title.setdefault(normalize_title(title), name)
+            date_match = re.match(r'^(\d{4}-\d{2}-\d{2})', name)
+            if date_match:
+                self.by_date.setdefault(date_match.group(1), name)
+
+    def find(self, title: str, date: str = None) -> Optional[Path]:
+        """先按规范化标题精确匹配，失败时按文件名日期前缀匹配"""
+        name = self.by_title.get(normalize_title(title))
+        if not name and date:
+            name = self.by_date.get(date)
+        return self.blogs_dir / name if name else None
+
+
+def find_matching_html_file(title: str, date: str = None, index: HtmlTitleIndex = None) -> Optional[Path]:
+    """根据标题查找匹配的HTML文件；未传入索引时临时构建一个"""
+    return (index or HtmlTitleIndex()).find(title, date)
 
 
 def update_html_metadata(html_file: Path, metadata: dict, translation_mapping: Dict[str, str]):
@@ -200,56 +275,31 @@ def update_html_metadata(html_file: Path, metadata: dict, translation_mapping: D
             # 如果没有翻译，使用中文标题
             english_title = title
         
-        # 更新title标签
-        title_pattern = r'<title[^>]*>.*?</title>'
-        new_title = f'<title>{title} - 筑居思</title>'
-        html_content = re.sub(title_pattern, new_title, html_content, flags=re.IGNORECASE | re.DOTALL)
-        
-        # 更新description meta标签
-        desc_pattern = r'<meta\s+name=["\']description["\']\s+content=["\'][^"\']*["\']\s*/?>'
-        new_desc = f'<meta name="description" content="{description}">'
-        if re.search(desc_pattern, html_content, re.IGNORECASE):
-            html_content = re.sub(desc_pattern, new_desc, html_content, flags=re.IGNORECASE)
-        else:
-            # 如果没有description标签，在title后面添加
-            html_content = re.sub(r'(<title[^>]*>.*?</title>)', r'\1\n    ' + new_desc, html_content, flags=re.IGNORECASE | re.DOTALL)
+        # 一次性解析<head>中的标签，所有修改累积后统一拼回
+        head = HeadMeta(html_content)
+        head.set_title(f'{title} - 筑居思')
+        head.set('description', description, after=['title'])
         
         # 更新keywords meta标签
         keywords_str = ', '.join(keywords)
         if not keywords_str.endswith('筑居思'):
             keywords_str += ', 筑居思'
+        head.set('keywords', keywords_str, after=['description'])
         
-        keywords_pattern = r'<meta\s+name=["\']keywords["\']\s+content=["\'][^"\']*["\']\s*/?>'
-        new_keywords = f'<meta name="keywords" content="{keywords_str}">'
-        if re.search(keywords_pattern, html_content, re.IGNORECASE):
-            html_content = re.sub(keywords_pattern, new_keywords, html_content, flags=re.IGNORECASE)
-        else:
-            # 如果没有keywords标签，在description后面添加
-            html_content = re.sub(r'(<meta\s+name=["\']description["\']\s+content=["\'][^"\']*["\']\s*/?>)', r'\1\n    ' + new_keywords, html_content, flags=re.IGNORECASE)
-        
-        # 更新Open Graph和Twitter卡片
-        og_title_pattern = r'<meta\s+property=["\']og:title["\']\s+content=["\'][^"\']*["\']\s*/?>'
-        og_desc_pattern = r'<meta\s+property=["\']og:description["\']\s+content=["\'][^"\']*["\']\s*/?>'
-        twitter_title_pattern = r'<meta\s+name=["\']twitter:title["\']\s+content=["\'][^"\']*["\']\s*/?>'
-        twitter_desc_pattern = r'<meta\s+name=["\']twitter:description["\']\s+content=["\'][^"\']*["\']\s*/?>'
-        
-        new_og_title = f'<meta property="og:title" content="{title} - 筑居思">'
-        new_og_desc = f'<meta property="og:description" content="{description}">'
-        new_twitter_title = f'<meta name="twitter:title" content="{title} - 筑居思">'
-        new_twitter_desc = f'<meta name="twitter:description" content="{description}">'
+        # 更新已有的Open Graph和Twitter卡片
+        head.set('og:title', f'{title} - 筑居思', only_existing=True)
+        head.set('og:description', description, only_existing=True)
+        head.set('twitter:title', f'{title} - 筑居思', only_existing=True)
+        head.set('twitter:description', description, only_existing=True)
         
-        if re.search(og_title_pattern, html_content, re.IGNORECASE):
-            html_content = re.sub(og_title_pattern, new_og_title, html_content, flags=re.IGNORECASE)
-        if re.search(og_desc_pattern, html_content, re.IGNORECASE):
-            html_content = re.sub(og_desc_pattern, new_og_desc, html_content, flags=re.IGNORECASE)
-        if re.search(twitter_title_pattern, html_content, re.IGNORECASE):
-            html_content = re.sub(twitter_title_pattern, new_twitter_title, html_content, flags=re.IGNORECASE)
-        if re.search(twitter_desc_pattern, html_content, re.IGNORECASE):
-            html_content = re.sub(twitter_desc_pattern, new_twitter_desc, html_content, flags=re.IGNORECASE)
+        new_content = head.render()
+        if new_content == html_content:
+            print("  ⊘ 元数据未变化，未改动文件")
+            return True
         
         # 写回文件
         with open(html_file, 'w', encoding='utf-8') as f:
-            f.write(html_content)
+            f.write(new_content)
         
         return True
     except Exception as e:
@@ -286,6 +336,9 @@ def main():
     print(f"📁 找到 {len(md_files)} 个Markdown文件")
     print()
     
+    # HTML标题索引只构建一次，逐篇笔记查表匹配
+    title_index = HtmlTitleIndex()
+    
     success_count = 0
     skip_count = 0
     failed_count = 0
@@ -315,7 +368,7 @@ def main():
         date_match = re.match(r'^(\d{4}-\d{2}-\d{2})', md_file.name)
         date = date_match.group(1) if date_match else None
         
-        html_file = find_matching_html_file(title, date)
+        html_file = find_matching_html_file(title, date, title_index)
         
         if not html_file:
             print(f"  ⚠️  警告: 未找到匹配的HTML文件")
@@ -327,6 +380,7 @@ def main():
         
         # 更新HTML文件
         if update_html_metadata(html_file, metadata, translation_mapping):
+            title_index.update(html_file)
             success_count += 1
             print("  ✅ 成功同步")
         else:
@@ -342,6 +396,8 @@ def main():
     print(f"  失败: {failed_count}")
     print("=" * 60)
     
+    title_index.save()
+    
     # 保存翻译映射表
     if translation_mapping:
         save_title_translation(translation_mapping)
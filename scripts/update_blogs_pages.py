@@ -2,15 +2,17 @@
 # -*- coding: utf-8 -*-
 """
 更新博客列表页面脚本
-从HTML文件中提取标题、简介、关键词，自动更新blogs.html和index.html
+从文章目录（post_catalog）读取标题、简介、关键词和封面图，自动更新blogs.html和index.html，
+并增量生成 archive/ 下的归档页（见 build_archive.py）
 """
 
 import re
-import json
 from pathlib import Path
-from html import unescape
+import sys
 from typing import Dict, List, Optional
-from datetime import datetime
+
+sys.path.insert(0, str(Path(__file__).parent))
+from post_catalog import filename_date, load_posts
 
 # 配置路径
 SCRIPT_DIR = Path(__file__).parent
@@ -20,88 +22,42 @@ BLOGS_HTML = SITE_ROOT / 'blogs.html'
 INDEX_HTML = SITE_ROOT / 'index.html'
 
 
-def extract_blog_info(html_file: Path) -> Optional[Dict]:
-    """从HTML文件中提取博客信息"""
-    try:
-        with open(html_file, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        # 提取title标签
-        title_match = re.search(r'<title[^>]*>(.*?)</title>', content, re.IGNORECASE | re.DOTALL)
-        if not title_match:
-            return None
-        
-        title = title_match.group(1).strip()
-        title = title.replace(' - 筑居思', '').strip()
-        title = unescape(title)
-        
-        # 提取description
-        desc_match = re.search(r'<meta\s+name=["\']description["\']\s+content=["\'](.*?)["\']', content, re.IGNORECASE)
-        description = unescape(desc_match.group(1)) if desc_match else ''
-        
-        # 提取keywords
-        keywords_match = re.search(r'<meta\s+name=["\']keywords["\']\s+content=["\'](.*?)["\']', content, re.IGNORECASE)
-        keywords_str = unescape(keywords_match.group(1)) if keywords_match else ''
-        keywords = [k.strip() for k in keywords_str.split(',') if k.strip() and k.strip() != '筑居思']
-        
-        # 提取日期
-        date_match = re.match(r'^(\d{4}-\d{2}-\d{2})', html_file.name)
-        date = date_match.group(1) if date_match else None
-        
-        # 提取首图（灵魂封面图）- 优先查找位置A的定调图
-        cover_image = None
-        # 查找第一个 figure > img（位置A：灵魂定调图）
-        figure_match = re.search(r'<figure[^>]*>\s*<img[^>]*src=["\']([^"\']+)["\']', content, re.IGNORECASE | re.DOTALL)
-        if figure_match:
-            cover_image = figure_match.group(1)
-        else:
-            # 如果没有figure，查找第一个 .post-content img 或 article img
-            img_match = re.search(r'(?:<div[^>]*class=["\'][^"\']*post-content[^"\']*["\']|article)[^>]*>.*?<img[^>]*src=["\']([^"\']+)["\']', content, re.IGNORECASE | re.DOTALL)
-            if img_match:
-                cover_image = img_match.group(1)
-        
-        # 过滤占位符图片和无效路径
-        if cover_image:
-            cover_image_lower = cover_image.lower()
-            if ('placeholder-image' in cover_image_lower or 
-                'placeholder' in cover_image_lower or
-                '${date}' in cover_image or
-                '${' in cover_image):
-                cover_image = None
-        
-        # 规范化图片路径（相对于blogs.html）
-        if cover_image:
-            # 如果图片路径是相对于博客文件的（../images/），需要转换为相对于blogs.html的路径
-            if cover_image.startswith('../'):
-                # 从 blogs/xxx.html 到 images/，需要去掉 ../
-                cover_image = cover_image.replace('../', '')
-            elif cover_image.startswith('./'):
-                cover_image = cover_image.replace('./', '')
-            elif not cover_image.startswith('http') and not cover_image.startswith('/'):
-                # 相对路径，假设是相对于博客文件的
-                cover_image = cover_image
-        
-        return {
-            'filename': html_file.name,
-            'title': title,
-            'description': description,
-            'keywords': keywords,
-            'date': date,
-            'cover_image': cover_image
-        }
-    except Exception as e:
-        print(f"错误: 读取 {html_file.name} 失败: {e}")
+def blog_info(post: Dict) -> Optional[Dict]:
+    """把文章目录中的记录整理为列表页使用的博客信息，没有标题的页面返回None"""
+    if not post['title']:
         return None
+    
+    # 关键词（去掉站点名）
+    keywords = [k for k in post['keywords'] if k != '筑居思']
+    
+    # 列表页按文件名前缀的日期展示
+    date = filename_date(post['filename'])
+    
+    # 首图（灵魂封面图），目录中已过滤占位符图片和无效路径
+    cover_image = post['cover_image']
+    
+    # 规范化图片路径（相对于blogs.html）
+    if cover_image:
+        # 如果图片路径是相对于博客文件的（../images/），需要转换为相对于blogs.html的路径
+        if cover_image.startswith('../'):
+            # 从 blogs/xxx.html 到 images/，需要去掉 ../
+            cover_image = cover_image.replace('../', '')
+        elif cover_image.startswith('./'):
+            cover_image = cover_image.replace('./', '')
+    
+    return {
+        'filename': post['filename'],
+        'title': post['title'],
+        'description': post['description'],
+        'keywords': keywords,
+        'date': date,
+        'cover_image': cover_image
+    }
 
 
 def get_all_blogs() -> List[Dict]:
-    """获取所有博客信息，按日期排序（最新的在前）"""
-    blogs = []
-    
-    for html_file in sorted(BLOGS_DIR.glob('*.html'), reverse=True):
-        info = extract_blog_info(html_file)
-        if info:
-            blogs.append(info)
+    """从文章目录获取所有博客信息，按日期排序（最新的在前）"""
+    blogs = [info for info in map(blog_info, load_posts()) if info]
     
     # 按日期排序（最新的在前）
     blogs.sort(key=lambda x: x['date'] if x['date'] else '', reverse=True)
@@ -119,49 +75,58 @@ def escape_html(text: str) -> str:
             .replace("'", '&#39;'))
 
 
-def update_blogs_html():
-    """更新blogs.html文件"""
-    blogs = get_all_blogs()
-    
-    if not blogs:
-        print("警告: 没有找到博客文件")
-        return
+def render_blog_card(blog: Dict, root: str = '') -> str:
+    """
+    生成一张博客卡片（封面图、标题、日期、关键词）
+    root 为页面到网站根目录的相对前缀，归档页（archive/）传入 '../'
+    """
+    date_formatted = blog['date'] if blog['date'] else ''
+    title_escaped = escape_html(blog['title'])
+    keywords_escaped = ', '.join([escape_html(k) for k in blog['keywords'][:8]])  # 最多显示8个关键词
     
-    # 读取现有blogs.html
-    with open(BLOGS_HTML, 'r', encoding='utf-8') as f:
-        content = f.read()
+    # 生成关键词标签HTML（作为"灵魂黄金三角"的一部分）
+    keywords_html = ''
+    if keywords_escaped:
+        keywords_html = f'<div class="blog-keywords"><span class="keywords-label">关键词：</span><span class="keywords-list">{keywords_escaped}</span></div>'
     
-    # 生成新的博客链接HTML
-    # 首页重构：只显示"灵魂黄金三角"（封面图、标题、关键词标签、日期）
-    # 不显示简介段落，避免"认知过载"
-    blog_links_html = []
-    for blog in blogs:
-        date_formatted = blog['date'] if blog['date'] else ''
-        title_escaped = escape_html(blog['title'])
-        keywords_escaped = ', '.join([escape_html(k) for k in blog['keywords'][:8]])  # 最多显示8个关键词
-        
-        # 生成关键词标签HTML（作为"灵魂黄金三角"的一部分）
-        keywords_html = ''
-        if keywords_escaped:
-            keywords_html = f'<div class="blog-keywords"><span class="keywords-label">关键词：</span><span class="keywords-list">{keywords_escaped}</span></div>'
-        
-        # 生成封面图HTML（灵魂封面图）
-        cover_html = ''
-        if blog.get('cover_image'):
-            cover_image_escaped = escape_html(blog['cover_image'])
-            cover_html = f'''                                        <div class="blog-cover-wrap">
+    # 生成封面图HTML（灵魂封面图）
+    cover_html = ''
+    if blog.get('cover_image'):
+        cover_image = blog['cover_image']
+        if not cover_image.startswith(('http', '/')):
+            cover_image = root + cover_image
+        cover_image_escaped = escape_html(cover_image)
+        cover_html = f'''                                        <div class="blog-cover-wrap">
                                             <img class="blog-cover" src="{cover_image_escaped}" alt="{title_escaped}" loading="lazy">
                                         </div>'''
-        
-        # 首页：显示封面图、标题、日期、关键词（灵魂黄金三角）
-        blog_links_html.append(f'''                                    <a href="blogs/{blog['filename']}" class="link-card">
+    
+    return f'''                                    <a href="{root}blogs/{blog['filename']}" class="link-card">
                                         {cover_html}
                                         <div class="link-content">
                                             <h5>{title_escaped}</h5>
                                             <span class="date-tag">{date_formatted}</span>
                                             {keywords_html}
                                         </div>
-                                    </a>''')
+                                    </a>'''
+
+
+def update_blogs_html() -> bool:
+    """更新blogs.html文件：最新一页文章和归档入口；返回是否写入了文件"""
+    from build_archive import ARCHIVE_NAV_END, ARCHIVE_NAV_START, PAGE_SIZE, archive_nav_html
+    
+    blogs = get_all_blogs()
+    
+    if not blogs:
+        print("警告: 没有找到博客文件")
+        return False
+    
+    # 读取现有blogs.html
+    with open(BLOGS_HTML, 'r', encoding='utf-8') as f:
+        content = f.read()
+    
+    # 首页重构：只显示"灵魂黄金三角"（封面图、标题、关键词标签、日期），不显示简介段落，避免"认知过载"
+    # 列表页只放最新的一页文章，更早的文章通过归档页（按页、按年份、按标签）访问
+    blog_links_html = [render_blog_card(blog) for blog in blogs[:PAGE_SIZE]]
     
     # 查找并替换博客链接部分
     # 匹配从 <div class="links-grid"> 开始到 </div> 结束（但要匹配到正确的结束位置）
@@ -170,39 +135,51 @@ def update_blogs_html():
     
     # 生成替换内容
     new_links_content = '\n'.join(blog_links_html)
-    replacement = r'\1\n' + new_links_content + '\n                                ' + r'\3'
+    # 第三组开头的空白先去掉再补一行缩进，避免每次运行累积空行；用函数替换，标题中的反斜杠不会被当作转义
+    def replacement(m):
+        return m.group(1) + '\n' + new_links_content + '\n                                ' + m.group(3).lstrip()
     
     match = re.search(pattern, content, re.DOTALL)
-    if match:
-        content = re.sub(pattern, replacement, content, flags=re.DOTALL)
-        
-        # 写回文件
-        with open(BLOGS_HTML, 'w', encoding='utf-8') as f:
-            f.write(content)
-        
-        print(f"✅ 已更新 blogs.html，共 {len(blogs)} 篇文章")
-    else:
+    if not match:
         # 尝试更宽松的匹配
-        pattern2 = r'(<div class="subcategory">\s*<div class="links-grid">)(.*?)(\s*</div>\s*</div>\s*</div>\s*</section>)'
-        match2 = re.search(pattern2, content, re.DOTALL)
-        if match2:
-            content = re.sub(pattern2, replacement, content, flags=re.DOTALL)
-            with open(BLOGS_HTML, 'w', encoding='utf-8') as f:
-                f.write(content)
-            print(f"✅ 已更新 blogs.html，共 {len(blogs)} 篇文章")
-        else:
-            print("⚠️  警告: 未找到匹配的链接网格区域")
-            print("尝试查找的内容:")
-            print(repr(content[content.find('<div class="links-grid">'):content.find('<div class="links-grid">')+500]))
+        pattern = r'(<div class="subcategory">\s*<div class="links-grid">)(.*?)(\s*</div>\s*</div>\s*</div>\s*</section>)'
+        match = re.search(pattern, content, re.DOTALL)
+    if not match:
+        print("⚠️  警告: 未找到匹配的链接网格区域")
+        print("尝试查找的内容:")
+        print(repr(content[content.find('<div class="links-grid">'):content.find('<div class="links-grid">')+500]))
+        return False
+    
+    new_content = re.sub(pattern, replacement, content, flags=re.DOTALL)
+    
+    # 博客区块之后的归档入口（全部文章、按年份、按标签）
+    nav_html = archive_nav_html(blogs)
+    nav_pattern = re.compile(re.escape(ARCHIVE_NAV_START) + r'.*?' + re.escape(ARCHIVE_NAV_END), re.DOTALL)
+    if nav_pattern.search(new_content):
+        new_content = nav_pattern.sub(lambda m: nav_html, new_content, count=1)
+    else:
+        section_end = re.search(pattern, new_content, re.DOTALL).end()
+        new_content = f"{new_content[:section_end]}\n                    {nav_html}{new_content[section_end:]}"
+    
+    if new_content == content:
+        print(f"⊘ blogs.html 未变化（共 {len(blogs)} 篇文章）")
+        return False
+    
+    # 写回文件
+    with open(BLOGS_HTML, 'w', encoding='utf-8') as f:
+        f.write(new_content)
+    
+    print(f"✅ 已更新 blogs.html，共 {len(blogs)} 篇文章（列表页显示最新 {min(len(blogs), PAGE_SIZE)} 篇）")
+    return True
 
 
-def update_index_html():
-    """更新index.html文件，只显示最新的3篇文章"""
+def update_index_html() -> bool:
+    """更新index.html文件，只显示最新的3篇文章；返回是否写入了文件"""
     blogs = get_all_blogs()
     
     if not blogs:
         print("警告: 没有找到博客文件")
-        return
+        return False
     
     # 只取最新的3篇
     latest_blogs = blogs[:3]
@@ -237,18 +214,24 @@ def update_index_html():
     
     # 生成替换内容
     new_cards_content = '\n'.join(blog_cards_html)
-    replacement = r'\1\n' + new_cards_content + '\n          ' + r'\3'
+    def replacement(m):
+        return m.group(1) + '\n' + new_cards_content + '\n          ' + m.group(3).lstrip()
     
-    if re.search(pattern, content, re.DOTALL):
-        content = re.sub(pattern, replacement, content, flags=re.DOTALL)
-        
-        # 写回文件
-        with open(INDEX_HTML, 'w', encoding='utf-8') as f:
-            f.write(content)
-        
-        print(f"✅ 已更新 index.html，显示最新的 {len(latest_blogs)} 篇文章")
-    else:
+    if not re.search(pattern, content, re.DOTALL):
         print("⚠️  警告: 未找到匹配的博客部分")
+        return False
+    
+    new_content = re.sub(pattern, replacement, content, flags=re.DOTALL)
+    if new_content == content:
+        print("⊘ index.html 未变化")
+        return False
+    
+    # 写回文件
+    with open(INDEX_HTML, 'w', encoding='utf-8') as f:
+        f.write(new_content)
+    
+    print(f"✅ 已更新 index.html，显示最新的 {len(latest_blogs)} 篇文章")
+    return True
 
 
 def main():
@@ -266,11 +249,16 @@ def main():
     print(f"📁 找到 {len(blogs)} 篇博客文章")
     print()
     
-    # 更新blogs.html
-    update_blogs_html()
+    # 更新blogs.html和index.html（两者都在搜索索引中，有改动时重建索引）
+    changed = update_blogs_html()
+    changed = update_index_html() or changed
+    if changed:
+        import build_search_index
+        build_search_index.build()
     
-    # 更新index.html
-    update_index_html()
+    # 增量生成归档页
+    from build_archive import build as build_archive
+    build_archive(blogs=blogs)
     
     print()
     print("=" * 60)